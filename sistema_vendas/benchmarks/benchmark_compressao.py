@@ -0,0 +1,117 @@
+"""
+Benchmark da compressão das APIs de listagem (produtos e clientes)
+
+Cria um banco de teste temporário com muitos registros, consulta
+/produtos/api/listar/ e /clientes/api/listar/ sem compressão, com gzip e
+com brotli (se instalado) e mostra bytes transferidos, tempo no servidor e
+o tempo estimado de transferência em uma rede lenta.
+
+Uso (na pasta sistema_vendas):
+    python benchmarks/benchmark_compressao.py --quantidade 20000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sistema_vendas.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: E402
+
+from clientes.models import Cliente  # noqa: E402
+from fornecedores.models import Fornecedor  # noqa: E402
+from produtos.models import Produto  # noqa: E402
+from sistema_vendas import compressao  # noqa: E402
+
+
+ENDPOINTS = {
+    'listar_produtos': '/produtos/api/listar/',
+    'listar_clientes': '/clientes/api/listar/',
+}
+
+
+def popular(quantidade):
+    """
+    Cria fornecedores, produtos e clientes no banco de teste
+    """
+    fornecedores = Fornecedor.objects.bulk_create([
+        Fornecedor(nome=f'Fornecedor {i}', cnpj=f'{i:014d}', cidade='Marechal Cândido Rondon', estado='PR')
+        for i in range(50)
+    ])
+    Produto.objects.bulk_create([
+        Produto(
+            descricao=f'Produto {i} - embalagem {i % 12 + 1} unidades',
+            preco=Decimal('9.90') + i % 100,
+            qtd_estoque=i % 500,
+            fornecedor=fornecedores[i % len(fornecedores)]
+        )
+        for i in range(quantidade)
+    ], batch_size=1000)
+    Cliente.objects.bulk_create([
+        Cliente(
+            nome=f'Cliente {i} da Silva',
+            cpf=f'{i:011d}',
+            email=f'cliente{i}@exemplo.com',
+            telefone='(45) 3254-1234',
+            cidade='Marechal Cândido Rondon'
+        )
+        for i in range(quantidade)
+    ], batch_size=1000)
+
+
+def medir(client, url, codificacao, repeticoes):
+    """
+    Retorna (bytes do corpo, mediana do tempo no servidor em ms)
+    """
+    headers = {'accept_encoding': codificacao} if codificacao != 'identity' else {}
+    tempos = []
+    tamanho = 0
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        response = client.get(url, headers=headers)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        tamanho = len(response.content)
+        assert response.status_code == 200, response.status_code
+    return tamanho, statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quantidade', type=int, default=20000, help='Produtos e clientes criados')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Requisições por medição')
+    parser.add_argument('--banda-mbps', type=float, default=2.0, help='Banda da rede lenta simulada')
+    args = parser.parse_args()
+
+    codificacoes = ['identity', 'gzip'] + (['br'] if compressao.brotli is not None else [])
+
+    setup_test_environment()
+    nome_original = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        popular(args.quantidade)
+        client = Client()
+
+        print(f'{args.quantidade} registros por tabela, rede de {args.banda_mbps} Mbit/s')
+        print(f'{"endpoint":<18}{"codificação":<13}{"bytes":>12}{"servidor ms":>13}{"rede ms":>10}{"total ms":>10}')
+        for nome, url in ENDPOINTS.items():
+            for codificacao in codificacoes:
+                tamanho, servidor = medir(client, url, codificacao, args.repeticoes)
+                rede = tamanho * 8 / (args.banda_mbps * 1_000_000) * 1000
+                print(f'{nome:<18}{codificacao:<13}{tamanho:>12,}{servidor:>13.1f}{rede:>10.0f}{servidor + rede:>10.0f}')
+    finally:
+        connection.creation.destroy_test_db(nome_original, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == '__main__':
+    main()
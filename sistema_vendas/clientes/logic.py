@@ -1,5 +1,6 @@
 from .models import Cliente
 from django.db.models import Q
+from sistema_vendas.coalescencia import coalescer
 
 
 class ClienteLogic:
@@ -8,6 +9,7 @@ class ClienteLogic:
     """
     
     @staticmethod
+    @coalescer('clientes.listar_clientes')
     def listar_clientes(search=''):
         """
         Lista todos os clientes com busca opcional
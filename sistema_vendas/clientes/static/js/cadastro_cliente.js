@@ -0,0 +1,165 @@
+// Máscaras de input
+document.getElementById('cpf').addEventListener('input', function(e) {
+    let value = e.target.value.replace(/\D/g, '');
+    if (value.length <= 11) {
+        value = value.replace(/(\d{3})(\d)/, '$1.$2');
+        value = value.replace(/(\d{3})(\d)/, '$1.$2');
+        value = value.replace(/(\d{3})(\d{1,2})$/, '$1-$2');
+    }
+    e.target.value = value;
+});
+
+document.getElementById('telefone').addEventListener('input', function(e) {
+    let value = e.target.value.replace(/\D/g, '');
+    if (value.length <= 10) {
+        value = value.replace(/(\d{2})(\d)/, '($1) $2');
+        value = value.replace(/(\d{4})(\d)/, '$1-$2');
+    }
+    e.target.value = value;
+});
+
+document.getElementById('celular').addEventListener('input', function(e) {
+    let value = e.target.value.replace(/\D/g, '');
+    if (value.length <= 11) {
+        value = value.replace(/(\d{2})(\d)/, '($1) $2');
+        value = value.replace(/(\d{5})(\d)/, '$1-$2');
+    }
+    e.target.value = value;
+});
+
+document.getElementById('cep').addEventListener('input', function(e) {
+    let value = e.target.value.replace(/\D/g, '');
+    if (value.length <= 8) {
+        value = value.replace(/(\d{5})(\d)/, '$1-$2');
+    }
+    e.target.value = value;
+});
+
+document.getElementById('uf').addEventListener('input', function(e) {
+    e.target.value = e.target.value.toUpperCase();
+});
+
+// Buscar CEP
+document.getElementById('cep').addEventListener('blur', async function() {
+    const cep = this.value.replace(/\D/g, '');
+
+    if (cep.length === 8) {
+        try {
+            const response = await fetch(`https://viacep.com.br/ws/${cep}/json/`);
+            const data = await response.json();
+
+            if (!data.erro) {
+                document.getElementById('endereco').value = data.logradouro;
+                document.getElementById('bairro').value = data.bairro;
+                document.getElementById('cidade').value = data.localidade;
+                document.getElementById('uf').value = data.uf;
+                document.getElementById('numero').focus();
+            }
+        } catch (error) {
+            console.error('Erro ao buscar CEP:', error);
+        }
+    }
+});
+
+// Submit do formulário
+document.getElementById('clienteForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    // Limpar erros anteriores
+    document.querySelectorAll('.error-message').forEach(el => el.textContent = '');
+    document.querySelectorAll('.form-input').forEach(el => el.classList.remove('error'));
+
+    // Coletar dados do formulário
+    const formData = {
+        nome: document.getElementById('nome').value.trim(),
+        rg: document.getElementById('rg').value.trim(),
+        cpf: document.getElementById('cpf').value.replace(/\D/g, ''),
+        email: document.getElementById('email').value.trim(),
+        telefone: document.getElementById('telefone').value.replace(/\D/g, ''),
+        celular: document.getElementById('celular').value.replace(/\D/g, ''),
+        cep: document.getElementById('cep').value.replace(/\D/g, ''),
+        endereco: document.getElementById('endereco').value.trim(),
+        numero: document.getElementById('numero').value.trim() ? parseInt(document.getElementById('numero').value.trim()) : null,
+        complemento: document.getElementById('complemento').value.trim(),
+        bairro: document.getElementById('bairro').value.trim(),
+        cidade: document.getElementById('cidade').value.trim(),
+        uf: document.getElementById('uf').value.trim().toUpperCase(),
+    };
+
+    // Validações básicas
+    let hasError = false;
+
+    if (!formData.nome) {
+        document.getElementById('nomeError').textContent = 'Nome é obrigatório';
+        document.getElementById('nome').classList.add('error');
+        hasError = true;
+    }
+
+    if (!formData.cpf) {
+        document.getElementById('cpfError').textContent = 'CPF é obrigatório';
+        document.getElementById('cpf').classList.add('error');
+        hasError = true;
+    } else if (formData.cpf.length !== 11) {
+        document.getElementById('cpfError').textContent = 'CPF inválido';
+        document.getElementById('cpf').classList.add('error');
+        hasError = true;
+    }
+
+    if (formData.email && !isValidEmail(formData.email)) {
+        document.getElementById('emailError').textContent = 'E-mail inválido';
+        document.getElementById('email').classList.add('error');
+        hasError = true;
+    }
+
+    if (hasError) {
+        return;
+    }
+
+    // Mostrar loading
+    document.getElementById('loading').classList.add('active');
+    document.getElementById('btnSalvar').disabled = true;
+
+    try {
+        const response = await fetch('/clientes/api/criar/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+
+        document.getElementById('loading').classList.remove('active');
+        document.getElementById('btnSalvar').disabled = false;
+
+        if (data.success) {
+            // Mostrar mensagem de sucesso
+            const successMessage = document.getElementById('successMessage');
+            successMessage.textContent = 'Cliente cadastrado com sucesso!';
+            successMessage.classList.add('active');
+
+            // Redirecionar após 2 segundos
+            setTimeout(() => {
+                window.location.href = '/clientes/consulta/';
+            }, 2000);
+        } else {
+            alert('Erro ao cadastrar cliente: ' + data.error);
+        }
+    } catch (error) {
+        document.getElementById('loading').classList.remove('active');
+        document.getElementById('btnSalvar').disabled = false;
+        console.error('Erro ao cadastrar cliente:', error);
+        alert('Erro ao cadastrar cliente. Tente novamente.');
+    }
+});
+
+function isValidEmail(email) {
+    return /^[^\s@]+@[^\s@]+\.[^\s@]+$/.test(email);
+}
+
+function voltarParaConsulta() {
+    if (confirm('Deseja realmente sair? As alterações não salvas serão perdidas.')) {
+        window.location.href = '/clientes/consulta/';
+    }
+}
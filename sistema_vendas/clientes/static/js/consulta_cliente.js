@@ -0,0 +1,141 @@
+// Carregar clientes ao iniciar a página
+document.addEventListener('DOMContentLoaded', function() {
+    carregarClientes();
+
+    // Buscar ao pressionar Enter
+    document.getElementById('searchInput').addEventListener('keypress', function(e) {
+        if (e.key === 'Enter') {
+            buscarClientes();
+        }
+    });
+});
+
+async function carregarClientes(search = '') {
+    const loading = document.getElementById('loading');
+    const emptyState = document.getElementById('emptyState');
+    const clientesList = document.getElementById('clientesList');
+
+    loading.style.display = 'block';
+    emptyState.style.display = 'none';
+    clientesList.innerHTML = '';
+
+    try {
+        const url = search 
+            ? `/clientes/api/listar/?search=${encodeURIComponent(search)}`
+            : '/clientes/api/listar/';
+
+        const response = await fetch(url);
+        const data = await response.json();
+
+        loading.style.display = 'none';
+
+        if (data.success && data.clientes.length > 0) {
+            renderizarClientes(data.clientes);
+        } else {
+            emptyState.style.display = 'block';
+        }
+    } catch (error) {
+        loading.style.display = 'none';
+        console.error('Erro ao carregar clientes:', error);
+        alert('Erro ao carregar clientes. Tente novamente.');
+    }
+}
+
+function renderizarClientes(clientes) {
+    const clientesList = document.getElementById('clientesList');
+
+    clientes.forEach(cliente => {
+        const card = document.createElement('div');
+        card.className = 'product-card';
+        card.innerHTML = `
+            <div class="product-header">
+                <h3 class="product-title">${cliente.nome}</h3>
+                <div class="product-actions">
+                    <button class="icon-btn" onclick="visualizarCliente(${cliente.id})" title="Visualizar">
+                        <svg fill="none" stroke="currentColor" viewBox="0 0 24 24" width="16" height="16">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M15 12a3 3 0 11-6 0 3 3 0 016 0z"></path>
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M2.458 12C3.732 7.943 7.523 5 12 5c4.478 0 8.268 2.943 9.542 7-1.274 4.057-5.064 7-9.542 7-4.477 0-8.268-2.943-9.542-7z"></path>
+                        </svg>
+                    </button>
+                    <button class="icon-btn" onclick="editarCliente(${cliente.id})" title="Editar">
+                        <svg fill="none" stroke="currentColor" viewBox="0 0 24 24" width="16" height="16">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M11 5H6a2 2 0 00-2 2v11a2 2 0 002 2h11a2 2 0 002-2v-5m-1.414-9.414a2 2 0 112.828 2.828L11.828 15H9v-2.828l8.586-8.586z"></path>
+                        </svg>
+                    </button>
+                    <button class="icon-btn" onclick="deletarCliente(${cliente.id}, '${cliente.nome}')" title="Excluir">
+                        <svg fill="none" stroke="currentColor" viewBox="0 0 24 24" width="16" height="16">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M19 7l-.867 12.142A2 2 0 0116.138 21H7.862a2 2 0 01-1.995-1.858L5 7m5 4v6m4-6v6m1-10V4a1 1 0 00-1-1h-4a1 1 0 00-1 1v3M4 7h16"></path>
+                        </svg>
+                    </button>
+                </div>
+            </div>
+            <div class="product-details">
+                <div class="detail-item">
+                    <span class="detail-label">CPF</span>
+                    <span class="detail-value">${cliente.cpf || '-'}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Email</span>
+                    <span class="detail-value">${cliente.email || '-'}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Telefone</span>
+                    <span class="detail-value">${cliente.telefone || cliente.celular || '-'}</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Cidade</span>
+                    <span class="detail-value">${cliente.cidade ? cliente.cidade + (cliente.uf ? '/' + cliente.uf : '') : '-'}</span>
+                </div>
+            </div>
+        `;
+        clientesList.appendChild(card);
+    });
+}
+
+function buscarClientes() {
+    const searchInput = document.getElementById('searchInput');
+    carregarClientes(searchInput.value);
+}
+
+function novoCliente() {
+    // Redirecionar para página de cadastro usando a URL do Django
+    window.location.href = document.body.dataset.urlCadastro;
+}
+
+function editarCliente(id) {
+    // Redirecionar para página de edição usando a URL do Django
+    window.location.href = `/clientes/edicao/${id}/`;
+}
+
+function visualizarCliente(id) {
+    // Se você tiver uma página de visualização, use esta URL
+    // Caso contrário, pode redirecionar para edição em modo leitura
+    window.location.href = `/clientes/edicao/${id}/`;
+}
+
+async function deletarCliente(id, nome) {
+    if (!confirm(`Tem certeza que deseja excluir o cliente "${nome}"?`)) {
+        return;
+    }
+
+    try {
+        const response = await fetch(`/clientes/api/deletar/${id}/`, {
+            method: 'DELETE',
+            headers: {
+                'Content-Type': 'application/json',
+            }
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            alert('Cliente excluído com sucesso!');
+            carregarClientes();
+        } else {
+            alert('Erro ao excluir cliente: ' + data.error);
+        }
+    } catch (error) {
+        console.error('Erro ao excluir cliente:', error);
+        alert('Erro ao excluir cliente. Tente novamente.');
+    }
+}
@@ -0,0 +1,248 @@
+const clienteId = document.getElementById('clienteId').value;
+
+// Carregar dados do cliente ao iniciar
+document.addEventListener('DOMContentLoaded', function() {
+    carregarCliente();
+});
+
+async function carregarCliente() {
+    const loading = document.getElementById('loading');
+    const formContainer = document.getElementById('formContainer');
+
+    loading.classList.add('active');
+
+    try {
+        const response = await fetch(`/clientes/api/obter/${clienteId}/`);
+        const data = await response.json();
+
+        loading.classList.remove('active');
+
+        if (data.success) {
+            preencherFormulario(data.cliente);
+            formContainer.style.display = 'block';
+        } else {
+            alert('Cliente não encontrado');
+            window.location.href = '/clientes/consulta/';
+        }
+    } catch (error) {
+        loading.classList.remove('active');
+        console.error('Erro ao carregar cliente:', error);
+        alert('Erro ao carregar dados do cliente');
+    }
+}
+
+function preencherFormulario(cliente) {
+    document.getElementById('nome').value = cliente.nome || '';
+    document.getElementById('rg').value = cliente.rg || '';
+    document.getElementById('cpf').value = formatarCPF(cliente.cpf || '');
+    document.getElementById('email').value = cliente.email || '';
+    document.getElementById('telefone').value = formatarTelefone(cliente.telefone || '');
+    document.getElementById('celular').value = formatarCelular(cliente.celular || '');
+    document.getElementById('cep').value = formatarCEP(cliente.cep || '');
+    document.getElementById('endereco').value = cliente.endereco || '';
+    document.getElementById('numero').value = cliente.numero || '';
+    document.getElementById('complemento').value = cliente.complemento || '';
+    document.getElementById('bairro').value = cliente.bairro || '';
+    document.getElementById('cidade').value = cliente.cidade || '';
+    document.getElementById('uf').value = cliente.uf || '';
+}
+
+function formatarCPF(cpf) {
+    cpf = cpf.replace(/\D/g, '');
+    if (cpf.length === 11) {
+        return cpf.replace(/(\d{3})(\d{3})(\d{3})(\d{2})/, '$1.$2.$3-$4');
+    }
+    return cpf;
+}
+
+function formatarTelefone(telefone) {
+    telefone = telefone.replace(/\D/g, '');
+    if (telefone.length === 10) {
+        return telefone.replace(/(\d{2})(\d{4})(\d{4})/, '($1) $2-$3');
+    }
+    return telefone;
+}
+
+function formatarCelular(celular) {
+    celular = celular.replace(/\D/g, '');
+    if (celular.length === 11) {
+        return celular.replace(/(\d{2})(\d{5})(\d{4})/, '($1) $2-$3');
+    }
+    return celular;
+}
+
+function formatarCEP(cep) {
+    cep = cep.replace(/\D/g, '');
+    if (cep.length === 8) {
+        return cep.replace(/(\d{5})(\d{3})/, '$1-$2');
+    }
+    return cep;
+}
+
+// Máscaras de input (igual ao cadastro)
+document.getElementById('cpf').addEventListener('input', function(e) {
+    let value = e.target.value.replace(/\D/g, '');
+    if (value.length <= 11) {
+        value = value.replace(/(\d{3})(\d)/, '$1.$2');
+        value = value.replace(/(\d{3})(\d)/, '$1.$2');
+        value = value.replace(/(\d{3})(\d{1,2})$/, '$1-$2');
+    }
+    e.target.value = value;
+});
+
+document.getElementById('telefone').addEventListener('input', function(e) {
+    let value = e.target.value.replace(/\D/g, '');
+    if (value.length <= 10) {
+        value = value.replace(/(\d{2})(\d)/, '($1) $2');
+        value = value.replace(/(\d{4})(\d)/, '$1-$2');
+    }
+    e.target.value = value;
+});
+
+document.getElementById('celular').addEventListener('input', function(e) {
+    let value = e.target.value.replace(/\D/g, '');
+    if (value.length <= 11) {
+        value = value.replace(/(\d{2})(\d)/, '($1) $2');
+        value = value.replace(/(\d{5})(\d)/, '$1-$2');
+    }
+    e.target.value = value;
+});
+
+document.getElementById('cep').addEventListener('input', function(e) {
+    let value = e.target.value.replace(/\D/g, '');
+    if (value.length <= 8) {
+        value = value.replace(/(\d{5})(\d)/, '$1-$2');
+    }
+    e.target.value = value;
+});
+
+document.getElementById('uf').addEventListener('input', function(e) {
+    e.target.value = e.target.value.toUpperCase();
+});
+
+// Buscar CEP
+document.getElementById('cep').addEventListener('blur', async function() {
+    const cep = this.value.replace(/\D/g, '');
+
+    if (cep.length === 8) {
+        try {
+            const response = await fetch(`https://viacep.com.br/ws/${cep}/json/`);
+            const data = await response.json();
+
+            if (!data.erro) {
+                document.getElementById('endereco').value = data.logradouro;
+                document.getElementById('bairro').value = data.bairro;
+                document.getElementById('cidade').value = data.localidade;
+                document.getElementById('uf').value = data.uf;
+                document.getElementById('numero').focus();
+            }
+        } catch (error) {
+            console.error('Erro ao buscar CEP:', error);
+        }
+    }
+});
+
+// Submit do formulário
+document.getElementById('clienteForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    // Limpar erros anteriores
+    document.querySelectorAll('.error-message').forEach(el => el.textContent = '');
+    document.querySelectorAll('.form-input').forEach(el => el.classList.remove('error'));
+
+    // Coletar dados do formulário
+    const formData = {
+        nome: document.getElementById('nome').value.trim(),
+        rg: document.getElementById('rg').value.trim(),
+        cpf: document.getElementById('cpf').value.replace(/\D/g, ''),
+        email: document.getElementById('email').value.trim(),
+        telefone: document.getElementById('telefone').value.replace(/\D/g, ''),
+        celular: document.getElementById('celular').value.replace(/\D/g, ''),
+        cep: document.getElementById('cep').value.replace(/\D/g, ''),
+        endereco: document.getElementById('endereco').value.trim(),
+        numero: document.getElementById('numero').value.trim() ? parseInt(document.getElementById('numero').value.trim()) : null,
+        complemento: document.getElementById('complemento').value.trim(),
+        bairro: document.getElementById('bairro').value.trim(),
+        cidade: document.getElementById('cidade').value.trim(),
+        uf: document.getElementById('uf').value.trim().toUpperCase(),
+    };
+
+    // Validações básicas
+    let hasError = false;
+
+    if (!formData.nome) {
+        document.getElementById('nomeError').textContent = 'Nome é obrigatório';
+        document.getElementById('nome').classList.add('error');
+        hasError = true;
+    }
+
+    if (!formData.cpf) {
+        document.getElementById('cpfError').textContent = 'CPF é obrigatório';
+        document.getElementById('cpf').classList.add('error');
+        hasError = true;
+    } else if (formData.cpf.length !== 11) {
+        document.getElementById('cpfError').textContent = 'CPF inválido';
+        document.getElementById('cpf').classList.add('error');
+        hasError = true;
+    }
+
+    if (formData.email && !isValidEmail(formData.email)) {
+        document.getElementById('emailError').textContent = 'E-mail inválido';
+        document.getElementById('email').classList.add('error');
+        hasError = true;
+    }
+
+    if (hasError) {
+        return;
+    }
+
+    // Mostrar loading
+    const loading = document.getElementById('loading');
+    loading.textContent = 'Salvando alterações...';
+    loading.classList.add('active');
+    document.getElementById('btnSalvar').disabled = true;
+
+    try {
+        const response = await fetch(`/clientes/api/atualizar/${clienteId}/`, {
+            method: 'PUT',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+
+        loading.classList.remove('active');
+        document.getElementById('btnSalvar').disabled = false;
+
+        if (data.success) {
+            // Mostrar mensagem de sucesso
+            const successMessage = document.getElementById('successMessage');
+            successMessage.textContent = 'Cliente atualizado com sucesso!';
+            successMessage.classList.add('active');
+
+            // Redirecionar após 2 segundos
+            setTimeout(() => {
+                window.location.href = '/clientes/consulta/';
+            }, 2000);
+        } else {
+            alert('Erro ao atualizar cliente: ' + data.error);
+        }
+    } catch (error) {
+        loading.classList.remove('active');
+        document.getElementById('btnSalvar').disabled = false;
+        console.error('Erro ao atualizar cliente:', error);
+        alert('Erro ao atualizar cliente. Tente novamente.');
+    }
+});
+
+function isValidEmail(email) {
+    return /^[^\s@]+@[^\s@]+\.[^\s@]+$/.test(email);
+}
+
+function voltarParaConsulta() {
+    if (confirm('Deseja realmente sair? As alterações não salvas serão perdidas.')) {
+        window.location.href = '/clientes/consulta/';
+    }
+}
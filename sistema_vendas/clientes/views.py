@@ -1,7 +1,7 @@
 from django.shortcuts import render
-from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
+from sistema_vendas.respostas import RespostaJSON
 import json
 from .logic import ClienteLogic
 
@@ -37,12 +37,12 @@ def listar_clientes(request):
         search = request.GET.get('search', '')
         clientes = ClienteLogic.listar_clientes(search)
         
-        return JsonResponse({
+        return RespostaJSON({
             'success': True,
             'clientes': clientes
         })
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=500)
@@ -58,17 +58,17 @@ def obter_cliente(request, cliente_id):
         cliente = ClienteLogic.obter_cliente(cliente_id)
         
         if cliente:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': True,
                 'cliente': cliente
             })
         else:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': False,
                 'error': 'Cliente não encontrado'
             }, status=404)
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=500)
@@ -85,17 +85,17 @@ def deletar_cliente(request, cliente_id):
         success = ClienteLogic.deletar_cliente(cliente_id)
         
         if success:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': True,
                 'message': 'Cliente deletado com sucesso'
             })
         else:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': False,
                 'error': 'Cliente não encontrado'
             }, status=404)
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=500)
@@ -113,33 +113,33 @@ def criar_cliente(request):
         
         # Validações básicas
         if not dados.get('nome'):
-            return JsonResponse({
+            return RespostaJSON({
                 'success': False,
                 'error': 'Nome é obrigatório'
             }, status=400)
         
         if not dados.get('cpf'):
-            return JsonResponse({
+            return RespostaJSON({
                 'success': False,
                 'error': 'CPF é obrigatório'
             }, status=400)
         
         # Validar CPF
         if not ClienteLogic.validar_cpf(dados['cpf']):
-            return JsonResponse({
+            return RespostaJSON({
                 'success': False,
                 'error': 'CPF inválido'
             }, status=400)
         
         cliente = ClienteLogic.criar_cliente(dados)
         
-        return JsonResponse({
+        return RespostaJSON({
             'success': True,
             'cliente': cliente,
             'message': 'Cliente criado com sucesso'
         })
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=500)
@@ -157,7 +157,7 @@ def atualizar_cliente(request, cliente_id):
         
         # Validar CPF se fornecido
         if dados.get('cpf') and not ClienteLogic.validar_cpf(dados['cpf']):
-            return JsonResponse({
+            return RespostaJSON({
                 'success': False,
                 'error': 'CPF inválido'
             }, status=400)
@@ -165,18 +165,18 @@ def atualizar_cliente(request, cliente_id):
         cliente = ClienteLogic.atualizar_cliente(cliente_id, dados)
         
         if cliente:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': True,
                 'cliente': cliente,
                 'message': 'Cliente atualizado com sucesso'
             })
         else:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': False,
                 'error': 'Cliente não encontrado'
             }, status=404)
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=500)
\ No newline at end of file
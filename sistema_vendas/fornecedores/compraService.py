@@ -1,12 +1,27 @@
 from django.db import transaction
+from django.core.paginator import Paginator
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Max, Prefetch, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from decimal import Decimal
+from sistema_vendas.cache_catalogo import invalidar_catalogo
+from sistema_vendas.cache_revalidacao import cache_revalidado
+from sistema_vendas.eventos import publicar_apos_commit
 from .models import Compra, Fornecedor
 
 from datetime import datetime
 import json
 
 
+# Transições de status permitidas para uma compra (origem -> destinos)
+TRANSICOES_STATUS = {
+    'pendente': ('processando', 'concluida', 'cancelada'),
+    'processando': ('concluida', 'cancelada'),
+    'concluida': (),
+    'cancelada': (),
+}
+
+
 class CompraService:
     """
     Serviço para gerenciar operações de compras de fornecedores
@@ -56,7 +71,7 @@ class CompraService:
             dados (dict): Dicionário com os dados da compra
                 - data_compra (str): Data da compra no formato dd/mm/yyyy
                 - id_fornecedor (int): ID do fornecedor
-                - status (str): Status da compra
+                - status (str, optional): Status da compra (padrão 'pendente')
                 - observacoes (str, optional): Observações
                 - itens (list): Lista de itens da compra
                     - id_produto (int): ID do produto
@@ -75,6 +90,13 @@ class CompraService:
                     'error': 'É necessário adicionar pelo menos um item à compra'
                 }
             
+            status = dados.get('status') or 'pendente'
+            if status not in TRANSICOES_STATUS:
+                return {
+                    'success': False,
+                    'error': f'Status inválido. Valores aceitos: {", ".join(TRANSICOES_STATUS)}'
+                }
+            
             # Busca o fornecedor
             from produtos.models import Produto
             try:
@@ -131,28 +153,38 @@ class CompraService:
                     'subtotal': subtotal
                 })
             
-            # Cria a compra
+            # Cria a compra sempre como pendente; outro status é aplicado
+            # depois pela máquina de estados (ex.: 'concluida' registra a
+            # entrada no estoque)
             compra = Compra.objects.create(
                 numero_pedido=numero_pedido,
                 fornecedor=fornecedor,
                 data_compra=data_compra,
-                status=dados.get('status', 'pendente'),
+                status='pendente',
                 valor_total=valor_total,
                 observacoes=dados.get('observacoes'),
                 criado_por=usuario
             )
             
-            # Cria os itens da compra
+            # Cria os itens da compra em lote; o valor_total é recalculado
+            # no banco (itens + frete - desconto) por um único UPDATE
             
             from .models import ItemCompra
-            for item in itens_validados:
-                ItemCompra.objects.create(
+            ItemCompra.objects.bulk_create([
+                ItemCompra(
                     compra=compra,
                     produto=item['produto'],
                     quantidade=item['quantidade'],
                     preco_unitario=item['preco_unitario'],
                     subtotal=item['subtotal']
                 )
+                for item in itens_validados
+            ])
+            
+            if status != 'pendente':
+                CompraService.transicionar_status_compras([compra.id], status)
+            
+            compra.refresh_from_db(fields=['status', 'valor_total', 'atualizado_em'])
             
             return {
                 'success': True,
@@ -163,13 +195,13 @@ class CompraService:
                     'fornecedor': fornecedor.nome,
                     'data_compra': compra.data_compra.strftime('%d/%m/%Y'),
                     'status': compra.status,
-                    'valor_total': float(compra.valor_total),
+                    'valor_total': compra.valor_total,
                     'itens': [
                         {
                             'produto': item['produto'].descricao,
                             'quantidade': item['quantidade'],
-                            'preco_unitario': float(item['preco_unitario']),
-                            'subtotal': float(item['subtotal'])
+                            'preco_unitario': item['preco_unitario'],
+                            'subtotal': item['subtotal']
                         }
                         for item in itens_validados
                     ]
@@ -188,9 +220,10 @@ class CompraService:
             }
     
     @staticmethod
-    def listar_compras(filtros=None):
+    def filtrar_compras(filtros=None):
         """
-        Lista todas as compras com filtros opcionais (INCLUINDO OS ITENS)
+        Monta a consulta de compras com filtros opcionais, já com
+        fornecedor, usuário, itens e produtos pré-carregados
         
         Args:
             filtros (dict, optional): Filtros para a consulta
@@ -199,57 +232,110 @@ class CompraService:
                 - data_inicio (str): Data início no formato dd/mm/yyyy
                 - data_fim (str): Data fim no formato dd/mm/yyyy
         
+        Returns:
+            QuerySet: Compras filtradas
+        """
+        compras = Compra.objects.select_related('fornecedor', 'criado_por').prefetch_related('itens__produto').all()
+        
+        if filtros:
+            if filtros.get('fornecedor_id'):
+                compras = compras.filter(fornecedor_id=filtros['fornecedor_id'])
+            
+            if filtros.get('status'):
+                compras = compras.filter(status=filtros['status'])
+            
+            if filtros.get('data_inicio'):
+                data_inicio = CompraService.converter_data_br_para_datetime(
+                    filtros['data_inicio']
+                )
+                compras = compras.filter(data_compra__gte=data_inicio)
+            
+            if filtros.get('data_fim'):
+                data_fim = CompraService.converter_data_br_para_datetime(
+                    filtros['data_fim']
+                )
+                compras = compras.filter(data_compra__lte=data_fim)
+        
+        return compras
+    
+    @staticmethod
+    def serializar_compra(compra):
+        """
+        Converte uma compra (com itens pré-carregados) em dicionário
+        """
+        return {
+            'id': compra.id,
+            'numero_pedido': compra.numero_pedido,
+            'fornecedor': compra.fornecedor.nome,
+            'data_compra': compra.data_compra.strftime('%d/%m/%Y'),
+            'status': compra.status,
+            'valor_total': compra.valor_total,
+            'criado_por': compra.criado_por.username if compra.criado_por else None,
+            # ADICIONADO: Incluir os itens da compra
+            'itens': [
+                {
+                    'produto': item.produto.descricao,
+                    'quantidade': item.quantidade,
+                    'preco_unitario': item.preco_unitario,
+                    'subtotal': item.subtotal
+                }
+                for item in compra.itens.all()
+            ]
+        }
+    
+    @staticmethod
+    def listar_compras(filtros=None):
+        """
+        Lista todas as compras com filtros opcionais (INCLUINDO OS ITENS)
+        
+        Args:
+            filtros (dict, optional): Filtros para a consulta (ver filtrar_compras)
+        
         Returns:
             dict: Lista de compras com seus itens
         """
         try:
-            from .models import ItemCompra
-            
-            compras = Compra.objects.select_related('fornecedor', 'criado_por').prefetch_related('itens__produto').all()
+            compras = CompraService.filtrar_compras(filtros)
             
-            if filtros:
-                if filtros.get('fornecedor_id'):
-                    compras = compras.filter(fornecedor_id=filtros['fornecedor_id'])
-                
-                if filtros.get('status'):
-                    compras = compras.filter(status=filtros['status'])
-                
-                if filtros.get('data_inicio'):
-                    data_inicio = CompraService.converter_data_br_para_datetime(
-                        filtros['data_inicio']
-                    )
-                    compras = compras.filter(data_compra__gte=data_inicio)
-                
-                if filtros.get('data_fim'):
-                    data_fim = CompraService.converter_data_br_para_datetime(
-                        filtros['data_fim']
-                    )
-                    compras = compras.filter(data_compra__lte=data_fim)
+            return {
+                'success': True,
+                'compras': [CompraService.serializar_compra(compra) for compra in compras]
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Erro ao listar compras: {str(e)}'
+            }
+    
+    @staticmethod
+    def listar_compras_paginado(filtros=None, pagina=1, por_pagina=20):
+        """
+        Lista uma página de compras com filtros opcionais (INCLUINDO OS ITENS)
+        
+        Apenas os itens da página atual são carregados.
+        
+        Args:
+            filtros (dict, optional): Filtros para a consulta (ver filtrar_compras)
+            pagina (int): Número da página (inicia em 1)
+            por_pagina (int): Quantidade de compras por página
+        
+        Returns:
+            dict: Compras da página e dados de paginação
+        """
+        try:
+            compras = CompraService.filtrar_compras(filtros).order_by('-data_compra', '-id')
+            paginator = Paginator(compras, por_pagina)
+            page = paginator.get_page(pagina)
             
             return {
                 'success': True,
-                'compras': [
-                    {
-                        'id': compra.id,
-                        'numero_pedido': compra.numero_pedido,
-                        'fornecedor': compra.fornecedor.nome,
-                        'data_compra': compra.data_compra.strftime('%d/%m/%Y'),
-                        'status': compra.status,
-                        'valor_total': float(compra.valor_total),
-                        'criado_por': compra.criado_por.username if compra.criado_por else None,
-                        # ADICIONADO: Incluir os itens da compra
-                        'itens': [
-                            {
-                                'produto': item.produto.descricao,
-                                'quantidade': item.quantidade,
-                                'preco_unitario': float(item.preco_unitario),
-                                'subtotal': float(item.subtotal)
-                            }
-                            for item in compra.itens.all()
-                        ]
-                    }
-                    for compra in compras
-                ]
+                'compras': [CompraService.serializar_compra(compra) for compra in page.object_list],
+                'paginacao': {
+                    'pagina': page.number,
+                    'total_paginas': paginator.num_pages,
+                    'tem_anterior': page.has_previous(),
+                    'tem_proxima': page.has_next()
+                }
             }
         except Exception as e:
             return {
@@ -257,10 +343,66 @@ class CompraService:
                 'error': f'Erro ao listar compras: {str(e)}'
             }
     
+    @staticmethod
+    @cache_revalidado('compras.resumir_compras_fornecedor', fresco=60)
+    def resumir_compras_fornecedor(fornecedor_id):
+        """
+        Calcula os indicadores de compras de um fornecedor em uma única
+        consulta agregada
+        
+        Args:
+            fornecedor_id (int): ID do fornecedor
+        
+        Returns:
+            dict: total_pedidos, total_investido (Decimal) e pedidos_pendentes
+        """
+        return Compra.objects.filter(fornecedor_id=fornecedor_id).aggregate(
+            total_pedidos=Count('id'),
+            total_investido=Coalesce(Sum('valor_total'), Decimal('0.00'), output_field=DecimalField()),
+            pedidos_pendentes=Count('id', filter=Q(status='pendente'))
+        )
+    
+    @staticmethod
+    def obter_versao_compra(compra_id):
+        """
+        Obtém a versão de uma compra para validação de cache (ETag/Last-Modified)
+        
+        A versão considera tudo o que o detalhe exibe: a própria compra, seus
+        itens (última alteração e quantidade, para detectar exclusões), os
+        produtos e o fornecedor (descrição, nome e CNPJ) e o usuário que a
+        criou, em uma única consulta.
+        
+        Args:
+            compra_id (int): ID da compra
+        
+        Returns:
+            tuple: (atualizado_em: datetime, quantidade_itens: int,
+                criado_por: str) ou None se não existir
+        """
+        versao = Compra.objects.filter(id=compra_id).annotate(
+            itens_atualizado_em=Max('itens__atualizado_em'),
+            produtos_atualizado_em=Max('itens__produto__atualizado_em'),
+            quantidade_itens=Count('itens')
+        ).values_list(
+            'atualizado_em', 'itens_atualizado_em', 'produtos_atualizado_em',
+            'fornecedor__atualizado_em', 'quantidade_itens', 'criado_por__username'
+        ).first()
+        
+        if versao is None:
+            return None
+        
+        *datas, quantidade_itens, criado_por = versao
+        atualizado_em = max(data for data in datas if data is not None)
+        
+        return atualizado_em, quantidade_itens, criado_por or ''
+    
     @staticmethod
     def buscar_compra_por_id(compra_id):
         """
-        Busca uma compra específica pelo ID
+        Busca uma compra específica pelo ID (INCLUINDO OS ITENS)
+        
+        Fornecedor, usuário, itens e produtos são carregados com um número
+        fixo de consultas, independente da quantidade de itens.
         
         Args:
             compra_id (int): ID da compra
@@ -269,7 +411,11 @@ class CompraService:
             dict: Dados da compra
         """
         try:
-            compra = Compra.objects.select_related('fornecedor', 'criado_por').get(id=compra_id)
+            from .models import ItemCompra
+            
+            compra = Compra.objects.select_related('fornecedor', 'criado_por').prefetch_related(
+                Prefetch('itens', queryset=ItemCompra.objects.select_related('produto'))
+            ).get(id=compra_id)
             
             return {
                 'success': True,
@@ -278,16 +424,30 @@ class CompraService:
                     'numero_pedido': compra.numero_pedido,
                     'fornecedor': {
                         'id': compra.fornecedor.id,
-                        'nome': compra.fornecedor.nome
+                        'nome': compra.fornecedor.nome,
+                        'cnpj': compra.fornecedor.cnpj
                     },
                     'data_compra': compra.data_compra.strftime('%d/%m/%Y'),
                     'status': compra.status,
-                    'valor_total': float(compra.valor_total),
-                    'valor_frete': float(compra.valor_frete),
-                    'valor_desconto': float(compra.valor_desconto),
+                    'valor_total': compra.valor_total,
+                    'valor_frete': compra.valor_frete,
+                    'valor_desconto': compra.valor_desconto,
                     'observacoes': compra.observacoes,
                     'criado_por': compra.criado_por.username if compra.criado_por else None,
-                    'criado_em': compra.criado_em.strftime('%d/%m/%Y %H:%M')
+                    'criado_em': compra.criado_em.strftime('%d/%m/%Y %H:%M'),
+                    'itens': [
+                        {
+                            'id': item.id,
+                            'produto': {
+                                'id': item.produto.id,
+                                'descricao': item.produto.descricao
+                            },
+                            'quantidade': item.quantidade,
+                            'preco_unitario': item.preco_unitario,
+                            'subtotal': item.subtotal
+                        }
+                        for item in compra.itens.all()
+                    ]
                 }
             }
         except Compra.DoesNotExist:
@@ -301,11 +461,150 @@ class CompraService:
                 'error': f'Erro ao buscar compra: {str(e)}'
             }
     
+    @staticmethod
+    def status_origem_permitidos(novo_status):
+        """
+        Retorna os status a partir dos quais é permitido ir para novo_status
+        """
+        return [
+            origem for origem, destinos in TRANSICOES_STATUS.items()
+            if novo_status in destinos
+        ]
+    
+    @staticmethod
+    def registrar_entrada_estoque(compra_ids):
+        """
+        Soma ao estoque dos produtos as quantidades dos itens das compras
+        informadas, em um único UPDATE
+        
+        Args:
+            compra_ids (list): IDs das compras recebidas
+        
+        Returns:
+            int: Quantidade de produtos atualizados
+        """
+        from produtos.models import Produto
+        from .models import ItemCompra
+        
+        entradas = ItemCompra.objects.filter(compra_id__in=compra_ids).values(
+            'produto_id'
+        ).annotate(
+            quantidade_total=Sum('quantidade')
+        ).order_by()
+        
+        entradas = {e['produto_id']: e['quantidade_total'] for e in entradas}
+        if not entradas:
+            return 0
+        
+        atualizados = Produto.objects.filter(id__in=list(entradas)).update(
+            qtd_estoque=F('qtd_estoque') + Case(
+                *[When(id=produto_id, then=Value(quantidade)) for produto_id, quantidade in entradas.items()],
+                default=Value(0),
+                output_field=IntegerField()
+            )
+        )
+        invalidar_catalogo('produtos')
+        
+        # Evento de estoque para as telas abertas (stream SSE), após o commit
+        publicar_apos_commit('estoque', {
+            'produtos': list(Produto.objects.filter(id__in=list(entradas)).values('id', 'qtd_estoque'))
+        })
+        
+        return atualizados
+    
     @staticmethod
     @transaction.atomic
+    def transicionar_status_compras(compra_ids, novo_status):
+        """
+        Aplica uma transição de status a várias compras de uma vez
+        
+        As compras são validadas em uma única consulta e atualizadas com um
+        único UPDATE condicional (WHERE status IN origens permitidas). Na
+        transição para 'concluida', a entrada dos itens no estoque é
+        registrada na mesma transação.
+        
+        Args:
+            compra_ids (list): IDs das compras
+            novo_status (str): Novo status
+        
+        Returns:
+            dict: Quantidade de compras atualizadas e resultado por ID
+        """
+        if novo_status not in TRANSICOES_STATUS:
+            return {
+                'success': False,
+                'error': f'Status inválido. Valores aceitos: {", ".join(TRANSICOES_STATUS)}'
+            }
+        
+        try:
+            ids = list(dict.fromkeys(int(compra_id) for compra_id in compra_ids))
+        except (TypeError, ValueError):
+            return {
+                'success': False,
+                'error': 'IDs de compra inválidos'
+            }
+        
+        origens = CompraService.status_origem_permitidos(novo_status)
+        
+        # Validação de todas as compras em uma única consulta (com bloqueio)
+        atuais = {
+            compra_id: (status, numero_pedido)
+            for compra_id, status, numero_pedido in Compra.objects.select_for_update().filter(
+                id__in=ids
+            ).values_list('id', 'status', 'numero_pedido')
+        }
+        
+        permitidas = [compra_id for compra_id in ids if compra_id in atuais and atuais[compra_id][0] in origens]
+        
+        atualizadas = 0
+        if permitidas:
+            campos = {'status': novo_status, 'atualizado_em': timezone.now()}
+            if novo_status == 'concluida':
+                campos['data_entrega_realizada'] = timezone.localdate()
+            
+            atualizadas = Compra.objects.filter(id__in=permitidas, status__in=origens).update(**campos)
+            
+            if novo_status == 'concluida':
+                CompraService.registrar_entrada_estoque(permitidas)
+        
+        resultados = []
+        for compra_id in ids:
+            if compra_id not in atuais:
+                resultados.append({
+                    'id': compra_id,
+                    'success': False,
+                    'error': 'Compra não encontrada'
+                })
+                continue
+            
+            status_anterior, numero_pedido = atuais[compra_id]
+            if compra_id in permitidas:
+                resultados.append({
+                    'id': compra_id,
+                    'numero_pedido': numero_pedido,
+                    'success': True,
+                    'status_anterior': status_anterior,
+                    'status': novo_status
+                })
+            else:
+                resultados.append({
+                    'id': compra_id,
+                    'numero_pedido': numero_pedido,
+                    'success': False,
+                    'status': status_anterior,
+                    'error': f'Transição de status não permitida: {status_anterior} → {novo_status}'
+                })
+        
+        return {
+            'success': True,
+            'atualizadas': atualizadas,
+            'resultados': resultados
+        }
+    
+    @staticmethod
     def atualizar_status_compra(compra_id, novo_status):
         """
-        Atualiza o status de uma compra
+        Atualiza o status de uma compra, respeitando as transições permitidas
         
         Args:
             compra_id (int): ID da compra
@@ -315,32 +614,27 @@ class CompraService:
             dict: Resultado da operação
         """
         try:
-            compra = Compra.objects.get(id=compra_id)
+            resultado = CompraService.transicionar_status_compras([compra_id], novo_status)
             
-            status_validos = ['pendente', 'processando', 'concluida', 'cancelada']
-            if novo_status not in status_validos:
+            if not resultado['success']:
+                return resultado
+            
+            item = resultado['resultados'][0]
+            if not item['success']:
                 return {
                     'success': False,
-                    'error': f'Status inválido. Valores aceitos: {", ".join(status_validos)}'
+                    'error': item['error']
                 }
             
-            compra.status = novo_status
-            compra.save()
-            
             return {
                 'success': True,
                 'message': 'Status atualizado com sucesso',
                 'compra': {
-                    'id': compra.id,
-                    'numero_pedido': compra.numero_pedido,
-                    'status': compra.status
+                    'id': item['id'],
+                    'numero_pedido': item['numero_pedido'],
+                    'status': item['status']
                 }
             }
-        except Compra.DoesNotExist:
-            return {
-                'success': False,
-                'error': 'Compra não encontrada'
-            }
         except Exception as e:
             return {
                 'success': False,
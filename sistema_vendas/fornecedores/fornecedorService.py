@@ -1,6 +1,7 @@
 from .models import Fornecedor
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
+from sistema_vendas.cache_catalogo import invalidar_catalogo
 
 
 class FornecedorService:
@@ -47,6 +48,7 @@ class FornecedorService:
                 cidade=dados.get('cidade', '').strip() or None,
                 estado=dados.get('estado', '').strip() or None,
             )
+            invalidar_catalogo('fornecedores')
             
             return True, "Fornecedor cadastrado com sucesso!", fornecedor
             
@@ -104,6 +106,7 @@ class FornecedorService:
             fornecedor.estado = dados.get('estado', '').strip() or None
             
             fornecedor.save()
+            invalidar_catalogo('fornecedores')
             
             return True, "Fornecedor atualizado com sucesso!", fornecedor
             
@@ -158,6 +161,7 @@ class FornecedorService:
             
             f = fornecedor.delete()
             print(f)
+            invalidar_catalogo('fornecedores')
             return True, "Fornecedor excluído com sucesso!"
             
         except Fornecedor.DoesNotExist:
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from fornecedores.models import Compra
+
+
+class Command(BaseCommand):
+    """
+    Verifica se o valor_total desnormalizado das compras confere com
+    a soma dos itens + frete - desconto
+
+    Uso:
+        python manage.py verificar_totais_compras
+        python manage.py verificar_totais_compras --corrigir
+    """
+
+    help = 'Verifica (e opcionalmente corrige) divergências em Compra.valor_total'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--corrigir',
+            action='store_true',
+            help='Recalcula o valor_total das compras divergentes'
+        )
+        parser.add_argument(
+            '--limite',
+            type=int,
+            default=50,
+            help='Quantidade máxima de divergências listadas na saída'
+        )
+
+    def handle(self, *args, **options):
+        # Uma única consulta: o total calculado é uma subconsulta correlacionada
+        divergentes = Compra.objects.annotate(
+            valor_calculado=Compra.expressao_valor_total()
+        ).exclude(
+            valor_total=F('valor_calculado')
+        ).order_by('id').values_list('id', 'numero_pedido', 'valor_total', 'valor_calculado')
+
+        divergentes = list(divergentes)
+
+        if not divergentes:
+            self.stdout.write(self.style.SUCCESS('Nenhuma divergência encontrada'))
+            return
+
+        for compra_id, numero_pedido, valor_total, valor_calculado in divergentes[:options['limite']]:
+            self.stdout.write(
+                f'Compra #{numero_pedido} (id {compra_id}): '
+                f'registrado {valor_total} / calculado {valor_calculado}'
+            )
+
+        if len(divergentes) > options['limite']:
+            self.stdout.write(f'... e mais {len(divergentes) - options["limite"]} compra(s)')
+
+        if not options['corrigir']:
+            raise CommandError(f'{len(divergentes)} compra(s) com valor_total divergente')
+
+        atualizadas = Compra.recalcular_valor_total(compra_id for compra_id, *_ in divergentes)
+        self.stdout.write(self.style.SUCCESS(f'{atualizadas} compra(s) corrigida(s)'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fornecedores', '0003_itemcompra'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compra',
+            index=models.Index(fields=['status', 'data_compra'], name='compra_status_data_idx'),
+        ),
+    ]
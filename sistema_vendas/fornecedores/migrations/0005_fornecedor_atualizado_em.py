@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 23:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fornecedores', '0004_compra_status_data_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fornecedor',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from decimal import Decimal
@@ -18,6 +20,8 @@ class Fornecedor(models.Model):
     bairro = models.CharField(max_length=100, blank=True, null=True)
     cidade = models.CharField(max_length=100, blank=True, null=True)
     estado = models.CharField(max_length=2, blank=True, null=True)
+    # Faz parte da versão (ETag) das compras, que exibem nome e CNPJ
+    atualizado_em = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.nome
@@ -122,9 +126,126 @@ class Compra(models.Model):
         verbose_name = 'Compra'
         verbose_name_plural = 'Compras'
         ordering = ['-data_compra']
+        indexes = [
+            models.Index(fields=['status', 'data_compra'], name='compra_status_data_idx'),
+        ]
 
     def __str__(self):
         return f"Compra #{self.numero_pedido} - {self.fornecedor}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Guarda frete e desconto carregados do banco para detectar alterações no save
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._valores_originais = (
+            instance.__dict__.get('valor_frete'),
+            instance.__dict__.get('valor_desconto'),
+        )
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """
+        Sobrescreve o método save para recompor o valor_total quando frete ou
+        desconto forem alterados
+        """
+        alterou_valores = (
+            hasattr(self, '_valores_originais')
+            and self._valores_originais != (self.valor_frete, self.valor_desconto)
+        )
+        super().save(*args, **kwargs)
+        
+        if alterou_valores:
+            Compra.recalcular_valor_total([self.pk])
+            self.valor_total = Compra.objects.values_list('valor_total', flat=True).get(pk=self.pk)
+        self._valores_originais = (self.valor_frete, self.valor_desconto)
+    
+    @staticmethod
+    def expressao_valor_total():
+        """
+        Expressão SQL do valor total de uma compra:
+        soma dos subtotais dos itens + frete - desconto (nunca negativo)
+        """
+        subtotal_itens = ItemCompra.objects.filter(
+            compra=OuterRef('pk')
+        ).order_by().values('compra').annotate(
+            total=Sum('subtotal')
+        ).values('total')
+        
+        return Greatest(
+            Coalesce(Subquery(subtotal_itens), Value(Decimal('0.00'))) + F('valor_frete') - F('valor_desconto'),
+            Value(Decimal('0.00')),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2)
+        )
+    
+    @staticmethod
+    def recalcular_valor_total(compra_ids):
+        """
+        Recalcula o valor_total das compras informadas com um único UPDATE
+        agregado
+        
+        Args:
+            compra_ids (iterable): IDs das compras afetadas
+        
+        Returns:
+            int: Quantidade de compras atualizadas
+        """
+        compra_ids = {compra_id for compra_id in compra_ids if compra_id is not None}
+        if not compra_ids:
+            return 0
+        
+        return Compra.objects.filter(id__in=compra_ids).update(
+            valor_total=Compra.expressao_valor_total(),
+            atualizado_em=timezone.now()
+        )
+
+
+class ItemCompraQuerySet(models.QuerySet):
+    """
+    QuerySet de itens que mantém Compra.valor_total atualizado também nas
+    operações em lote (bulk_create, bulk_update, update e delete)
+    """
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        Compra.recalcular_valor_total(obj.compra_id for obj in objs)
+        return objs
+    
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        linhas = super().bulk_update(objs, fields, *args, **kwargs)
+        Compra.recalcular_valor_total(obj.compra_id for obj in objs)
+        return linhas
+    
+    def update(self, **kwargs):
+        afetados = list(self.values_list('id', 'compra_id'))
+        linhas = super().update(**kwargs)
+        
+        # O subtotal depende de quantidade e preço; recalcula após a alteração
+        if 'subtotal' not in kwargs and ({'quantidade', 'preco_unitario'} & set(kwargs)):
+            models.QuerySet(self.model, using=self.db).filter(
+                id__in=[item_id for item_id, _ in afetados]
+            ).update(subtotal=F('quantidade') * F('preco_unitario'))
+        
+        compra_ids = {compra_id for _, compra_id in afetados}
+        if 'compra' in kwargs or 'compra_id' in kwargs:
+            nova_compra = kwargs.get('compra', kwargs.get('compra_id'))
+            compra_ids.add(getattr(nova_compra, 'pk', nova_compra))
+        Compra.recalcular_valor_total(compra_ids)
+        
+        return linhas
+    
+    update.alters_data = True
+    
+    def delete(self):
+        compra_ids = set(self.values_list('compra_id', flat=True))
+        resultado = super().delete()
+        Compra.recalcular_valor_total(compra_ids)
+        return resultado
+    
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class ItemCompra(models.Model):
@@ -168,6 +289,8 @@ class ItemCompra(models.Model):
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
 
+    objects = ItemCompraQuerySet.as_manager()
+
     class Meta:
         db_table = 'itens_compra'
         verbose_name = 'Item de Compra'
@@ -180,6 +303,23 @@ class ItemCompra(models.Model):
     def save(self, *args, **kwargs):
         """
         Sobrescreve o método save para calcular automaticamente o subtotal
+        e manter o valor_total da compra
         """
+        compra_anterior_id = None
+        if self.pk and not self._state.adding:
+            compra_anterior_id = ItemCompra.objects.filter(pk=self.pk).values_list('compra_id', flat=True).first()
+        
         self.subtotal = Decimal(str(self.quantidade)) * self.preco_unitario
         super().save(*args, **kwargs)
+        
+        # Mantém o total da compra (e da compra anterior, se o item mudou de compra)
+        Compra.recalcular_valor_total([self.compra_id, compra_anterior_id])
+    
+    def delete(self, *args, **kwargs):
+        """
+        Sobrescreve o método delete para atualizar o total da compra
+        """
+        compra_id = self.compra_id
+        resultado = super().delete(*args, **kwargs)
+        Compra.recalcular_valor_total([compra_id])
+        return resultado
@@ -0,0 +1,200 @@
+let itemIndex = 0;
+let fornecedores = [];
+let produtos = [];
+let datePicker;
+
+// Carregar fornecedores e produtos ao carregar a página
+document.addEventListener('DOMContentLoaded', function() {
+    carregarFornecedores();
+    carregarProdutos();
+
+    // Inicializar o calendário Flatpickr
+    datePicker = flatpickr("#data-compra", {
+        locale: "pt",
+        dateFormat: "d/m/Y",
+        defaultDate: "today",
+        maxDate: "today",
+        allowInput: true,
+        disableMobile: true
+    });
+});
+
+// Carregar fornecedores do banco
+async function carregarFornecedores() {
+    try {
+        const response = await fetch('/fornecedores/api/fornecedores/listar/');
+        const data = await response.json();
+
+        if (data.success) {
+            fornecedores = data.fornecedores;
+            const select = document.getElementById('fornecedor');
+
+            fornecedores.forEach(fornecedor => {
+                const option = document.createElement('option');
+                option.value = fornecedor.id;
+                option.textContent = fornecedor.nome;
+                select.appendChild(option);
+            });
+        }
+    } catch (error) {
+        console.error('Erro ao carregar fornecedores:', error);
+        alert('Erro ao carregar fornecedores. Verifique a conexão.');
+    }
+}
+
+// Carregar produtos do banco
+async function carregarProdutos() {
+    try {
+        const response = await fetch('/fornecedores/api/produtos/listar/');
+        const data = await response.json();
+
+        if (data.success) {
+            produtos = data.produtos;
+            atualizarSelectsProdutos();
+        }
+    } catch (error) {
+        console.error('Erro ao carregar produtos:', error);
+        alert('Erro ao carregar produtos. Verifique a conexão.');
+    }
+}
+
+// Atualizar todos os selects de produtos
+function atualizarSelectsProdutos() {
+    const selects = document.querySelectorAll('.produto-select');
+    selects.forEach(select => {
+        // Limpa opções antigas (mantém a primeira)
+        while (select.options.length > 1) {
+            select.remove(1);
+        }
+
+        // Adiciona produtos
+        produtos.forEach(produto => {
+            const option = document.createElement('option');
+            option.value = produto.id;
+            option.textContent = `${produto.descricao} - R$ ${parseFloat(produto.preco).toFixed(2)}`;
+            select.appendChild(option);
+        });
+    });
+}
+
+// Adicionar novo item
+function adicionarItem() {
+    itemIndex++;
+    const container = document.getElementById('items-container');
+    const newItem = document.createElement('div');
+    newItem.className = 'item-card';
+    newItem.setAttribute('data-item-index', itemIndex);
+    newItem.innerHTML = `
+        <div class="item-header">
+            <button type="button" class="btn-remove" onclick="removerItem(this)">
+                <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+                    <line x1="18" y1="6" x2="6" y2="18"/>
+                    <line x1="6" y1="6" x2="18" y2="18"/>
+                </svg>
+                Remover
+            </button>
+        </div>
+        <div class="form-group">
+            <label class="form-label">Produto</label>
+            <select class="form-input produto-select" required>
+                <option value="">Selecione o produto</option>
+            </select>
+        </div>
+        <div class="form-row">
+            <div class="form-group">
+                <label class="form-label">Quantidade</label>
+                <input type="number" class="form-input quantidade-input" min="1" step="1" placeholder="0" required>
+            </div>
+            <div class="form-group">
+                <label class="form-label">Preço Unitário</label>
+                <input type="number" class="form-input preco-input" min="0" step="0.01" placeholder="0.00" required>
+            </div>
+        </div>
+    `;
+    container.appendChild(newItem);
+    atualizarSelectsProdutos();
+}
+
+// Remover item
+function removerItem(button) {
+    const itemCard = button.closest('.item-card');
+    const container = document.getElementById('items-container');
+
+    // Não permite remover se for o único item
+    if (container.children.length > 1) {
+        itemCard.remove();
+    } else {
+        alert('É necessário ter pelo menos um item na compra!');
+    }
+}
+
+// Submeter formulário
+async function submitCompra(event) {
+    event.preventDefault();
+
+    // Coleta os dados do formulário
+    const dataCompra = document.getElementById('data-compra').value;
+    const idFornecedor = document.getElementById('fornecedor').value;
+    const status = document.getElementById('status').value;
+    const observacoes = document.getElementById('observacoes').value;
+
+    // Coleta os itens
+    const itens = [];
+    const itemCards = document.querySelectorAll('.item-card');
+
+    itemCards.forEach(card => {
+        const produtoSelect = card.querySelector('.produto-select');
+        const quantidadeInput = card.querySelector('.quantidade-input');
+        const precoInput = card.querySelector('.preco-input');
+
+        if (produtoSelect.value && quantidadeInput.value && precoInput.value) {
+            itens.push({
+                id_produto: parseInt(produtoSelect.value),
+                quantidade: parseInt(quantidadeInput.value),
+                preco_unitario: parseFloat(precoInput.value)
+            });
+        }
+    });
+
+    // Validações
+    if (itens.length === 0) {
+        alert('Adicione pelo menos um item à compra!');
+        return;
+    }
+
+    // Monta o objeto de dados
+    const dados = {
+        data_compra: dataCompra,
+        id_fornecedor: parseInt(idFornecedor),
+        status: status,
+        observacoes: observacoes || null,
+        itens: itens
+    };
+
+    try {
+        const response = await fetch('/fornecedores/api/compras/cadastrar/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(dados)
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            alert('Compra cadastrada com sucesso!');
+            window.location.reload();
+        } else {
+            alert('Erro ao cadastrar compra: ' + result.error);
+        }
+    } catch (error) {
+        console.error('Erro:', error);
+        alert('Erro ao cadastrar compra. Verifique a conexão.');
+    }
+}
+
+function navigateTo(page) {
+    console.log('Navegando para:', page);
+    // Adicionar lógica de navegação
+}
@@ -0,0 +1,10 @@
+from tarefas.logic import TarefaLogic
+from .compraService import CompraService
+
+
+@TarefaLogic.registrar('fornecedores.atualizar_status_compras')
+def atualizar_status_compras(parametros):
+    """
+    Aplica a transição de status a um lote de compras
+    """
+    return CompraService.transicionar_status_compras(parametros['ids'], parametros['status'])
@@ -1,10 +1,14 @@
-from django.test import TestCase, Client, TransactionTestCase
+from django.test import TestCase, Client, TransactionTestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from decimal import Decimal
 from datetime import datetime, timedelta
 import json
+from unittest import mock
 
 try:
     from .models import Fornecedor, Compra, ItemCompra
@@ -15,6 +19,7 @@ except ImportError:
 
 try:
     from produtos.models import Produto
+    from produtos.logic import ProdutoLogic
 except ImportError:
     # Se o modelo Produto não existir, criar um mock
     from django.db import models
@@ -785,3 +790,535 @@ class CompraIntegrationTest(TestCase):
         itens = resultado['compra']['itens']
         self.assertEqual(itens[0]['subtotal'], 150.00)
         self.assertEqual(itens[1]['subtotal'], 150.00)
+
+
+class CompraDetalheAPITest(TestCase):
+    """Testes para a API de detalhe de compra (itens e cache condicional)"""
+    
+    def setUp(self):
+        self.client = Client()
+        
+        self.fornecedor = Fornecedor.objects.create(
+            nome="Fornecedor Detalhe",
+            cnpj="12.345.678/0001-90"
+        )
+        
+        self.compra = Compra.objects.create(
+            numero_pedido="COMP-20251119-0001",
+            fornecedor=self.fornecedor,
+            valor_total=Decimal('0.00')
+        )
+        
+        for i in range(3):
+            produto = Produto.objects.create(
+                descricao=f"Produto {i}",
+                preco=Decimal('10.00'),
+                fornecedor=self.fornecedor
+            )
+            ItemCompra.objects.create(
+                compra=self.compra,
+                produto=produto,
+                quantidade=i + 1,
+                preco_unitario=Decimal('5.00')
+            )
+    
+    def test_buscar_compra_inclui_itens(self):
+        """Testa se o detalhe traz itens e produtos com consultas fixas"""
+        with self.assertNumQueries(2):
+            resultado = CompraService.buscar_compra_por_id(self.compra.id)
+        
+        self.assertTrue(resultado['success'])
+        itens = resultado['compra']['itens']
+        self.assertEqual(len(itens), 3)
+        self.assertEqual(itens[0]['produto']['descricao'], 'Produto 0')
+        self.assertEqual(itens[2]['subtotal'], 15.0)
+        self.assertEqual(resultado['compra']['fornecedor']['nome'], 'Fornecedor Detalhe')
+    
+    def test_api_retorna_304_sem_alteracao(self):
+        """Testa se a API responde 304 quando a compra não mudou"""
+        url = f'/fornecedores/api/compras/{self.compra.id}/'
+        response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        
+        with self.assertNumQueries(1):
+            response_cache = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        
+        self.assertEqual(response_cache.status_code, 304)
+    
+    def test_api_etag_muda_ao_alterar_itens(self):
+        """Testa se a ETag muda quando um item é removido"""
+        url = f'/fornecedores/api/compras/{self.compra.id}/'
+        etag = self.client.get(url)['ETag']
+        
+        self.compra.itens.first().delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['compra']['itens']), 2)
+    
+    def test_api_etag_muda_ao_alterar_produto_e_fornecedor(self):
+        """Testa se a ETag muda quando o produto ou o fornecedor exibidos mudam"""
+        url = f'/fornecedores/api/compras/{self.compra.id}/'
+        etag = self.client.get(url)['ETag']
+        
+        produto = self.compra.itens.order_by('id').first().produto
+        produto.descricao = 'Produto Renomeado'
+        produto.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['compra']['itens'][0]['produto']['descricao'], 'Produto Renomeado')
+        
+        etag = response['ETag']
+        self.fornecedor.nome = 'Fornecedor Renomeado'
+        self.fornecedor.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['compra']['fornecedor']['nome'], 'Fornecedor Renomeado')
+    
+    def test_api_compra_inexistente(self):
+        """Testa a API com compra inexistente"""
+        response = self.client.get('/fornecedores/api/compras/99999/')
+        
+        self.assertEqual(response.status_code, 404)
+
+
+class HistoricoComprasFornecedorTest(TestCase):
+    """Testes para a tela de histórico de compras do fornecedor"""
+    
+    def setUp(self):
+        self.client = Client()
+        
+        self.fornecedor = Fornecedor.objects.create(
+            nome="Fornecedor Histórico",
+            cnpj="12.345.678/0001-90"
+        )
+        
+        for i in range(25):
+            Compra.objects.create(
+                numero_pedido=f"COMP-20251119-{i:04d}",
+                fornecedor=self.fornecedor,
+                valor_total=Decimal('10.00'),
+                status='pendente' if i % 5 == 0 else 'concluida'
+            )
+    
+    def test_resumo_compras_fornecedor(self):
+        """Testa os indicadores calculados em uma única consulta"""
+        with self.assertNumQueries(1):
+            resumo = CompraService.resumir_compras_fornecedor(self.fornecedor.id)
+        
+        self.assertEqual(resumo['total_pedidos'], 25)
+        self.assertEqual(resumo['total_investido'], Decimal('250.00'))
+        self.assertEqual(resumo['pedidos_pendentes'], 5)
+    
+    def test_resumo_fornecedor_sem_compras(self):
+        """Testa os indicadores de um fornecedor sem compras"""
+        outro = Fornecedor.objects.create(nome="Outro", cnpj="98.765.432/0001-10")
+        
+        resumo = CompraService.resumir_compras_fornecedor(outro.id)
+        
+        self.assertEqual(resumo['total_pedidos'], 0)
+        self.assertEqual(resumo['total_investido'], Decimal('0.00'))
+    
+    def test_historico_paginado(self):
+        """Testa se a tela exibe apenas a página solicitada"""
+        url = f'/fornecedores/historico/{self.fornecedor.id}'
+        
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['pedidos']), 20)
+        self.assertEqual(response.context['total_pedidos'], 25)
+        self.assertContains(response, 'Página 1 de 2')
+        
+        response = self.client.get(url, {'pagina': 2})
+        self.assertEqual(len(response.context['pedidos']), 5)
+
+
+class TransicaoStatusCompraTest(TestCase):
+    """Testes para a máquina de estados de status da compra"""
+    
+    def setUp(self):
+        self.fornecedor = Fornecedor.objects.create(
+            nome="Fornecedor Status",
+            cnpj="12.345.678/0001-90"
+        )
+        
+        self.produto = Produto.objects.create(
+            descricao="Produto Estoque",
+            preco=Decimal('10.00'),
+            qtd_estoque=5,
+            fornecedor=self.fornecedor
+        )
+        
+        self.compras = []
+        for i in range(3):
+            compra = Compra.objects.create(
+                numero_pedido=f"COMP-20251119-{i:04d}",
+                fornecedor=self.fornecedor,
+                status='pendente'
+            )
+            ItemCompra.objects.create(
+                compra=compra,
+                produto=self.produto,
+                quantidade=10,
+                preco_unitario=Decimal('5.00')
+            )
+            self.compras.append(compra)
+    
+    def test_transicao_em_lote(self):
+        """Testa a transição de várias compras em uma chamada"""
+        ids = [c.id for c in self.compras]
+        
+        resultado = CompraService.transicionar_status_compras(ids, 'processando')
+        
+        self.assertTrue(resultado['success'])
+        self.assertEqual(resultado['atualizadas'], 3)
+        self.assertEqual(Compra.objects.filter(status='processando').count(), 3)
+    
+    def test_transicao_nao_permitida(self):
+        """Testa que compras em status final não mudam"""
+        CompraService.transicionar_status_compras([self.compras[0].id], 'cancelada')
+        
+        resultado = CompraService.transicionar_status_compras(
+            [self.compras[0].id, self.compras[1].id, 99999], 'processando'
+        )
+        
+        self.assertEqual(resultado['atualizadas'], 1)
+        por_id = {r['id']: r for r in resultado['resultados']}
+        self.assertFalse(por_id[self.compras[0].id]['success'])
+        self.assertIn('não permitida', por_id[self.compras[0].id]['error'])
+        self.assertTrue(por_id[self.compras[1].id]['success'])
+        self.assertIn('não encontrada', por_id[99999]['error'])
+        
+        self.compras[0].refresh_from_db()
+        self.assertEqual(self.compras[0].status, 'cancelada')
+    
+    def test_conclusao_registra_entrada_estoque(self):
+        """Testa a entrada no estoque ao concluir compras"""
+        ids = [self.compras[0].id, self.compras[1].id]
+        
+        CompraService.transicionar_status_compras(ids, 'concluida')
+        
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.qtd_estoque, 25)
+        
+        compra = Compra.objects.get(id=self.compras[0].id)
+        self.assertIsNotNone(compra.data_entrega_realizada)
+        
+        # Concluir novamente não pode duplicar a entrada no estoque
+        resultado = CompraService.transicionar_status_compras(ids, 'concluida')
+        self.assertEqual(resultado['atualizadas'], 0)
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.qtd_estoque, 25)
+    
+    def test_entrada_estoque_publica_evento(self):
+        """Testa o evento de estoque publicado após o commit da conclusão"""
+        from sistema_vendas.eventos import canal_eventos
+        
+        inicio = canal_eventos.ultimo_id()
+        with self.captureOnCommitCallbacks(execute=True):
+            CompraService.transicionar_status_compras([self.compras[0].id], 'concluida')
+        
+        eventos = [e for e in canal_eventos.desde(inicio) if e['tipo'] == 'estoque']
+        self.assertEqual(len(eventos), 1)
+        self.assertEqual(eventos[0]['dados']['produtos'], [{'id': self.produto.id, 'qtd_estoque': 15}])
+    
+    def test_cadastrar_compra_concluida_registra_entrada_estoque(self):
+        """Testa que a compra cadastrada como concluída passa pela máquina de estados"""
+        dados = {
+            'data_compra': '19/11/2025',
+            'id_fornecedor': self.fornecedor.id,
+            'status': 'concluida',
+            'itens': [
+                {
+                    'id_produto': self.produto.id,
+                    'quantidade': 4,
+                    'preco_unitario': 10.00
+                }
+            ]
+        }
+        
+        resultado = CompraService.cadastrar_compra(dados)
+        
+        self.assertTrue(resultado['success'])
+        self.assertEqual(resultado['compra']['status'], 'concluida')
+        compra = Compra.objects.get(id=resultado['compra']['id'])
+        self.assertIsNotNone(compra.data_entrega_realizada)
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.qtd_estoque, 9)
+    
+    def test_cadastrar_compra_status_invalido(self):
+        """Testa que status desconhecido é rejeitado no cadastro"""
+        dados = {
+            'data_compra': '19/11/2025',
+            'id_fornecedor': self.fornecedor.id,
+            'status': 'entregue',
+            'itens': [
+                {
+                    'id_produto': self.produto.id,
+                    'quantidade': 4,
+                    'preco_unitario': 10.00
+                }
+            ]
+        }
+        
+        resultado = CompraService.cadastrar_compra(dados)
+        
+        self.assertFalse(resultado['success'])
+        self.assertIn('Status inválido', resultado['error'])
+        self.assertEqual(Compra.objects.count(), 3)
+    
+    def test_atualizar_status_compra_transicao_invalida(self):
+        """Testa a atualização individual com transição não permitida"""
+        CompraService.atualizar_status_compra(self.compras[0].id, 'concluida')
+        
+        resultado = CompraService.atualizar_status_compra(self.compras[0].id, 'pendente')
+        
+        self.assertFalse(resultado['success'])
+        self.assertIn('não permitida', resultado['error'])
+
+
+class AtualizarStatusLoteAPITest(TestCase):
+    """Testes para a API de atualização de status em lote"""
+    
+    def setUp(self):
+        self.client = Client()
+        
+        self.fornecedor = Fornecedor.objects.create(
+            nome="Fornecedor Lote",
+            cnpj="12.345.678/0001-90"
+        )
+        
+        self.ids = [
+            Compra.objects.create(
+                numero_pedido=f"COMP-20251119-{i:04d}",
+                fornecedor=self.fornecedor,
+                status='pendente'
+            ).id
+            for i in range(5)
+        ]
+    
+    def patch(self, dados):
+        return self.client.patch(
+            '/fornecedores/api/compras/status/',
+            data=json.dumps(dados),
+            content_type='application/json'
+        )
+    
+    def test_atualizar_lote(self):
+        """Testa o fechamento de várias compras em uma requisição"""
+        response = self.patch({'ids': self.ids + [99999], 'status': 'concluida'})
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['atualizadas'], 5)
+        self.assertEqual(len(data['resultados']), 6)
+        self.assertFalse(data['resultados'][-1]['success'])
+        self.assertEqual(Compra.objects.filter(status='concluida').count(), 5)
+    
+    def test_atualizar_lote_consultas_fixas(self):
+        """Testa que o custo não cresce com a quantidade de compras"""
+        with CaptureQueriesContext(connection) as consultas:
+            CompraService.transicionar_status_compras(self.ids, 'processando')
+        
+        # Ignora SAVEPOINT/RELEASE da transação
+        sqls = [q['sql'] for q in consultas.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(sqls), 2)
+    
+    def test_atualizar_lote_sem_ids(self):
+        """Testa requisição sem lista de IDs"""
+        response = self.patch({'status': 'concluida'})
+        
+        self.assertEqual(response.status_code, 400)
+    
+    def test_atualizar_lote_status_invalido(self):
+        """Testa requisição com status inválido"""
+        response = self.patch({'ids': self.ids, 'status': 'entregue'})
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('inválido', response.json()['error'])
+
+
+class ValorTotalCompraTest(TestCase):
+    """Testes para a manutenção do valor_total desnormalizado da compra"""
+    
+    def setUp(self):
+        self.fornecedor = Fornecedor.objects.create(
+            nome="Fornecedor Total",
+            cnpj="12.345.678/0001-90"
+        )
+        
+        self.produto = Produto.objects.create(
+            descricao="Produto Total",
+            preco=Decimal('10.00'),
+            fornecedor=self.fornecedor
+        )
+        
+        self.compra = Compra.objects.create(
+            numero_pedido="COMP-20251120-0001",
+            fornecedor=self.fornecedor,
+            valor_frete=Decimal('15.00'),
+            valor_desconto=Decimal('5.00')
+        )
+    
+    def valor_total(self):
+        """Helper que lê o valor_total gravado no banco"""
+        return Compra.objects.values_list('valor_total', flat=True).get(pk=self.compra.pk)
+    
+    def criar_item(self, quantidade=2, preco='10.00'):
+        """Helper para criar item"""
+        return ItemCompra.objects.create(
+            compra=self.compra,
+            produto=self.produto,
+            quantidade=quantidade,
+            preco_unitario=Decimal(preco)
+        )
+    
+    def test_item_criado_alterado_e_excluido(self):
+        """Testa o total ao criar, alterar e excluir um item"""
+        item = self.criar_item()
+        self.assertEqual(self.valor_total(), Decimal('30.00'))
+        
+        item.quantidade = 5
+        item.save()
+        self.assertEqual(self.valor_total(), Decimal('60.00'))
+        
+        item.delete()
+        self.assertEqual(self.valor_total(), Decimal('10.00'))
+    
+    def test_operacoes_em_lote(self):
+        """Testa o total em bulk_create, update e delete de QuerySet"""
+        ItemCompra.objects.bulk_create([
+            ItemCompra(compra=self.compra, produto=self.produto, quantidade=1,
+                       preco_unitario=Decimal('20.00'), subtotal=Decimal('20.00'))
+            for _ in range(3)
+        ])
+        self.assertEqual(self.valor_total(), Decimal('70.00'))
+        
+        ItemCompra.objects.filter(compra=self.compra).update(quantidade=2)
+        self.assertEqual(self.valor_total(), Decimal('130.00'))
+        
+        ItemCompra.objects.filter(compra=self.compra).delete()
+        self.assertEqual(self.valor_total(), Decimal('10.00'))
+    
+    def test_alteracao_frete_desconto(self):
+        """Testa que alterar frete ou desconto recompõe o total"""
+        self.criar_item()
+        compra = Compra.objects.get(pk=self.compra.pk)
+        
+        compra.valor_desconto = Decimal('25.00')
+        compra.save()
+        
+        self.assertEqual(compra.valor_total, Decimal('10.00'))
+        self.assertEqual(self.valor_total(), Decimal('10.00'))
+    
+    def test_recalculo_em_uma_consulta(self):
+        """Testa que o recálculo é um único UPDATE"""
+        self.criar_item()
+        
+        with CaptureQueriesContext(connection) as consultas:
+            Compra.recalcular_valor_total([self.compra.pk])
+        
+        self.assertEqual(len(consultas.captured_queries), 1)
+    
+    def test_comando_verificar_totais(self):
+        """Testa a detecção e correção de divergências pelo comando"""
+        from io import StringIO
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        
+        self.criar_item()
+        Compra.objects.filter(pk=self.compra.pk).update(valor_total=Decimal('999.00'))
+        
+        with self.assertRaises(CommandError):
+            call_command('verificar_totais_compras', stdout=StringIO())
+        
+        saida = StringIO()
+        call_command('verificar_totais_compras', corrigir=True, stdout=saida)
+        
+        self.assertIn('1 compra(s) corrigida(s)', saida.getvalue())
+        self.assertEqual(self.valor_total(), Decimal('30.00'))
+
+
+class CacheCatalogoTest(TestCase):
+    """Testes do cache versionado das APIs de catálogo"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        
+        sucesso, _, self.fornecedor = FornecedorService.cadastrar_fornecedor({
+            'nome': 'Fornecedor Catálogo',
+            'cnpj': '12.345.678/0001-90'
+        })
+        self.assertTrue(sucesso)
+    
+    def listar(self, **headers):
+        """Helper que consulta a API de fornecedores"""
+        return self.client.get('/fornecedores/api/fornecedores/listar/', headers=headers)
+    
+    def test_resposta_em_cache_sem_consulta(self):
+        """Testa que a segunda requisição não consulta o banco"""
+        primeira = self.listar()
+        
+        with CaptureQueriesContext(connection) as consultas:
+            segunda = self.listar()
+        
+        self.assertEqual(consultas.captured_queries, [])
+        self.assertEqual(primeira.content, segunda.content)
+        self.assertEqual(primeira['ETag'], segunda['ETag'])
+    
+    def test_get_condicional_retorna_304(self):
+        """Testa que o ETag atual retorna 304"""
+        etag = self.listar()['ETag']
+        
+        response = self.listar(if_none_match=etag)
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+    
+    def test_escrita_pelo_service_invalida(self):
+        """Testa que alterar um fornecedor gera nova versão da resposta"""
+        etag = self.listar()['ETag']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            FornecedorService.editar_fornecedor(self.fornecedor.id, {
+                'nome': 'Fornecedor Renomeado',
+                'cnpj': '12.345.678/0001-90'
+            })
+        
+        response = self.listar(if_none_match=etag)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['fornecedores'][0]['nome'], 'Fornecedor Renomeado')
+    
+    def test_geracoes_independentes(self):
+        """Testa que escrita em produtos não invalida fornecedores"""
+        etag = self.listar()['ETag']
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            ProdutoLogic.criar_produto('Produto Catálogo', Decimal('5.00'), 1, self.fornecedor.id)
+        
+        self.assertEqual(self.listar(if_none_match=etag).status_code, 304)
+        produtos = self.client.get('/fornecedores/api/produtos/listar/').json()['produtos']
+        self.assertEqual(produtos[0]['descricao'], 'Produto Catálogo')
+    
+    @override_settings(COMPRESSAO_TAMANHO_MINIMO=0)
+    def test_resposta_comprimida_reaproveitada(self):
+        """Testa que o corpo comprimido fica no cache e o ETag fraco retorna 304"""
+        primeira = self.listar(accept_encoding='gzip')
+        
+        with mock.patch('sistema_vendas.compressao.comprimir') as comprimir:
+            segunda = self.listar(accept_encoding='gzip')
+        
+        comprimir.assert_not_called()
+        self.assertEqual(segunda['Content-Encoding'], 'gzip')
+        self.assertEqual(primeira.content, segunda.content)
+        self.assertTrue(segunda['ETag'].startswith('W/'))
+        
+        self.assertEqual(self.listar(if_none_match=segunda['ETag']).status_code, 304)
@@ -27,6 +27,7 @@ urlpatterns = [
     path('api/compras/listar/', views.listar_compras_api, name='api_listar_compras'),
     path('api/compras/<int:compra_id>/', views.buscar_compra_api, name='api_buscar_compra'),
     path('api/compras/<int:compra_id>/status/', views.atualizar_status_compra_api, name='api_atualizar_status_compra'),
+    path('api/compras/status/', views.atualizar_status_compras_lote_api, name='api_atualizar_status_compras_lote'),
     
     # APIs Auxiliares
     path('api/fornecedores/listar/', views.listar_fornecedores_api, name='api_listar_fornecedores'),
@@ -1,15 +1,27 @@
 from django.shortcuts import render, redirect
 from django.template import loader
-from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.middleware import csrf
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
+from sistema_vendas.cache_catalogo import resposta_versionada
+from sistema_vendas.db_router import usar_replica
+from sistema_vendas.respostas import RespostaJSON
+from tarefas.logic import TarefaLogic
+from tarefas.views import resposta_tarefa_enfileirada
 from .fornecedorService import FornecedorService
-from .compraService import CompraService
+from .compraService import CompraService, TRANSICOES_STATUS
 from .models import Fornecedor
+import hashlib
 import json
 
+# Quantidade de compras por página no histórico do fornecedor
+COMPRAS_POR_PAGINA = 20
+
+# Quantidade máxima de compras por atualização de status em lote
+LIMITE_COMPRAS_LOTE = 1000
+
 # Cadastro de fornecedor (já existente)
 def cadastrar_fornecedor(request):
     if request.method == 'GET':
@@ -174,6 +186,7 @@ def compra_fornecedor(request):
     else:
         return HttpResponseBadRequest("método de request inválido :c")
 
+@usar_replica
 def historico_compras_fornecedor(request, fornecedor_id):
     """
     Tela de histórico de compras de um fornecedor específico
@@ -185,16 +198,24 @@ def historico_compras_fornecedor(request, fornecedor_id):
             # Busca o fornecedor
             fornecedor = Fornecedor.objects.get(id=fornecedor_id)
             
-            # Busca as compras do fornecedor usando o serviço
-            resultado = CompraService.listar_compras({'fornecedor_id': fornecedor_id})
+            # Busca apenas a página atual das compras do fornecedor
+            resultado = CompraService.listar_compras_paginado(
+                {'fornecedor_id': fornecedor_id},
+                pagina=request.GET.get('pagina', 1),
+                por_pagina=COMPRAS_POR_PAGINA
+            )
+            
+            # Indicadores calculados no banco, em uma única consulta
+            resumo = CompraService.resumir_compras_fornecedor(fornecedor_id)
             
             # Prepara os dados para o template
             context = {
                 'fornecedor': fornecedor,
                 'pedidos': resultado.get('compras', []),
-                'total_pedidos': len(resultado.get('compras', [])),
-                'total_investido': sum(compra.get('valor_total', 0) for compra in resultado.get('compras', [])),
-                'pedidos_pendentes': sum(1 for compra in resultado.get('compras', []) if compra.get('status') == 'pendente')
+                'paginacao': resultado.get('paginacao'),
+                'total_pedidos': resumo['total_pedidos'],
+                'total_investido': resumo['total_investido'],
+                'pedidos_pendentes': resumo['pedidos_pendentes']
             }
             
             template = loader.get_template('historicoComprasInterface.html')
@@ -241,17 +262,17 @@ def cadastrar_compra_api(request):
         resultado = CompraService.cadastrar_compra(dados, usuario)
         
         if resultado['success']:
-            return JsonResponse(resultado, status=201)
+            return RespostaJSON(resultado, status=201)
         else:
-            return JsonResponse(resultado, status=400)
+            return RespostaJSON(resultado, status=400)
             
     except json.JSONDecodeError:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': 'JSON inválido'
         }, status=400)
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': f'Erro interno: {str(e)}'
         }, status=500)
@@ -259,6 +280,7 @@ def cadastrar_compra_api(request):
 
 @csrf_exempt
 @require_http_methods(["GET"] )
+@usar_replica
 def listar_compras_api(request):
     """
     API para listar compras com filtros opcionais
@@ -281,31 +303,57 @@ def listar_compras_api(request):
         filtros = {k: v for k, v in filtros.items() if v}
         
         resultado = CompraService.listar_compras(filtros)
-        return JsonResponse(resultado)
+        return RespostaJSON(resultado)
         
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': f'Erro ao listar compras: {str(e)}'
         }, status=500)
 
 
+def _versao_compra(request, compra_id):
+    """Versão da compra, consultada uma única vez por requisição"""
+    if not hasattr(request, '_versao_compra'):
+        request._versao_compra = CompraService.obter_versao_compra(compra_id)
+    return request._versao_compra
+
+
+def _etag_compra(request, compra_id):
+    versao = _versao_compra(request, compra_id)
+    if versao is None:
+        return None
+    atualizado_em, quantidade_itens, criado_por = versao
+    # O usuário não tem data de alteração: o nome entra na ETag
+    criado_por = hashlib.md5(criado_por.encode()).hexdigest()[:8]
+    return f'"compra-{compra_id}-{atualizado_em.timestamp()}-{quantidade_itens}-{criado_por}"'
+
+
+def _ultima_modificacao_compra(request, compra_id):
+    versao = _versao_compra(request, compra_id)
+    return versao[0] if versao else None
+
+
 @csrf_exempt
 @require_http_methods(["GET"] )
+@condition(etag_func=_etag_compra, last_modified_func=_ultima_modificacao_compra)
 def buscar_compra_api(request, compra_id):
     """
-    API para buscar uma compra específica pelo ID
+    API para buscar uma compra específica pelo ID, com seus itens
+    
+    Responde 304 sem serializar a compra quando o cliente envia
+    If-None-Match/If-Modified-Since da versão atual.
     """
     try:
         resultado = CompraService.buscar_compra_por_id(compra_id)
         
         if resultado['success']:
-            return JsonResponse(resultado)
+            return RespostaJSON(resultado)
         else:
-            return JsonResponse(resultado, status=404)
+            return RespostaJSON(resultado, status=404)
             
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': f'Erro ao buscar compra: {str(e)}'
         }, status=500)
@@ -327,7 +375,7 @@ def atualizar_status_compra_api(request, compra_id):
         novo_status = dados.get('status')
         
         if not novo_status:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': False,
                 'error': 'O campo "status" é obrigatório'
             }, status=400)
@@ -335,17 +383,89 @@ def atualizar_status_compra_api(request, compra_id):
         resultado = CompraService.atualizar_status_compra(compra_id, novo_status)
         
         if resultado['success']:
-            return JsonResponse(resultado)
+            return RespostaJSON(resultado)
+        else:
+            return RespostaJSON(resultado, status=400)
+            
+    except json.JSONDecodeError:
+        return RespostaJSON({
+            'success': False,
+            'error': 'JSON inválido'
+        }, status=400)
+    except Exception as e:
+        return RespostaJSON({
+            'success': False,
+            'error': f'Erro ao atualizar status: {str(e)}'
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["PUT", "PATCH"] )
+def atualizar_status_compras_lote_api(request):
+    """
+    API para atualizar o status de várias compras de uma vez
+    
+    Esperado no body (JSON):
+    {
+        "ids": [1, 2, 3],
+        "status": "concluida"
+    }
+    
+    Todas as compras são validadas em uma consulta e atualizadas com um
+    único UPDATE; o retorno traz o resultado de cada ID.
+    Com "assincrono": true a atualização é feita pelo worker e a resposta
+    traz o ID da tarefa (consultar em /tarefas/api/<id>/).
+    """
+    try:
+        dados = json.loads(request.body)
+        ids = dados.get('ids')
+        novo_status = dados.get('status')
+        
+        if not novo_status:
+            return RespostaJSON({
+                'success': False,
+                'error': 'O campo "status" é obrigatório'
+            }, status=400)
+        
+        if not isinstance(ids, list) or not ids:
+            return RespostaJSON({
+                'success': False,
+                'error': 'O campo "ids" deve ser uma lista não vazia'
+            }, status=400)
+        
+        if len(ids) > LIMITE_COMPRAS_LOTE:
+            return RespostaJSON({
+                'success': False,
+                'error': f'Máximo de {LIMITE_COMPRAS_LOTE} compras por requisição'
+            }, status=400)
+        
+        if dados.get('assincrono'):
+            if novo_status not in TRANSICOES_STATUS:
+                return RespostaJSON({
+                    'success': False,
+                    'error': f'Status inválido. Valores aceitos: {", ".join(TRANSICOES_STATUS)}'
+                }, status=400)
+            
+            tarefa = TarefaLogic.enfileirar(
+                'fornecedores.atualizar_status_compras',
+                {'ids': ids, 'status': novo_status}
+            )
+            return resposta_tarefa_enfileirada(tarefa)
+        
+        resultado = CompraService.transicionar_status_compras(ids, novo_status)
+        
+        if resultado['success']:
+            return RespostaJSON(resultado)
         else:
-            return JsonResponse(resultado, status=400)
+            return RespostaJSON(resultado, status=400)
             
     except json.JSONDecodeError:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': 'JSON inválido'
         }, status=400)
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': f'Erro ao atualizar status: {str(e)}'
         }, status=500)
@@ -353,6 +473,7 @@ def atualizar_status_compra_api(request, compra_id):
 
 @csrf_exempt
 @require_http_methods(["GET"] )
+@resposta_versionada('fornecedores')
 def listar_fornecedores_api(request):
     """
     API para listar todos os fornecedores
@@ -360,7 +481,7 @@ def listar_fornecedores_api(request):
     try:
         fornecedores = Fornecedor.objects.all()
         
-        return JsonResponse({
+        return RespostaJSON({
             'success': True,
             'fornecedores': [
                 {
@@ -377,7 +498,7 @@ def listar_fornecedores_api(request):
             ]
         })
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': f'Erro ao listar fornecedores: {str(e)}'
         }, status=500)
@@ -385,6 +506,7 @@ def listar_fornecedores_api(request):
 
 @csrf_exempt
 @require_http_methods(["GET"] )
+@resposta_versionada('produtos')
 def listar_produtos_api(request):
     """
     API para listar todos os produtos
@@ -393,20 +515,20 @@ def listar_produtos_api(request):
         from produtos.models import Produto
         produtos = Produto.objects.all()
         
-        return JsonResponse({
+        return RespostaJSON({
             'success': True,
             'produtos': [
                 {
                     'id': p.id,
                     'descricao': p.descricao,
-                    'preco': float(p.preco),
+                    'preco': p.preco,
                     'estoque': p.qtd_estoque
                 }
                 for p in produtos
             ]
         })
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': f'Erro ao listar produtos: {str(e)}'
         }, status=500)
@@ -1,7 +1,8 @@
 from django.shortcuts import render
 from django.template import loader
-from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseRedirect, HttpResponseServerError ,JsonResponse
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseRedirect, HttpResponseServerError
 from django.middleware import csrf
+from sistema_vendas.respostas import RespostaJSON
 from .logic import buscarFuncionario, buscarFuncionários, apagarFuncionario, salvarFuncionario, editarFuncionario
 
 # Create your views here.
@@ -16,7 +17,7 @@ def ConsultarFuncionarios(request):
 def ListarFuncionarios(request):
     if request.method == 'GET':
         responseData = buscarFuncionários()
-        return JsonResponse(responseData, safe=False)
+        return RespostaJSON(responseData, safe=False)
     else:
         return HttpResponseBadRequest("método de requisição inválido :c")
 
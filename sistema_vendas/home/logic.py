@@ -1,4 +1,20 @@
+from django.conf import settings
+from django.db.models import Count, DecimalField, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from decimal import Decimal
+from datetime import timedelta
+from fornecedores.models import Compra
 from funcionarios.models import Funcionario
+from produtos.logic import ProdutoLogic
+from produtos.models import Produto
+from sistema_vendas.cache_revalidacao import cache_revalidado
+from vendas.logic import VendaLogic
+
+
+# Status de compra ainda não recebida
+STATUS_COMPRA_PENDENTE = ('pendente', 'processando')
+
 
 def validarLogin(loginData):
     email = str(loginData['email'])
@@ -14,4 +30,73 @@ def validarLogin(loginData):
     if "admin@admin.com" == email and "admin" == senha:
             return True
     return False
-    
\ No newline at end of file
+    
+
+class DashboardLogic:
+    """
+    Indicadores do painel gerencial
+
+    Cada indicador vem de um agregado já preparado: os totais e o ranking
+    usam o cache por dia dos relatórios de vendas (dias encerrados já
+    calculados, só hoje vai ao banco), e estoque baixo e compras pendentes
+    são consultas limitadas sobre índices. O painel inteiro fica no cache
+    com revalidação em segundo plano, então o número de consultas é fixo e
+    não cresce com o volume de vendas.
+    """
+
+    @staticmethod
+    @cache_revalidado('home.indicadores', fresco=10, maximo=120)
+    def indicadores():
+        """
+        Monta os indicadores do painel
+
+        Returns:
+            dict: vendas_hoje, produtos_mais_vendidos, estoque_baixo e
+                compras_pendentes
+        """
+        hoje = timezone.localdate()
+        inicio_ranking = hoje - timedelta(days=getattr(settings, 'DASHBOARD_DIAS_RANKING', 7) - 1)
+
+        totais = VendaLogic.totais_vendas_periodo(hoje, hoje)
+        ticket_medio = (totais['total'] / totais['quantidade']).quantize(Decimal('0.01')) if totais['quantidade'] else Decimal('0.00')
+
+        mais_vendidos = ProdutoLogic.relatorio_produtos_vendidos(
+            inicio_ranking.strftime('%d/%m/%Y'), hoje.strftime('%d/%m/%Y'), limite=5
+        )
+
+        estoque_baixo = list(
+            Produto.objects.filter(
+                qtd_estoque__lte=getattr(settings, 'ESTOQUE_MINIMO', 10)
+            ).order_by('qtd_estoque', 'id').values('id', 'descricao', 'qtd_estoque')[:10]
+        )
+
+        # Compras ainda não recebidas (pendentes ou em processamento)
+        compras_pendentes = Compra.objects.filter(status__in=STATUS_COMPRA_PENDENTE).aggregate(
+            quantidade=Count('id'),
+            valor_total=Coalesce(Sum('valor_total'), Decimal('0.00'), output_field=DecimalField())
+        )
+        compras_pendentes['proximas'] = [
+            {
+                'id': compra.id,
+                'numero_pedido': compra.numero_pedido,
+                'fornecedor': compra.fornecedor.nome,
+                'status': compra.get_status_display(),
+                'data_entrega_prevista': compra.data_entrega_prevista.strftime('%d/%m/%Y') if compra.data_entrega_prevista else None
+            }
+            for compra in Compra.objects.filter(
+                status__in=STATUS_COMPRA_PENDENTE
+            ).select_related('fornecedor').order_by('data_compra')[:5]
+        ]
+
+        return {
+            'data': hoje.strftime('%d/%m/%Y'),
+            'vendas_hoje': {
+                'total': totais['total'],
+                'quantidade': totais['quantidade'],
+                'ticket_medio': ticket_medio
+            },
+            'produtos_mais_vendidos': mais_vendidos,
+            'estoque_baixo': estoque_baixo,
+            'compras_pendentes': compras_pendentes,
+            'atualizado_em': timezone.now()
+        }
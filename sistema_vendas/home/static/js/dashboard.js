@@ -0,0 +1,83 @@
+// Painel gerencial: os indicadores vêm renderizados na página e são
+// atualizados periodicamente pela API (servida do cache do servidor)
+const INTERVALO_ATUALIZACAO_MS = 30000;
+
+const painel = document.getElementById('painel');
+const URL_INDICADORES = painel.dataset.urlIndicadores;
+
+
+// Formatar valor para moeda brasileira
+function formatarMoeda(valor) {
+    return 'R$ ' + Number(valor).toLocaleString('pt-BR', {
+        minimumFractionDigits: 2,
+        maximumFractionDigits: 2
+    });
+}
+
+// Evita injeção de HTML nos textos vindos do cadastro
+function escaparHtml(texto) {
+    const div = document.createElement('div');
+    div.textContent = texto ?? '';
+    return div.innerHTML;
+}
+
+function preencherTabela(id, linhas, colunas, mensagemVazia) {
+    const tbody = document.getElementById(id);
+
+    if (linhas.length === 0) {
+        tbody.innerHTML = `<tr><td colspan="${colunas}" class="empty">${mensagemVazia}</td></tr>`;
+        return;
+    }
+
+    tbody.innerHTML = linhas
+        .map(celulas => '<tr>' + celulas.map(celula => `<td>${escaparHtml(String(celula))}</td>`).join('') + '</tr>')
+        .join('');
+}
+
+function exibirIndicadores(indicadores) {
+    const vendas = indicadores.vendas_hoje;
+    const compras = indicadores.compras_pendentes;
+
+    document.getElementById('faturamentoHoje').textContent = formatarMoeda(vendas.total);
+    document.getElementById('quantidadeVendas').textContent = vendas.quantidade;
+    document.getElementById('ticketMedio').textContent = formatarMoeda(vendas.ticket_medio);
+    document.getElementById('comprasPendentes').textContent = compras.quantidade;
+    document.getElementById('valorComprasPendentes').textContent = formatarMoeda(compras.valor_total);
+    document.getElementById('atualizadoEm').textContent = new Date(indicadores.atualizado_em).toLocaleString('pt-BR');
+
+    preencherTabela(
+        'maisVendidos',
+        indicadores.produtos_mais_vendidos.map(p => [p.descricao, p.quantidade_vendida, p.valor_total]),
+        3,
+        'Nenhuma venda no período'
+    );
+    preencherTabela(
+        'estoqueBaixo',
+        indicadores.estoque_baixo.map(p => [p.id, p.descricao, p.qtd_estoque]),
+        3,
+        'Nenhum produto com estoque baixo'
+    );
+    preencherTabela(
+        'proximasCompras',
+        compras.proximas.map(c => [c.numero_pedido, c.fornecedor, c.status, c.data_entrega_prevista || '-']),
+        4,
+        'Nenhuma compra pendente'
+    );
+}
+
+async function atualizarIndicadores() {
+    try {
+        const response = await fetch(URL_INDICADORES);
+        const result = await response.json();
+
+        if (result.success) {
+            exibirIndicadores(result.indicadores);
+        } else {
+            console.error('Erro ao atualizar indicadores:', result.error);
+        }
+    } catch (error) {
+        console.error('Erro ao atualizar indicadores:', error);
+    }
+}
+
+setInterval(atualizarIndicadores, INTERVALO_ATUALIZACAO_MS);
@@ -1,6 +1,15 @@
 from django.test import TestCase
 from django.test import Client
-from .logic import validarLogin
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from decimal import Decimal
+from datetime import timedelta
+from fornecedores.models import Compra, Fornecedor
+from produtos.models import Produto
+from vendas.models import ItemVenda, Venda
+from .logic import DashboardLogic, validarLogin
 
 # Create your tests here.
 class loginTestCase(TestCase):
@@ -45,4 +54,90 @@ class LoginPathTestCase(TestCase):
     def test_login_post(self):
         """ teste de método post da rota da página de login """
         print(self.response_post)
-        self.assertEqual(self.response_post.status_code, 302)
\ No newline at end of file
+        self.assertEqual(self.response_post.status_code, 302)
+
+class DashboardTestCase(TestCase):
+    """ testes dos indicadores do painel gerencial """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.fornecedor = Fornecedor.objects.create(nome='Fornecedor Painel', cnpj='11222333000181')
+        self.produto = Produto.objects.create(
+            descricao='Produto Painel', preco=Decimal('10.00'), qtd_estoque=3, fornecedor=self.fornecedor
+        )
+        Produto.objects.create(
+            descricao='Produto Cheio', preco=Decimal('5.00'), qtd_estoque=500, fornecedor=self.fornecedor
+        )
+        Compra.objects.create(numero_pedido='PED-1', fornecedor=self.fornecedor, valor_total=Decimal('200.00'))
+        Compra.objects.create(
+            numero_pedido='PED-2', fornecedor=self.fornecedor, valor_total=Decimal('50.00'), status='concluida'
+        )
+
+    def criar_vendas(self, quantidade, data_venda=None):
+        for _ in range(quantidade):
+            venda = Venda.objects.create(data_venda=data_venda or timezone.now(), total_venda=Decimal('20.00'))
+            ItemVenda.objects.create(venda_id=venda, produto_id=self.produto, quantidade=2, subTotal=Decimal('20.00'))
+
+    def test_indicadores(self):
+        """ teste dos valores dos indicadores """
+        self.criar_vendas(3)
+
+        indicadores = DashboardLogic.indicadores()
+
+        self.assertEqual(indicadores['vendas_hoje'], {
+            'total': Decimal('60.00'), 'quantidade': 3, 'ticket_medio': Decimal('20.00')
+        })
+        self.assertEqual(indicadores['produtos_mais_vendidos'][0]['quantidade_vendida'], 6)
+        self.assertEqual([p['descricao'] for p in indicadores['estoque_baixo']], ['Produto Painel'])
+        self.assertEqual(indicadores['compras_pendentes']['quantidade'], 1)
+        self.assertEqual(indicadores['compras_pendentes']['valor_total'], Decimal('200.00'))
+        self.assertEqual(indicadores['compras_pendentes']['proximas'][0]['numero_pedido'], 'PED-1')
+
+    def test_sem_vendas(self):
+        """ teste do ticket médio sem vendas no dia """
+        indicadores = DashboardLogic.indicadores()
+
+        self.assertEqual(indicadores['vendas_hoje']['ticket_medio'], Decimal('0.00'))
+        self.assertEqual(indicadores['produtos_mais_vendidos'], [])
+
+    def test_consultas_nao_crescem_com_os_dados(self):
+        """ teste de que o número de consultas é o mesmo com poucos e muitos dados """
+        self.criar_vendas(2)
+        self.criar_vendas(2, timezone.now() - timedelta(days=2))
+        DashboardLogic.indicadores()
+
+        with CaptureQueriesContext(connection) as poucos:
+            DashboardLogic.indicadores()
+
+        self.criar_vendas(30)
+        self.criar_vendas(30, timezone.now() - timedelta(days=3))
+        cache.clear()
+        DashboardLogic.indicadores()
+
+        with CaptureQueriesContext(connection) as muitos:
+            DashboardLogic.indicadores()
+
+        self.assertEqual(len(poucos), len(muitos))
+        self.assertLessEqual(len(muitos), 6)
+
+    def test_api_indicadores(self):
+        """ teste da rota da API do painel """
+        self.criar_vendas(1)
+
+        response = Client().get('/dashboard/api/indicadores/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(response.json()['indicadores']['vendas_hoje']['quantidade'], 1)
+
+    def test_pagina_dashboard(self):
+        """ teste da página do painel """
+        self.criar_vendas(1)
+
+        response = Client().get('/dashboard/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Produto Painel')
+        self.assertContains(response, 'PED-1')
@@ -3,5 +3,7 @@ from . import views
 
 urlpatterns = [
     path('', views.Login, name='LoginPage'),
-    path('login/', views.Login, name='Login')
+    path('login/', views.Login, name='Login'),
+    path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/api/indicadores/', views.indicadores_dashboard, name='indicadores_dashboard'),
 ]
\ No newline at end of file
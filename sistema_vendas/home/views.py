@@ -2,7 +2,11 @@ from django.shortcuts import render
 from django.http import HttpResponse, HttpResponseRedirect, HttpResponseBadRequest
 from django.template import loader
 from django.middleware import csrf
-from .logic import validarLogin
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from sistema_vendas.db_router import usar_replica
+from sistema_vendas.respostas import RespostaJSON
+from .logic import DashboardLogic, validarLogin
 
 # Create your views here.
 def Login(request):
@@ -20,3 +24,33 @@ def Login(request):
             return HttpResponseBadRequest("credenciais inválidas")
     else: 
         return HttpResponse("Erro: método de request inválido lol")
+
+
+@require_http_methods(["GET"])
+@usar_replica
+def dashboard(request):
+    """
+    Painel gerencial com os indicadores de vendas, estoque e compras
+    """
+    template = loader.get_template('dashboard.html')
+    return HttpResponse(template.render({'indicadores': DashboardLogic.indicadores()}, request))
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@usar_replica
+def indicadores_dashboard(request):
+    """
+    API para atualizar os indicadores do painel
+    """
+    try:
+        return RespostaJSON({
+            'success': True,
+            'indicadores': DashboardLogic.indicadores()
+        })
+    except Exception as e:
+        print(f"[ERRO] Erro ao montar indicadores: {str(e)}")
+        return RespostaJSON({
+            'success': False,
+            'error': f'Erro ao montar indicadores: {str(e)}'
+        }, status=500)
@@ -1,4 +1,14 @@
 from django.contrib import admin
-from .models import Produto
+from .models import CodigoBarras, Produto
 
-admin.site.register(Produto)
+
+class CodigoBarrasInline(admin.TabularInline):
+    model = CodigoBarras
+    extra = 1
+
+
+@admin.register(Produto)
+class ProdutoAdmin(admin.ModelAdmin):
+    list_display = ['descricao', 'preco', 'qtd_estoque', 'fornecedor']
+    search_fields = ['descricao', 'codigos_barras__codigo']
+    inlines = [CodigoBarrasInline]
@@ -0,0 +1,187 @@
+"""
+Índice em memória para o autocompletar de produtos
+
+Cada processo mantém os produtos indexados pelas palavras da descrição e
+do nome do fornecedor, normalizadas sem acentos e em minúsculas. A busca
+por prefixo é feita em uma lista ordenada de palavras (bisect), sem tocar
+no banco.
+
+O índice é carregado do banco na primeira busca e depois atualizado de
+forma incremental: a cada busca compara as gerações do cache de catálogo
+e, se alguma tabela mudou, aplica apenas as alterações desde a última
+marca (ProdutoLogic.alteracoes_catalogo).
+"""
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+from fornecedores.models import Fornecedor
+from sistema_vendas.cache_catalogo import geracao
+
+
+re_palavra = re.compile(r'\w+')
+
+
+def normalizar(texto):
+    """
+    Remove acentos e converte para minúsculas ('Açúcar' -> 'acucar')
+    """
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def palavras(texto):
+    """
+    Retorna as palavras normalizadas de um texto
+    """
+    return re_palavra.findall(normalizar(texto))
+
+
+class IndiceProdutos:
+    """
+    Índice de palavras -> produtos, com atualização incremental
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.limpar()
+
+    def limpar(self):
+        """
+        Descarta o índice; a próxima busca recarrega do banco
+        """
+        self.produtos = {}
+        self.palavras_produto = {}
+        self.descricoes = {}
+        self.ocorrencias = {}
+        self.vocabulario = []
+        self.fornecedores = {}
+        self.marca = None
+        self.geracoes = None
+        self.revalidar_ate = 0
+
+    def buscar(self, termo, limite=10):
+        """
+        Retorna até ``limite`` produtos cujas palavras começam pelas
+        palavras do termo (todas precisam casar)
+
+        Produtos que casam pela descrição vêm antes dos que casam só pelo
+        fornecedor; em seguida a ordem é alfabética, como na listagem.
+        """
+        termos = palavras(termo)
+        if not termos:
+            return []
+
+        with self.lock:
+            self._atualizar()
+
+            encontrados = None
+            for prefixo in termos:
+                ids = self._ids_com_prefixo(prefixo)
+                encontrados = ids if encontrados is None else encontrados & ids
+                if not encontrados:
+                    return []
+
+            def ordem(produto_id):
+                descricao = self.descricoes[produto_id]
+                so_fornecedor = not all(
+                    any(palavra.startswith(prefixo) for palavra in descricao.split())
+                    for prefixo in termos
+                )
+                return so_fornecedor, descricao, produto_id
+
+            return [self.produtos[produto_id] for produto_id in heapq.nsmallest(limite, encontrados, key=ordem)]
+
+    def _ids_com_prefixo(self, prefixo):
+        ids = set()
+        posicao = bisect_left(self.vocabulario, prefixo)
+        while posicao < len(self.vocabulario) and self.vocabulario[posicao].startswith(prefixo):
+            ids |= self.ocorrencias[self.vocabulario[posicao]]
+            posicao += 1
+        return ids
+
+    def _atualizar(self):
+        """
+        Carrega o índice ou aplica as alterações pendentes
+        """
+        from .logic import ProdutoLogic
+
+        geracoes = (geracao('produtos'), geracao('fornecedores'))
+        agora = time.monotonic()
+
+        if self.marca is not None and geracoes == self.geracoes and agora >= self.revalidar_ate:
+            return
+
+        # Alterações recentes só entram na janela da sincronização depois da
+        # margem; até lá o índice continua consultando as alterações
+        if geracoes != self.geracoes:
+            self.revalidar_ate = agora + getattr(settings, 'CATALOGO_DELTA_MARGEM_SEGUNDOS', 5)
+
+        if self.marca is None or geracoes[1] != self.geracoes[1]:
+            self._carregar_fornecedores()
+
+        alteracoes = ProdutoLogic.alteracoes_catalogo(self.marca)
+        for produto_id in alteracoes['removidos']:
+            self._remover(produto_id)
+        for produto in alteracoes['produtos']:
+            self._indexar(produto)
+
+        self.marca = alteracoes['marca']
+        self.geracoes = geracoes
+
+    def _carregar_fornecedores(self):
+        anteriores = self.fornecedores
+        self.fornecedores = {
+            fornecedor['id']: fornecedor
+            for fornecedor in Fornecedor.objects.values('id', 'nome', 'cnpj')
+        }
+
+        # Reindexa os produtos dos fornecedores que mudaram de nome
+        alterados = {
+            fornecedor_id for fornecedor_id, fornecedor in anteriores.items()
+            if self.fornecedores.get(fornecedor_id) != fornecedor
+        }
+        for produto in list(self.produtos.values()):
+            if produto['fornecedor']['id'] in alterados:
+                self._indexar({**produto, 'fornecedor_id': produto['fornecedor']['id']})
+
+    def _indexar(self, produto):
+        self._remover(produto['id'])
+
+        fornecedor = self.fornecedores.get(produto['fornecedor_id'], {'id': produto['fornecedor_id'], 'nome': '', 'cnpj': ''})
+        self.produtos[produto['id']] = {
+            'id': produto['id'],
+            'descricao': produto['descricao'],
+            'preco': produto['preco'],
+            'qtd_estoque': produto['qtd_estoque'],
+            'fornecedor': fornecedor
+        }
+        self.descricoes[produto['id']] = ' '.join(palavras(produto['descricao']))
+
+        conjunto = set(palavras(produto['descricao'])) | set(palavras(fornecedor['nome']))
+        self.palavras_produto[produto['id']] = conjunto
+        for palavra in conjunto:
+            if palavra not in self.ocorrencias:
+                self.ocorrencias[palavra] = set()
+                insort(self.vocabulario, palavra)
+            self.ocorrencias[palavra].add(produto['id'])
+
+    def _remover(self, produto_id):
+        for palavra in self.palavras_produto.pop(produto_id, ()):
+            ocorrencias = self.ocorrencias[palavra]
+            ocorrencias.discard(produto_id)
+            if not ocorrencias:
+                del self.ocorrencias[palavra]
+                del self.vocabulario[bisect_left(self.vocabulario, palavra)]
+
+        self.produtos.pop(produto_id, None)
+        self.descricoes.pop(produto_id, None)
+
+
+# Índice do processo (cada worker mantém o seu)
+indice_produtos = IndiceProdutos()
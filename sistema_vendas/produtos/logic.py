@@ -1,6 +1,23 @@
-from .models import Produto
+from .models import CodigoBarras, Produto, ProdutoRemovido
 from fornecedores.models import Fornecedor
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+from sistema_vendas.cache_catalogo import invalidar_catalogo
+from sistema_vendas.coalescencia import coalescer
+from sistema_vendas.respostas import serializar_json
+from decimal import Decimal
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+import gzip
+import hashlib
+import json
+import os
+
+
+# Origem das marcas da sincronização incremental (microssegundos desde a época)
+EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
 
 
 class ProdutoLogic:
@@ -9,6 +26,7 @@ class ProdutoLogic:
     """
     
     @staticmethod
+    @coalescer('produtos.listar_produtos')
     def listar_produtos(search=''):
         """
         Lista todos os produtos com filtro de busca opcional
@@ -27,7 +45,7 @@ class ProdutoLogic:
             produtos_list.append({
                 'id': produto.id,
                 'descricao': produto.descricao,
-                'preco': float(produto.preco),
+                'preco': produto.preco,
                 'qtd_estoque': produto.qtd_estoque,
                 'fornecedor': {
                     'id': produto.fornecedor.id,
@@ -38,6 +56,19 @@ class ProdutoLogic:
         
         return produtos_list
     
+    @staticmethod
+    def autocompletar(termo, limite=10):
+        """
+        Sugestões de produtos para o campo de busca, pelo início das
+        palavras da descrição ou do fornecedor, sem considerar acentos
+        
+        Usa o índice em memória do processo (produtos.indice), que só
+        consulta o banco na carga inicial e para buscar alterações.
+        """
+        from .indice import indice_produtos
+        
+        return indice_produtos.buscar(termo, limite)
+    
     @staticmethod
     def obter_produto(produto_id):
         """
@@ -48,7 +79,7 @@ class ProdutoLogic:
             return {
                 'id': produto.id,
                 'descricao': produto.descricao,
-                'preco': float(produto.preco),
+                'preco': produto.preco,
                 'qtd_estoque': produto.qtd_estoque,
                 'fornecedor': {
                     'id': produto.fornecedor.id,
@@ -72,10 +103,11 @@ class ProdutoLogic:
                 qtd_estoque=qtd_estoque,
                 fornecedor=fornecedor
             )
+            invalidar_catalogo('produtos')
             return {
                 'id': produto.id,
                 'descricao': produto.descricao,
-                'preco': float(produto.preco),
+                'preco': produto.preco,
                 'qtd_estoque': produto.qtd_estoque,
                 'fornecedor': {
                     'id': produto.fornecedor.id,
@@ -100,11 +132,12 @@ class ProdutoLogic:
             produto.qtd_estoque = qtd_estoque
             produto.fornecedor = fornecedor
             produto.save()
+            invalidar_catalogo('produtos')
             
             return {
                 'id': produto.id,
                 'descricao': produto.descricao,
-                'preco': float(produto.preco),
+                'preco': produto.preco,
                 'qtd_estoque': produto.qtd_estoque,
                 'fornecedor': {
                     'id': produto.fornecedor.id,
@@ -125,10 +158,174 @@ class ProdutoLogic:
         try:
             produto = Produto.objects.get(id=produto_id)
             produto.delete()
+            invalidar_catalogo('produtos')
             return True
         except Produto.DoesNotExist:
             return False
     
+    @staticmethod
+    def buscar_por_codigo(codigo):
+        """
+        Busca um produto pelo código lido no PDV, em uma consulta indexada
+        
+        Códigos no formato GTIN (8, 12, 13 ou 14 dígitos com dígito
+        verificador válido) são procurados primeiro nos códigos de barras;
+        os demais, e os GTIN sem código de barras cadastrado (um ID pode ter
+        dígito verificador válido por acaso), são tratados como ID do produto.
+        
+        Args:
+            codigo (str): Código de barras ou ID
+            
+        Returns:
+            Produto: Produto encontrado ou None
+        """
+        codigo = str(codigo).strip()
+        if not (codigo.isascii() and codigo.isdigit()):
+            return None
+        
+        if CodigoBarras.valido(codigo):
+            produto = Produto.objects.filter(codigos_barras__codigo=codigo).first()
+            if produto is not None:
+                return produto
+        return Produto.objects.filter(id=int(codigo)).first()
+    
+    @staticmethod
+    def ids_por_codigo_barras(codigos):
+        """
+        Resolve vários códigos de barras para IDs de produto em uma consulta
+        
+        Returns:
+            dict: ID do produto por código de barras encontrado
+        """
+        return dict(CodigoBarras.objects.filter(codigo__in=codigos).values_list('codigo', 'produto_id'))
+    
+    @staticmethod
+    @transaction.atomic
+    def atribuir_codigos_barras(pares, substituir=False):
+        """
+        Atribui códigos de barras aos produtos em lote (importação)
+        
+        Args:
+            pares (list): Tuplas (produto_id, codigo)
+            substituir (bool): Move para o novo produto os códigos que já
+                pertencem a outro; sem a opção, esses códigos são recusados
+        
+        Returns:
+            dict: Quantidade de códigos criados e reatribuídos, e os erros
+                como tuplas (posição do par, mensagem)
+        """
+        erros = []
+        atribuicoes = {}
+        
+        produto_ids = set()
+        for posicao, (produto_id, codigo) in enumerate(pares):
+            codigo = str(codigo).strip()
+            try:
+                produto_id = int(produto_id)
+            except (TypeError, ValueError):
+                erros.append((posicao, f'ID de produto inválido: {produto_id}'))
+                continue
+            
+            if not CodigoBarras.valido(codigo):
+                erros.append((posicao, f'Código de barras inválido: {codigo}'))
+            elif atribuicoes.get(codigo, (produto_id,))[0] != produto_id:
+                erros.append((posicao, f'Código {codigo} repetido para produtos diferentes'))
+            else:
+                atribuicoes[codigo] = (produto_id, posicao)
+                produto_ids.add(produto_id)
+        
+        existentes = set(Produto.objects.filter(id__in=produto_ids).values_list('id', flat=True))
+        atuais = {
+            codigo_barras.codigo: codigo_barras
+            for codigo_barras in CodigoBarras.objects.filter(codigo__in=list(atribuicoes))
+        }
+        
+        novos, reatribuidos = [], []
+        alterados = set()
+        for codigo, (produto_id, posicao) in atribuicoes.items():
+            atual = atuais.get(codigo)
+            
+            if produto_id not in existentes:
+                erros.append((posicao, f'Produto {produto_id} não encontrado'))
+            elif atual is None:
+                novos.append(CodigoBarras(produto_id=produto_id, codigo=codigo))
+                alterados.add(produto_id)
+            elif atual.produto_id != produto_id:
+                if not substituir:
+                    erros.append((posicao, f'Código {codigo} já pertence ao produto {atual.produto_id}'))
+                    continue
+                alterados.update((atual.produto_id, produto_id))
+                atual.produto_id = produto_id
+                reatribuidos.append(atual)
+        
+        CodigoBarras.objects.bulk_create(novos)
+        CodigoBarras.objects.bulk_update(reatribuidos, ['produto'])
+        
+        if alterados:
+            # Atualiza atualizado_em para a sincronização dos terminais
+            Produto.objects.filter(id__in=alterados).update()
+            invalidar_catalogo('produtos')
+        
+        return {
+            'criados': len(novos),
+            'reatribuidos': len(reatribuidos),
+            'erros': sorted(erros)
+        }
+    
+    @staticmethod
+    def alteracoes_catalogo(desde=None):
+        """
+        Retorna os produtos alterados e removidos desde a marca informada,
+        para a sincronização incremental do catálogo dos terminais
+        
+        A janela termina CATALOGO_DELTA_MARGEM_SEGUNDOS antes do instante
+        atual: uma transação ainda aberta grava atualizado_em antes do
+        commit, e a margem evita que essa alteração fique atrás da marca
+        devolvida ao terminal.
+        
+        Args:
+            desde (int, optional): Marca devolvida pela sincronização
+                anterior. Sem marca, retorna o catálogo completo.
+        
+        Returns:
+            dict: Produtos alterados, IDs removidos e a nova marca
+        """
+        margem = getattr(settings, 'CATALOGO_DELTA_MARGEM_SEGUNDOS', 5)
+        ate = timezone.now() - timedelta(seconds=margem)
+        
+        produtos = Produto.objects.filter(atualizado_em__lte=ate)
+        removidos = []
+        
+        if desde is not None:
+            inicio = EPOCA + timedelta(microseconds=desde)
+            if inicio >= ate:
+                return {'produtos': [], 'removidos': [], 'marca': desde}
+            
+            produtos = produtos.filter(atualizado_em__gt=inicio)
+            removidos = list(ProdutoRemovido.objects.filter(
+                removido_em__gt=inicio,
+                removido_em__lte=ate
+            ).values_list('produto_id', flat=True).distinct())
+        
+        produtos_list = list(produtos.order_by('id').values(
+            'id', 'descricao', 'preco', 'qtd_estoque', 'fornecedor_id'
+        ))
+        
+        codigos = {}
+        for produto_id, codigo in CodigoBarras.objects.filter(
+            produto__in=produtos.values('id')
+        ).order_by('codigo').values_list('produto_id', 'codigo'):
+            codigos.setdefault(produto_id, []).append(codigo)
+        
+        for produto in produtos_list:
+            produto['codigos_barras'] = codigos.get(produto['id'], [])
+        
+        return {
+            'produtos': produtos_list,
+            'removidos': removidos,
+            'marca': (ate - EPOCA) // timedelta(microseconds=1)
+        }
+    
     @staticmethod
     def listar_fornecedores():
         """
@@ -146,4 +343,197 @@ class ProdutoLogic:
                 'telefone': fornecedor.telefone
             })
         
-        return fornecedores_list
\ No newline at end of file
+        return fornecedores_list
+    
+    @staticmethod
+    @coalescer('produtos.relatorio_produtos_vendidos')
+    def relatorio_produtos_vendidos(data_inicio, data_final, limite=10):
+        """
+        Gera o relatório dos produtos mais vendidos em um período
+        
+        O único cache do relatório é o agregado por dia (agregados_por_dia):
+        dias encerrados ficam em cache até uma venda daquele dia ser
+        alterada, e o dia atual é sempre calculado na hora, então o
+        resultado não fica defasado. O coalescer apenas junta chamadas
+        simultâneas idênticas em um único cálculo.
+        
+        Args:
+            data_inicio (str): Data início no formato dd/mm/yyyy
+            data_final (str): Data fim no formato dd/mm/yyyy
+            limite (int): Quantidade de produtos no ranking
+        
+        Returns:
+            list: Produtos mais vendidos com quantidade, total e preço médio
+        
+        Raises:
+            ValueError: Se alguma data for inválida
+        """
+        from django.db.models.functions import TruncDate
+        from vendas.cache_relatorios import agregados_por_dia, intervalo_dias
+        from vendas.models import ItemVenda
+        
+        data_inicio_obj = datetime.strptime(data_inicio, '%d/%m/%Y')
+        data_final_obj = datetime.strptime(data_final, '%d/%m/%Y')
+        
+        def calcular(dias):
+            # Uma consulta para todos os dias a calcular, agrupada por dia e
+            # produto; o preço vem do próprio item (preço praticado na
+            # venda), não do cadastro atual
+            inicio, fim = intervalo_dias(dias)
+            por_dia = {dia: {} for dia in dias}
+            
+            for linha in ItemVenda.objects.filter(
+                venda_id__data_venda__gte=inicio,
+                venda_id__data_venda__lt=fim
+            ).annotate(
+                dia=TruncDate('venda_id__data_venda')
+            ).values('dia', 'produto_id').annotate(
+                quantidade=Sum('quantidade'),
+                valor=Sum('subTotal')
+            ).order_by():
+                if linha['dia'] in por_dia:
+                    por_dia[linha['dia']][linha['produto_id']] = (linha['quantidade'], linha['valor'])
+            
+            return por_dia
+        
+        # Dias encerrados vêm do cache de relatórios; só hoje (e os dias que
+        # ainda não estavam no cache) vão ao banco
+        totais = {}
+        for vendidos in agregados_por_dia(
+            'produtos_vendidos', data_inicio_obj.date(), data_final_obj.date(), calcular
+        ).values():
+            for produto_id, (quantidade, valor) in vendidos.items():
+                anterior = totais.get(produto_id, (0, Decimal('0')))
+                totais[produto_id] = (anterior[0] + quantidade, anterior[1] + valor)
+        
+        # A descrição é buscada na hora, para refletir o cadastro atual. Os
+        # agregados em cache podem conter produtos já excluídos, que saem do
+        # ranking antes do corte para não faltarem posições
+        descricoes = dict(
+            Produto.objects.filter(id__in=list(totais)).values_list('id', 'descricao')
+        )
+        ranking = sorted(
+            (item for item in totais.items() if item[0] in descricoes),
+            key=lambda item: (-item[1][0], item[0])
+        )
+        
+        produtos_list = []
+        for produto_id, (quantidade_vendida, valor_total) in ranking[:limite]:
+            # Preço médio efetivamente praticado no período
+            preco_unitario = valor_total / quantidade_vendida if quantidade_vendida else Decimal('0')
+            produtos_list.append({
+                'id': produto_id,
+                'descricao': descricoes[produto_id],
+                'quantidade_vendida': quantidade_vendida,
+                'valor_total': f"R$ {float(valor_total):.2f}".replace('.', ','),
+                'preco_unitario': f"R$ {float(preco_unitario):.2f}".replace('.', ',')
+            })
+        
+        return produtos_list
+
+
+class SnapshotCatalogoLogic:
+    """
+    Snapshot completo do catálogo, comprimido em gzip, para a carga inicial
+    dos terminais
+    
+    Cada snapshot é gravado como catalogo-<hash>.json.gz em
+    CATALOGO_SNAPSHOT_DIR, e o arquivo catalogo.json aponta para o atual.
+    O hash é calculado sobre os produtos, então um catálogo sem alterações
+    mantém o mesmo arquivo (e o mesmo ETag). O snapshot traz a marca da
+    sincronização incremental, a partir da qual o terminal busca as
+    alterações posteriores.
+    """
+    
+    ARQUIVO_ATUAL = 'catalogo.json'
+    
+    @staticmethod
+    def diretorio():
+        """
+        Retorna o diretório onde os snapshots são gravados
+        """
+        return Path(getattr(settings, 'CATALOGO_SNAPSHOT_DIR', Path(settings.BASE_DIR) / 'snapshots'))
+    
+    @staticmethod
+    def gerar():
+        """
+        Gera o snapshot do catálogo, se o conteúdo mudou desde o último
+        
+        Returns:
+            tuple: (dados do snapshot atual: dict, gerado agora: bool)
+        """
+        diretorio = SnapshotCatalogoLogic.diretorio()
+        diretorio.mkdir(parents=True, exist_ok=True)
+        
+        catalogo = ProdutoLogic.alteracoes_catalogo()
+        fornecedores = list(Fornecedor.objects.order_by('id').values('id', 'nome'))
+        
+        conteudo = serializar_json({'produtos': catalogo['produtos'], 'fornecedores': fornecedores})
+        hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+        
+        atual = SnapshotCatalogoLogic.atual()
+        if atual is not None and atual['hash'] == hash_conteudo:
+            return atual, False
+        
+        corpo = serializar_json({
+            'hash': hash_conteudo,
+            'marca': catalogo['marca'],
+            'produtos': catalogo['produtos'],
+            'fornecedores': fornecedores
+        })
+        
+        arquivo = f'catalogo-{hash_conteudo[:16]}.json.gz'
+        SnapshotCatalogoLogic._gravar(diretorio / arquivo, gzip.compress(corpo, compresslevel=9, mtime=0))
+        
+        snapshot = {
+            'arquivo': arquivo,
+            'hash': hash_conteudo,
+            'marca': catalogo['marca'],
+            'total_produtos': len(catalogo['produtos']),
+            'gerado_em': timezone.now().isoformat()
+        }
+        SnapshotCatalogoLogic._gravar(
+            diretorio / SnapshotCatalogoLogic.ARQUIVO_ATUAL,
+            json.dumps(snapshot, indent=2).encode('utf-8')
+        )
+        
+        # Mantém o snapshot anterior para downloads em andamento
+        manter = {arquivo, atual['arquivo'] if atual else None}
+        for antigo in diretorio.glob('catalogo-*.json.gz'):
+            if antigo.name not in manter:
+                antigo.unlink(missing_ok=True)
+        
+        return snapshot, True
+    
+    @staticmethod
+    def atual():
+        """
+        Retorna os dados do snapshot atual, ou None se ainda não foi gerado
+        """
+        caminho = SnapshotCatalogoLogic.diretorio() / SnapshotCatalogoLogic.ARQUIVO_ATUAL
+        try:
+            with open(caminho, encoding='utf-8') as arquivo:
+                snapshot = json.load(arquivo)
+        except FileNotFoundError:
+            return None
+        
+        if not (SnapshotCatalogoLogic.diretorio() / snapshot['arquivo']).exists():
+            return None
+        return snapshot
+    
+    @staticmethod
+    def caminho(snapshot):
+        """
+        Retorna o caminho do arquivo comprimido de um snapshot
+        """
+        return SnapshotCatalogoLogic.diretorio() / snapshot['arquivo']
+    
+    @staticmethod
+    def _gravar(caminho, conteudo):
+        """
+        Grava o arquivo de forma atômica (arquivo temporário + rename)
+        """
+        temporario = caminho.with_name(f'{caminho.name}.tmp')
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, caminho)
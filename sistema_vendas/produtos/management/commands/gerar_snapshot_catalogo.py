@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from produtos.logic import SnapshotCatalogoLogic
+
+
+class Command(BaseCommand):
+    """
+    Gera o snapshot comprimido do catálogo usado na carga inicial dos
+    terminais (servido em /produtos/api/snapshot/)
+
+    Uso:
+        python manage.py gerar_snapshot_catalogo
+        python manage.py gerar_snapshot_catalogo --intervalo 300
+    """
+
+    help = 'Gera o snapshot comprimido do catálogo de produtos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            help='Regenera o snapshot a cada N segundos (sem a opção, gera uma vez e encerra)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            snapshot, gerado = SnapshotCatalogoLogic.gerar()
+
+            if gerado:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Snapshot {snapshot['arquivo']} gerado com {snapshot['total_produtos']} produto(s)"
+                ))
+            else:
+                self.stdout.write(f"Catálogo sem alterações; snapshot {snapshot['arquivo']} mantido")
+
+            if not options['intervalo']:
+                break
+
+            time.sleep(options['intervalo'])
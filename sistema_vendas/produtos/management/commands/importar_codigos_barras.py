@@ -0,0 +1,56 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from produtos.logic import ProdutoLogic
+
+
+class Command(BaseCommand):
+    """
+    Importa códigos de barras de um CSV com as colunas produto_id e codigo
+
+    Um produto pode aparecer em várias linhas (um código por linha). As
+    linhas inválidas são listadas e as demais são importadas.
+
+    Uso:
+        python manage.py importar_codigos_barras codigos.csv
+        python manage.py importar_codigos_barras codigos.csv --delimitador ";" --substituir
+    """
+
+    help = 'Atribui códigos de barras aos produtos a partir de um CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Arquivo CSV com as colunas produto_id e codigo')
+        parser.add_argument(
+            '--delimitador',
+            default=',',
+            help='Separador das colunas do CSV'
+        )
+        parser.add_argument(
+            '--substituir',
+            action='store_true',
+            help='Move para o produto informado os códigos que já pertencem a outro'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['arquivo'], newline='', encoding='utf-8-sig') as arquivo:
+                leitor = csv.DictReader(arquivo, delimiter=options['delimitador'])
+                if not {'produto_id', 'codigo'} <= set(leitor.fieldnames or []):
+                    raise CommandError('O CSV deve ter as colunas produto_id e codigo')
+
+                pares = [(linha['produto_id'], linha['codigo']) for linha in leitor]
+        except OSError as e:
+            raise CommandError(f'Não foi possível ler o arquivo: {e}')
+
+        resultado = ProdutoLogic.atribuir_codigos_barras(pares, substituir=options['substituir'])
+
+        for posicao, mensagem in resultado['erros']:
+            # Linha 1 é o cabeçalho
+            self.stderr.write(f'Linha {posicao + 2}: {mensagem}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['criados']} código(s) criado(s), "
+            f"{resultado['reatribuidos']} reatribuído(s), "
+            f"{len(resultado['erros'])} linha(s) com erro"
+        ))
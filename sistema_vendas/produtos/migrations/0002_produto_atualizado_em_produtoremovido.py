@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produtos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProdutoRemovido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('produto_id', models.BigIntegerField(verbose_name='Produto')),
+                ('removido_em', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Removido em')),
+            ],
+            options={
+                'verbose_name': 'Produto removido',
+                'verbose_name_plural': 'Produtos removidos',
+                'ordering': ['removido_em'],
+            },
+        ),
+        migrations.AddField(
+            model_name='produto',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Atualizado em'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produtos', '0002_produto_atualizado_em_produtoremovido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodigoBarras',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(max_length=14, unique=True, verbose_name='Código de barras')),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='codigos_barras', to='produtos.produto', verbose_name='Produto')),
+            ],
+            options={
+                'verbose_name': 'Código de barras',
+                'verbose_name_plural': 'Códigos de barras',
+                'ordering': ['codigo'],
+            },
+        ),
+    ]
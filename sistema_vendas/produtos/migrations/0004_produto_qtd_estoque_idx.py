@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produtos', '0003_codigobarras'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='produto',
+            name='qtd_estoque',
+            field=models.IntegerField(db_index=True, default=0, verbose_name='Quantidade em Estoque'),
+        ),
+    ]
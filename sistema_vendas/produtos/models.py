@@ -1,19 +1,55 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
 from fornecedores import models as f_models
 
+
+class ProdutoQuerySet(models.QuerySet):
+    """
+    QuerySet de produtos que mantém atualizado_em e os registros de remoção
+    também nas operações em lote (update, bulk_update e delete)
+    """
+    
+    def update(self, **kwargs):
+        kwargs.setdefault('atualizado_em', timezone.now())
+        return super().update(**kwargs)
+    
+    update.alters_data = True
+    
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if 'atualizado_em' not in fields:
+            agora = timezone.now()
+            for obj in objs:
+                obj.atualizado_em = agora
+            fields = [*fields, 'atualizado_em']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+    
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            ProdutoRemovido.registrar(self.values_list('id', flat=True))
+            return super().delete()
+    
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Produto(models.Model):
     """
     Model que representa um Produto
     """
     descricao = models.CharField(max_length=200, verbose_name="Descrição")
     preco = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Preço")
-    qtd_estoque = models.IntegerField(default=0, verbose_name="Quantidade em Estoque")
+    qtd_estoque = models.IntegerField(default=0, db_index=True, verbose_name="Quantidade em Estoque")
     fornecedor = models.ForeignKey(
         f_models.Fornecedor,
         on_delete=models.PROTECT,
         related_name='produtos',
         verbose_name="Fornecedor"
     )
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Atualizado em")
+    
+    objects = ProdutoQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Produto"
@@ -21,4 +57,107 @@ class Produto(models.Model):
         ordering = ['descricao']
     
     def __str__(self):
-        return self.descricao
\ No newline at end of file
+        return self.descricao
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using') or self._state.db):
+            ProdutoRemovido.registrar([self.pk])
+            return super().delete(*args, **kwargs)
+
+
+class ProdutoRemovido(models.Model):
+    """
+    Registro de remoção (tombstone) de um produto, usado pela sincronização
+    incremental do catálogo dos terminais
+    """
+    produto_id = models.BigIntegerField(verbose_name="Produto")
+    removido_em = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Removido em")
+    
+    class Meta:
+        verbose_name = "Produto removido"
+        verbose_name_plural = "Produtos removidos"
+        ordering = ['removido_em']
+    
+    def __str__(self):
+        return f'Produto {self.produto_id} removido em {self.removido_em}'
+    
+    @staticmethod
+    def registrar(produto_ids):
+        """
+        Registra a remoção dos produtos informados
+        """
+        agora = timezone.now()
+        ProdutoRemovido.objects.bulk_create([
+            ProdutoRemovido(produto_id=produto_id, removido_em=agora)
+            for produto_id in produto_ids
+        ])
+
+
+class CodigoBarras(models.Model):
+    """
+    Código de barras (EAN-8, UPC-A, EAN-13 ou GTIN-14) de um produto
+
+    Um produto pode ter vários códigos; cada código pertence a um único
+    produto (índice único), o que permite resolver a leitura do scanner em
+    uma consulta indexada.
+    """
+    TAMANHOS_GTIN = (8, 12, 13, 14)
+    
+    produto = models.ForeignKey(
+        Produto,
+        on_delete=models.CASCADE,
+        related_name='codigos_barras',
+        verbose_name="Produto"
+    )
+    codigo = models.CharField(max_length=14, unique=True, verbose_name="Código de barras")
+    
+    class Meta:
+        verbose_name = "Código de barras"
+        verbose_name_plural = "Códigos de barras"
+        ordering = ['codigo']
+    
+    def __str__(self):
+        return self.codigo
+    
+    def clean(self):
+        if not CodigoBarras.valido(self.codigo):
+            raise ValidationError({'codigo': 'Código de barras inválido'})
+    
+    def save(self, *args, **kwargs):
+        produto_anterior = None
+        if self.pk:
+            produto_anterior = CodigoBarras.objects.filter(pk=self.pk).values_list('produto_id', flat=True).first()
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Os códigos fazem parte do catálogo sincronizado pelos terminais
+            Produto.objects.filter(id__in={self.produto_id, produto_anterior} - {None}).update()
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            Produto.objects.filter(id=self.produto_id).update()
+        return resultado
+    
+    @staticmethod
+    def valido(codigo):
+        """
+        Verifica o tamanho e o dígito verificador (módulo 10) de um GTIN
+        
+        Args:
+            codigo (str): Código lido pelo scanner
+            
+        Returns:
+            bool: True se for um código de barras válido
+        """
+        codigo = str(codigo)
+        # isdigit sozinho aceita dígitos não ASCII ('²', '٣'), que o int() recusa
+        if not (codigo.isascii() and codigo.isdigit()) or len(codigo) not in CodigoBarras.TAMANHOS_GTIN:
+            return False
+        
+        # Pesos 3 e 1 alternados a partir do dígito mais à direita (sem o verificador)
+        soma = sum(
+            int(digito) * (3 if posicao % 2 == 0 else 1)
+            for posicao, digito in enumerate(reversed(codigo[:-1]))
+        )
+        return (10 - soma % 10) % 10 == int(codigo[-1])
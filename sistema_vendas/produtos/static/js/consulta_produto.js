@@ -94,10 +94,43 @@ function renderProducts(products) {
             `).join('');
 }
 
+// Sugestões enquanto o usuário digita (índice em memória no servidor);
+// Enter faz a busca completa
+const LIMITE_SUGESTOES = 20;
+let timerSugestoes = null;
+
+async function loadSuggestions(searchTerm) {
+    try {
+        const response = await fetch(
+            `${API_BASE_URL}/autocompletar/?q=${encodeURIComponent(searchTerm)}&limite=${LIMITE_SUGESTOES}`
+        );
+        const data = await response.json();
+
+        // Ignora respostas de um termo que já foi alterado
+        if (data.success && document.getElementById('search-input').value === searchTerm) {
+            renderProducts(data.produtos);
+        }
+    } catch (error) {
+        console.error('Erro:', error);
+    }
+}
+
 function handleSearch(event) {
+    clearTimeout(timerSugestoes);
+
     if (event.key === 'Enter') {
         loadProductsWithSearch();
+        return;
     }
+
+    const searchTerm = document.getElementById('search-input').value;
+    timerSugestoes = setTimeout(() => {
+        if (searchTerm.trim()) {
+            loadSuggestions(searchTerm);
+        } else {
+            loadProducts();
+        }
+    }, 150);
 }
 
 function loadProductsWithSearch() {
@@ -0,0 +1,32 @@
+from sistema_vendas.db_router import ler_da_replica
+from tarefas.logic import TarefaLogic
+from .logic import ProdutoLogic, SnapshotCatalogoLogic
+
+
+@TarefaLogic.registrar('produtos.relatorio_produtos_vendidos')
+def relatorio_produtos_vendidos(parametros):
+    """
+    Gera o relatório de produtos mais vendidos (lendo da réplica)
+    """
+    with ler_da_replica():
+        produtos_list = ProdutoLogic.relatorio_produtos_vendidos(
+            parametros['dataInicio'], parametros['dataFinal']
+        )
+    
+    return {
+        'success': True,
+        'produtos': produtos_list,
+        'periodo': {
+            'inicio': parametros['dataInicio'],
+            'fim': parametros['dataFinal']
+        }
+    }
+
+
+@TarefaLogic.registrar('produtos.gerar_snapshot_catalogo')
+def gerar_snapshot_catalogo(parametros):
+    """
+    Gera o snapshot comprimido do catálogo para os terminais
+    """
+    snapshot, gerado = SnapshotCatalogoLogic.gerar()
+    return {'success': True, 'gerado': gerado, **snapshot}
@@ -1,11 +1,21 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+import gzip
 import json
+import os
+import shutil
+import tempfile
 
-from .models import Produto
+from django.db import IntegrityError
+from .models import CodigoBarras, Produto, ProdutoRemovido
 from fornecedores.models import Fornecedor
-from .logic import ProdutoLogic
+from .logic import ProdutoLogic, SnapshotCatalogoLogic
+from .indice import indice_produtos
+from django.core.cache import cache
+from fornecedores.fornecedorService import FornecedorService
 
 # Create your tests here.
 
@@ -494,4 +504,396 @@ class ProdutoIntegracaoTest(TestCase):
         produto_final = ProdutoLogic.obter_produto(produto_id)
         self.assertEqual(produto_final['descricao'], 'Produto Editado 10')
         self.assertEqual(produto_final['preco'], 190.00)
-        self.assertEqual(produto_final['qtd_estoque'], 19)
\ No newline at end of file
+        self.assertEqual(produto_final['qtd_estoque'], 19)
+
+class CompressaoRespostaTest(TestCase):
+    """Testes da compressão das respostas JSON"""
+    
+    def setUp(self):
+        """Configuração inicial dos testes"""
+        self.client = Client()
+        self.fornecedor = Fornecedor.objects.create(
+            nome='Fornecedor Teste',
+            cnpj='12.345.678/0001-90'
+        )
+        Produto.objects.bulk_create([
+            Produto(
+                descricao=f'Produto {i}',
+                preco=Decimal('10.00'),
+                qtd_estoque=i,
+                fornecedor=self.fornecedor
+            )
+            for i in range(100)
+        ])
+    
+    def listar(self, **headers):
+        """Método auxiliar para listar produtos"""
+        return self.client.get(reverse('produtos:listar_produtos'), headers=headers)
+    
+    def test_resposta_grande_comprimida(self):
+        """Teste de compressão gzip acima do tamanho mínimo"""
+        original = self.listar()
+        response = self.listar(accept_encoding='gzip, deflate')
+        
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(original.content))
+        self.assertEqual(gzip.decompress(response.content), original.content)
+    
+    def test_sem_accept_encoding(self):
+        """Teste de resposta sem compressão quando o cliente não aceita"""
+        response = self.listar()
+        recusado = self.listar(accept_encoding='gzip;q=0, identity')
+        
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(recusado.has_header('Content-Encoding'))
+    
+    def test_resposta_pequena_nao_comprimida(self):
+        """Teste de resposta abaixo do tamanho mínimo"""
+        produto = Produto.objects.first()
+        response = self.client.get(
+            reverse('produtos:obter_produto', args=[produto.id]),
+            headers={'accept_encoding': 'gzip'}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class AlteracoesCatalogoTest(TestCase):
+    """Testes da sincronização incremental do catálogo (atualizado_em e tombstones)"""
+    
+    def setUp(self):
+        """Configuração inicial dos testes"""
+        self.client = Client()
+        self.fornecedor = Fornecedor.objects.create(
+            nome='Fornecedor Teste',
+            cnpj='12.345.678/0001-90'
+        )
+        self.produtos = [
+            Produto.objects.create(
+                descricao=f'Produto {i}',
+                preco=Decimal('10.00'),
+                qtd_estoque=10,
+                fornecedor=self.fornecedor
+            )
+            for i in range(3)
+        ]
+    
+    def sincronizar(self, desde=None):
+        """Método auxiliar que chama o endpoint de alterações"""
+        parametros = {} if desde is None else {'desde': desde}
+        response = self.client.get(reverse('produtos:alteracoes_produtos'), parametros)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+    
+    def test_catalogo_completo_sem_marca(self):
+        """Teste da primeira sincronização, que traz o catálogo completo"""
+        with self.settings(CATALOGO_DELTA_MARGEM_SEGUNDOS=0):
+            data = self.sincronizar()
+        
+        self.assertTrue(data['success'])
+        self.assertEqual([p['id'] for p in data['produtos']], [p.id for p in self.produtos])
+        self.assertEqual(data['produtos'][0]['preco'], 10.0)
+        self.assertEqual(data['removidos'], [])
+        self.assertIsInstance(data['marca'], int)
+    
+    def test_somente_alteracoes_desde_a_marca(self):
+        """Teste que a sincronização seguinte traz só alterados e removidos"""
+        with self.settings(CATALOGO_DELTA_MARGEM_SEGUNDOS=0):
+            marca = self.sincronizar()['marca']
+            
+            ProdutoLogic.atualizar_produto(
+                self.produtos[0].id, 'Produto Editado', Decimal('12.00'), 8, self.fornecedor.id
+            )
+            ProdutoLogic.deletar_produto(self.produtos[1].id)
+            
+            data = self.sincronizar(marca)
+        
+        self.assertEqual([p['descricao'] for p in data['produtos']], ['Produto Editado'])
+        self.assertEqual(data['removidos'], [self.produtos[1].id])
+        self.assertGreater(data['marca'], marca)
+    
+    def test_margem_adia_alteracoes_recentes(self):
+        """Teste que alterações dentro da margem ficam para a próxima sincronização"""
+        with self.settings(CATALOGO_DELTA_MARGEM_SEGUNDOS=60):
+            data = self.sincronizar()
+        
+        self.assertEqual(data['produtos'], [])
+    
+    def test_operacoes_em_lote(self):
+        """Teste de update e delete em lote atualizando marca e tombstones"""
+        antes = Produto.objects.get(id=self.produtos[0].id).atualizado_em
+        
+        Produto.objects.filter(id=self.produtos[0].id).update(qtd_estoque=5)
+        Produto.objects.filter(id=self.produtos[2].id).delete()
+        
+        self.assertGreater(Produto.objects.get(id=self.produtos[0].id).atualizado_em, antes)
+        self.assertTrue(ProdutoRemovido.objects.filter(produto_id=self.produtos[2].id).exists())
+    
+    def test_marca_invalida(self):
+        """Teste de marca inválida"""
+        response = self.client.get(reverse('produtos:alteracoes_produtos'), {'desde': 'ontem'})
+        self.assertEqual(response.status_code, 400)
+
+
+class SnapshotCatalogoTest(TestCase):
+    """Testes do snapshot comprimido do catálogo"""
+    
+    def setUp(self):
+        """Configuração inicial dos testes"""
+        self.client = Client()
+        self.diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.diretorio, ignore_errors=True)
+        
+        configuracao = self.settings(CATALOGO_SNAPSHOT_DIR=self.diretorio, CATALOGO_DELTA_MARGEM_SEGUNDOS=0)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        
+        self.fornecedor = Fornecedor.objects.create(
+            nome='Fornecedor Teste',
+            cnpj='12.345.678/0001-90'
+        )
+        self.produto = Produto.objects.create(
+            descricao='Produto Snapshot',
+            preco=Decimal('7.50'),
+            qtd_estoque=3,
+            fornecedor=self.fornecedor
+        )
+    
+    def test_snapshot_nao_gerado(self):
+        """Teste de resposta 404 antes da primeira geração"""
+        response = self.client.get(reverse('produtos:snapshot_catalogo'))
+        self.assertEqual(response.status_code, 404)
+    
+    def test_download_e_etag(self):
+        """Teste do download comprimido e da revalidação com If-None-Match"""
+        call_command('gerar_snapshot_catalogo', stdout=StringIO())
+        
+        response = self.client.get(reverse('produtos:snapshot_catalogo'), headers={'accept_encoding': 'gzip'})
+        conteudo = b''.join(response.streaming_content)
+        
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        dados = json.loads(gzip.decompress(conteudo))
+        self.assertEqual(dados['produtos'][0]['descricao'], 'Produto Snapshot')
+        self.assertEqual(dados['fornecedores'][0]['nome'], 'Fornecedor Teste')
+        self.assertEqual(response['ETag'], f'"{dados["hash"]}"')
+        
+        revalidado = self.client.get(
+            reverse('produtos:snapshot_catalogo'),
+            headers={'if_none_match': response['ETag']}
+        )
+        self.assertEqual(revalidado.status_code, 304)
+    
+    def test_sem_gzip(self):
+        """Teste do snapshot descomprimido para clientes sem gzip"""
+        SnapshotCatalogoLogic.gerar()
+        
+        response = self.client.get(reverse('produtos:snapshot_catalogo'))
+        
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(len(response.json()['produtos']), 1)
+    
+    def test_hash_estavel_sem_alteracoes(self):
+        """Teste que o snapshot só é regravado quando o catálogo muda"""
+        primeiro, gerado = SnapshotCatalogoLogic.gerar()
+        self.assertTrue(gerado)
+        
+        mesmo, gerado = SnapshotCatalogoLogic.gerar()
+        self.assertFalse(gerado)
+        self.assertEqual(mesmo['hash'], primeiro['hash'])
+        
+        ProdutoLogic.atualizar_produto(self.produto.id, 'Produto Snapshot', Decimal('8.00'), 3, self.fornecedor.id)
+        novo, gerado = SnapshotCatalogoLogic.gerar()
+        self.assertTrue(gerado)
+        self.assertNotEqual(novo['hash'], primeiro['hash'])
+
+
+class CodigoBarrasTest(TestCase):
+    """Testes dos códigos de barras e da busca pelo scanner"""
+    
+    def setUp(self):
+        """Configuração inicial dos testes"""
+        self.client = Client()
+        self.fornecedor = Fornecedor.objects.create(
+            nome='Fornecedor Teste',
+            cnpj='12.345.678/0001-90'
+        )
+        self.produto = Produto.objects.create(
+            descricao='Café 500g',
+            preco=Decimal('15.90'),
+            qtd_estoque=20,
+            fornecedor=self.fornecedor
+        )
+        self.outro = Produto.objects.create(
+            descricao='Açúcar 1kg',
+            preco=Decimal('4.50'),
+            qtd_estoque=30,
+            fornecedor=self.fornecedor
+        )
+        CodigoBarras.objects.create(produto=self.produto, codigo='7891000315507')
+        CodigoBarras.objects.create(produto=self.produto, codigo='96385074')
+    
+    def importar(self, conteudo, *args):
+        """Método auxiliar que importa um CSV temporário"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as arquivo:
+            arquivo.write(conteudo)
+        self.addCleanup(os.remove, arquivo.name)
+        
+        saida, erros = StringIO(), StringIO()
+        call_command('importar_codigos_barras', arquivo.name, *args, stdout=saida, stderr=erros)
+        return erros.getvalue()
+    
+    def test_digito_verificador(self):
+        """Teste da validação do GTIN"""
+        self.assertTrue(CodigoBarras.valido('7891000315507'))
+        self.assertTrue(CodigoBarras.valido('036000291452'))
+        self.assertFalse(CodigoBarras.valido('7891000315508'))
+        self.assertFalse(CodigoBarras.valido('123'))
+    
+    def test_codigo_unico(self):
+        """Teste que um código de barras pertence a um único produto"""
+        with self.assertRaises(IntegrityError):
+            CodigoBarras.objects.create(produto=self.outro, codigo='7891000315507')
+    
+    def test_busca_por_codigo_barras_e_id(self):
+        """Teste da busca do PDV por código de barras e por ID, em uma consulta"""
+        for codigo in ('7891000315507', '96385074', str(self.produto.id)):
+            with self.subTest(codigo=codigo), self.assertNumQueries(1):
+                response = self.client.get(reverse('buscar_produto'), {'codigo': codigo})
+            
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['id'], self.produto.id)
+        
+        response = self.client.get(reverse('buscar_produto'), {'codigo': '7891000315514'})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_id_com_formato_de_gtin(self):
+        """Teste que um ID com dígito verificador válido ainda é encontrado pelo ID"""
+        produto = Produto.objects.create(
+            id=12345670,
+            descricao='Produto GTIN-8',
+            preco=Decimal('1.00'),
+            fornecedor=self.fornecedor
+        )
+        self.assertTrue(CodigoBarras.valido('12345670'))
+        
+        self.assertEqual(ProdutoLogic.buscar_por_codigo('12345670'), produto)
+        # Um código de barras cadastrado tem prioridade sobre o ID
+        CodigoBarras.objects.create(produto=self.outro, codigo='12345670')
+        self.assertEqual(ProdutoLogic.buscar_por_codigo('12345670'), self.outro)
+    
+    def test_digitos_nao_ascii(self):
+        """Teste que dígitos não ASCII são recusados sem erro no servidor"""
+        self.assertFalse(CodigoBarras.valido('1234567²'))
+        self.assertIsNone(ProdutoLogic.buscar_por_codigo('²'))
+        
+        response = self.client.get(reverse('buscar_produto'), {'codigo': '²'})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_importacao_em_lote(self):
+        """Teste da importação com linhas válidas e inválidas"""
+        erros = self.importar(
+            'produto_id,codigo\n'
+            f'{self.outro.id},7896004000015\n'
+            f'{self.outro.id},036000291452\n'
+            f'{self.outro.id},7891000315507\n'
+            '999999,4006381333931\n'
+            f'{self.outro.id},12345\n'
+        )
+        
+        self.assertEqual(
+            sorted(self.outro.codigos_barras.values_list('codigo', flat=True)),
+            ['036000291452', '7896004000015']
+        )
+        self.assertIn('Linha 4', erros)
+        self.assertIn('Linha 5', erros)
+        self.assertIn('Linha 6', erros)
+    
+    def test_importacao_substituir(self):
+        """Teste da reatribuição de um código já usado com --substituir"""
+        self.importar(f'produto_id;codigo\n{self.outro.id};7891000315507\n', '--delimitador', ';', '--substituir')
+        
+        self.assertEqual(CodigoBarras.objects.get(codigo='7891000315507').produto, self.outro)
+    
+    def test_codigos_na_sincronizacao(self):
+        """Teste que a sincronização dos terminais traz os códigos de barras"""
+        with self.settings(CATALOGO_DELTA_MARGEM_SEGUNDOS=0):
+            produtos = ProdutoLogic.alteracoes_catalogo()['produtos']
+        
+        self.assertEqual(produtos[0]['codigos_barras'], ['7891000315507', '96385074'])
+        self.assertEqual(produtos[1]['codigos_barras'], [])
+
+
+class AutocompletarTest(TestCase):
+    """Testes do índice em memória do autocompletar"""
+    
+    def setUp(self):
+        """Configuração inicial dos testes"""
+        cache.clear()
+        indice_produtos.limpar()
+        self.addCleanup(indice_produtos.limpar)
+        
+        configuracao = self.settings(CATALOGO_DELTA_MARGEM_SEGUNDOS=0)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        
+        self.client = Client()
+        self.fornecedor = Fornecedor.objects.create(
+            nome='Distribuidora São João',
+            cnpj='12.345.678/0001-90'
+        )
+        for descricao in ('Açúcar Refinado 1kg', 'Açaí Polpa 400g', 'Café Torrado 500g', 'Arroz Integral'):
+            Produto.objects.create(
+                descricao=descricao,
+                preco=Decimal('5.00'),
+                qtd_estoque=10,
+                fornecedor=self.fornecedor
+            )
+    
+    def descricoes(self, termo, limite=10):
+        """Método auxiliar que retorna as descrições sugeridas"""
+        return [p['descricao'] for p in ProdutoLogic.autocompletar(termo, limite)]
+    
+    def test_prefixo_sem_acentos(self):
+        """Teste de busca por prefixo ignorando acentos e maiúsculas"""
+        self.assertEqual(self.descricoes('aca'), ['Açaí Polpa 400g'])
+        self.assertEqual(self.descricoes('AÇU ref'), ['Açúcar Refinado 1kg'])
+        self.assertEqual(self.descricoes('ac'), ['Açaí Polpa 400g', 'Açúcar Refinado 1kg'])
+        self.assertEqual(self.descricoes('feijao'), [])
+    
+    def test_busca_pelo_fornecedor(self):
+        """Teste de busca pelo nome do fornecedor, com limite"""
+        self.assertEqual(len(self.descricoes('sao joao')), 4)
+        self.assertEqual(len(self.descricoes('joao', limite=2)), 2)
+    
+    def test_sem_consultas_apos_carga(self):
+        """Teste que, sem alterações, a busca não consulta o banco"""
+        self.descricoes('cafe')
+        
+        with self.assertNumQueries(0):
+            self.assertEqual(self.descricoes('cafe'), ['Café Torrado 500g'])
+    
+    def test_atualizacao_incremental(self):
+        """Teste que alterações, remoções e fornecedores renomeados chegam ao índice"""
+        self.descricoes('cafe')
+        cafe = Produto.objects.get(descricao='Café Torrado 500g')
+        arroz = Produto.objects.get(descricao='Arroz Integral')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            ProdutoLogic.atualizar_produto(cafe.id, 'Café Moído 500g', Decimal('6.00'), 10, self.fornecedor.id)
+            ProdutoLogic.deletar_produto(arroz.id)
+            FornecedorService.editar_fornecedor(self.fornecedor.id, {'nome': 'Atacado Central', 'cnpj': self.fornecedor.cnpj})
+        
+        self.assertEqual(self.descricoes('moido'), ['Café Moído 500g'])
+        self.assertEqual(self.descricoes('torrado'), [])
+        self.assertEqual(self.descricoes('arroz'), [])
+        self.assertEqual(self.descricoes('joao'), [])
+        self.assertEqual(len(self.descricoes('atacado')), 3)
+    
+    def test_endpoint(self):
+        """Teste do endpoint de autocompletar"""
+        response = self.client.get(reverse('produtos:autocompletar_produtos'), {'q': 'arr', 'limite': 5})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['produtos'][0]['fornecedor']['nome'], 'Distribuidora São João')
@@ -11,10 +11,13 @@ urlpatterns = [
     
     # APIs
     path('api/listar/', views.listar_produtos, name='listar_produtos'),
+    path('api/autocompletar/', views.autocompletar_produtos, name='autocompletar_produtos'),
     path('api/obter/<int:produto_id>/', views.obter_produto, name='obter_produto'),
     path('api/criar/', views.criar_produto, name='criar_produto'),
     path('api/atualizar/<int:produto_id>/', views.atualizar_produto, name='atualizar_produto'),
     path('api/deletar/<int:produto_id>/', views.deletar_produto, name='deletar_produto'),
+    path('api/alteracoes/', views.alteracoes_produtos, name='alteracoes_produtos'),
+    path('api/snapshot/', views.snapshot_catalogo, name='snapshot_catalogo'),
     path('api/fornecedores/', views.listar_fornecedores, name='listar_fornecedores'),
     path('api/relatorio/', views.relatorio_produtos_vendidos, name='relatorio_produtos_vendidos'),  
 ]
\ No newline at end of file
@@ -1,12 +1,24 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
+from sistema_vendas.cache_catalogo import resposta_versionada
+from sistema_vendas.db_router import usar_replica
+from sistema_vendas.respostas import RespostaJSON
 from django.db.models import Sum, Count
 from datetime import datetime
 import json
 import traceback
-from .logic import ProdutoLogic
+from .logic import ProdutoLogic, SnapshotCatalogoLogic
+from sistema_vendas.compressao import codificacoes_aceitas
+import gzip
+from tarefas.logic import TarefaLogic
+from tarefas.views import resposta_tarefa_enfileirada
+
+# Quantidade máxima de sugestões do autocompletar
+LIMITE_MAXIMO_AUTOCOMPLETAR = 50
 
 
 def consulta_produto(request):
@@ -37,12 +49,38 @@ def listar_produtos(request):
         search = request.GET.get('search', '')
         produtos = ProdutoLogic.listar_produtos(search)
         
-        return JsonResponse({
+        return RespostaJSON({
             'success': True,
             'produtos': produtos
         })
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+def autocompletar_produtos(request):
+    """
+    Endpoint de sugestões para o campo de busca de produtos
+    GET /produtos/api/autocompletar/?q=<termo>&limite=<n>
+    """
+    try:
+        termo = request.GET.get('q', '')
+        try:
+            limite = min(max(int(request.GET.get('limite', 10)), 1), LIMITE_MAXIMO_AUTOCOMPLETAR)
+        except ValueError:
+            limite = 10
+        
+        produtos = ProdutoLogic.autocompletar(termo, limite)
+        
+        return RespostaJSON({
+            'success': True,
+            'produtos': produtos
+        })
+    except Exception as e:
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=500)
@@ -58,17 +96,17 @@ def obter_produto(request, produto_id):
         produto = ProdutoLogic.obter_produto(produto_id)
         
         if produto:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': True,
                 'produto': produto
             })
         else:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': False,
                 'error': 'Produto não encontrado'
             }, status=404)
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=500)
@@ -91,18 +129,18 @@ def criar_produto(request):
             fornecedor_id=data.get('fornecedor')
         )
         
-        return JsonResponse({
+        return RespostaJSON({
             'success': True,
             'produto': produto,
             'message': 'Produto criado com sucesso'
         })
     except ValueError as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=400)
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=500)
@@ -127,23 +165,23 @@ def atualizar_produto(request, produto_id):
         )
         
         if produto:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': True,
                 'produto': produto,
                 'message': 'Produto atualizado com sucesso'
             })
         else:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': False,
                 'error': 'Produto não encontrado'
             }, status=404)
     except ValueError as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=400)
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=500)
@@ -160,23 +198,92 @@ def deletar_produto(request, produto_id):
         success = ProdutoLogic.deletar_produto(produto_id)
         
         if success:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': True,
                 'message': 'Produto deletado com sucesso'
             })
         else:
-            return JsonResponse({
+            return RespostaJSON({
                 'success': False,
                 'error': 'Produto não encontrado'
             }, status=404)
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
+            'success': False,
+            'error': str(e)
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+def alteracoes_produtos(request):
+    """
+    Endpoint de sincronização incremental do catálogo dos terminais
+    GET /produtos/api/alteracoes/?desde=<marca>
+    Retorna os produtos alterados e os IDs removidos desde a marca, e a
+    nova marca a enviar na próxima chamada. Sem "desde" retorna o
+    catálogo completo.
+    """
+    try:
+        desde = request.GET.get('desde')
+        try:
+            desde = int(desde) if desde else None
+        except ValueError:
+            return RespostaJSON({
+                'success': False,
+                'error': 'Marca inválida'
+            }, status=400)
+        
+        alteracoes = ProdutoLogic.alteracoes_catalogo(desde)
+        
+        return RespostaJSON({
+            'success': True,
+            **alteracoes
+        })
+    except Exception as e:
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=500)
 
 
 @require_http_methods(["GET"])
+def snapshot_catalogo(request):
+    """
+    Endpoint que entrega o snapshot completo do catálogo (gzip)
+    GET /produtos/api/snapshot/
+    O ETag é o hash do conteúdo: o terminal revalida com If-None-Match e
+    recebe 304 enquanto o catálogo não mudar. Depois da carga, as
+    alterações vêm de /produtos/api/alteracoes/?desde=<marca do snapshot>.
+    """
+    snapshot = SnapshotCatalogoLogic.atual()
+    if snapshot is None:
+        return RespostaJSON({
+            'success': False,
+            'error': 'Snapshot do catálogo ainda não gerado'
+        }, status=404)
+    
+    etag = f'"{snapshot["hash"]}"'
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        caminho = SnapshotCatalogoLogic.caminho(snapshot)
+        aceitas = codificacoes_aceitas(request.headers.get('Accept-Encoding', ''))
+        
+        if 'gzip' in aceitas or '*' in aceitas:
+            response = FileResponse(open(caminho, 'rb'), content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            with gzip.open(caminho, 'rb') as arquivo:
+                response = HttpResponse(arquivo.read(), content_type='application/json')
+    
+    response['ETag'] = etag
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+@require_http_methods(["GET"])
+@resposta_versionada('fornecedores')
 def listar_fornecedores(request):
     """
     Endpoint para listar todos os fornecedores
@@ -185,12 +292,12 @@ def listar_fornecedores(request):
     try:
         fornecedores = ProdutoLogic.listar_fornecedores()
         
-        return JsonResponse({
+        return RespostaJSON({
             'success': True,
             'fornecedores': fornecedores
         })
     except Exception as e:
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': str(e)
         }, status=500)
@@ -202,12 +309,15 @@ def listar_fornecedores(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@usar_replica
 def relatorio_produtos_vendidos(request):
     """
     Gera relatório de produtos mais vendidos em um período
     POST /produtos/api/relatorio/
     Espera JSON: {"dataInicio": "DD/MM/YYYY", "dataFinal": "DD/MM/YYYY"}
     Retorna: lista dos produtos mais vendidos
+    Com "assincrono": true o relatório é gerado pelo worker e a resposta
+    traz o ID da tarefa (consultar em /tarefas/api/<id>/)
     """
     try:
         data = json.loads(request.body)
@@ -216,43 +326,23 @@ def relatorio_produtos_vendidos(request):
         
         print(f"[DEBUG] Gerando relatório - Período: {data_inicio} até {data_final}")
         
-        # Converter datas de DD/MM/YYYY para objeto datetime
-        data_inicio_obj = datetime.strptime(data_inicio, '%d/%m/%Y')
-        data_final_obj = datetime.strptime(data_final, '%d/%m/%Y')
-        
-        # Importar os modelos necessários
-        from vendas.models import ItemVenda
-        from .models import Produto
+        if data.get('assincrono'):
+            # Valida as datas antes de enfileirar
+            datetime.strptime(data_inicio, '%d/%m/%Y')
+            datetime.strptime(data_final, '%d/%m/%Y')
+            
+            tarefa = TarefaLogic.enfileirar(
+                'produtos.relatorio_produtos_vendidos',
+                {'dataInicio': data_inicio, 'dataFinal': data_final}
+            )
+            print(f"[DEBUG] Relatório enfileirado - Tarefa: {tarefa.id}")
+            return resposta_tarefa_enfileirada(tarefa)
         
-        # Buscar os produtos mais vendidos no período
-        # Agrupa por produto e soma as quantidades vendidas
-        produtos_vendidos = ItemVenda.objects.filter(
-            venda_id__data_venda__date__gte=data_inicio_obj.date(),
-            venda_id__data_venda__date__lte=data_final_obj.date()
-        ).values(
-            'produto_id',
-            'produto_id__id',
-            'produto_id__descricao',
-            'produto_id__preco'
-        ).annotate(
-            quantidade_vendida=Sum('quantidade'),
-            valor_total=Sum('subTotal')
-        ).order_by('-quantidade_vendida')[:10]  # Top 10 produtos
+        produtos_list = ProdutoLogic.relatorio_produtos_vendidos(data_inicio, data_final)
         
-        print(f"[DEBUG] Produtos encontrados: {produtos_vendidos.count()}")
-        
-        # Formatar dados para retorno
-        produtos_list = []
-        for item in produtos_vendidos:
-            produtos_list.append({
-                'id': item['produto_id__id'],
-                'descricao': item['produto_id__descricao'],
-                'quantidade_vendida': item['quantidade_vendida'],
-                'valor_total': f"R$ {float(item['valor_total']):.2f}".replace('.', ','),
-                'preco_unitario': f"R$ {float(item['produto_id__preco']):.2f}".replace('.', ',')
-            })
+        print(f"[DEBUG] Produtos encontrados: {len(produtos_list)}")
         
-        return JsonResponse({
+        return RespostaJSON({
             'success': True,
             'produtos': produtos_list,
             'periodo': {
@@ -263,7 +353,7 @@ def relatorio_produtos_vendidos(request):
         
     except ValueError as e:
         print(f"[ERRO] Data inválida: {str(e)}")
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': 'Data inválida. Use o formato DD/MM/YYYY'
         }, status=400)
@@ -271,7 +361,7 @@ def relatorio_produtos_vendidos(request):
     except Exception as e:
         print(f"[ERRO] Erro ao gerar relatório: {str(e)}")
         print(traceback.format_exc())
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': f'Erro no servidor: {str(e)}'
         }, status=500)
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+Cache versionado das respostas de catálogo (fornecedores e produtos)
+
+Cada tabela tem um contador de geração no cache, incrementado pelas
+escritas (FornecedorService, ProdutoLogic e baixas/entradas de estoque).
+O corpo das respostas fica no cache com a geração na chave, então uma
+escrita invalida tudo sem precisar apagar chaves; a geração também forma o
+ETag, e requisições condicionais recebem 304 sem tocar no banco.
+
+Com mais de um processo o backend de cache precisa ser compartilhado
+(Redis/Memcached) para que a invalidação chegue a todos.
+"""
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+
+def _chave_geracao(tabela):
+    return f'catalogo:geracao:{tabela}'
+
+
+def geracao(tabela):
+    """
+    Retorna a geração atual de uma tabela
+    """
+    chave = _chave_geracao(tabela)
+    valor = cache.get(chave)
+    if valor is None:
+        # Começa pelo relógio para não repetir gerações já usadas caso a
+        # chave tenha sido descartada do cache
+        cache.add(chave, time.time_ns(), timeout=None)
+        valor = cache.get(chave)
+    return valor
+
+
+def _incrementar_geracao(tabela):
+    try:
+        cache.incr(_chave_geracao(tabela))
+    except ValueError:
+        cache.add(_chave_geracao(tabela), time.time_ns(), timeout=None)
+
+
+def invalidar_catalogo(*tabelas):
+    """
+    Incrementa a geração das tabelas após o commit da transação atual
+
+    Incrementar antes do commit permitiria que uma leitura concorrente
+    guardasse os dados antigos já com a geração nova.
+    """
+    for tabela in tabelas:
+        transaction.on_commit(lambda tabela=tabela: _incrementar_geracao(tabela))
+
+
+def resposta_versionada(*tabelas):
+    """
+    Decorator para views GET de catálogo que dependem das tabelas informadas
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            versao = '.'.join(str(geracao(tabela)) for tabela in tabelas)
+            etag = f'"{view_func.__name__}-{versao}"'
+
+            # Comparação fraca: o ETag pode ter voltado como W/"..." após a compressão
+            etags_cliente = [e.removeprefix('W/') for e in parse_etags(request.headers.get('If-None-Match', ''))]
+            if etag in etags_cliente:
+                response = HttpResponseNotModified()
+                response['ETag'] = etag
+                return response
+
+            chave = f'catalogo:resposta:{request.get_full_path()}:{versao}'
+            armazenada = cache.get(chave)
+
+            if armazenada is not None:
+                response = HttpResponse(armazenada['conteudo'], content_type=armazenada['content_type'])
+            else:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming:
+                    return response
+
+                armazenada = {
+                    'conteudo': response.content,
+                    'content_type': response['Content-Type'],
+                }
+                cache.set(chave, armazenada, getattr(settings, 'CACHE_CATALOGO_TIMEOUT', 86400))
+
+            # Permite guardar as versões comprimidas junto do corpo
+            response.cache_catalogo = (chave, armazenada)
+            response['ETag'] = etag
+            # O navegador pode guardar, mas deve revalidar (e receber 304)
+            patch_cache_control(response, no_cache=True)
+            return response
+
+        return _wrapped_view
+
+    return decorator
+
+
+def _chave_item(tabela, versao, item_id):
+    return f'catalogo:item:{tabela}:{versao}:{item_id}'
+
+
+def itens_em_cache(tabela, ids):
+    """
+    Retorna os registros de uma tabela guardados no cache na geração atual
+
+    Returns:
+        dict: Registro por ID, só para os IDs encontrados no cache
+    """
+    versao = geracao(tabela)
+    chaves = {_chave_item(tabela, versao, item_id): item_id for item_id in ids}
+    return {chaves[chave]: valor for chave, valor in cache.get_many(list(chaves)).items()}
+
+
+def armazenar_itens(tabela, itens):
+    """
+    Guarda registros de uma tabela (dict ID -> registro) na geração atual
+    """
+    versao = geracao(tabela)
+    cache.set_many(
+        {_chave_item(tabela, versao, item_id): valor for item_id, valor in itens.items()},
+        getattr(settings, 'CACHE_CATALOGO_TIMEOUT', 86400)
+    )
+
+
+def variante_armazenada(response, codificacao):
+    """
+    Retorna o corpo já comprimido guardado no cache, se houver
+    """
+    entrada = getattr(response, 'cache_catalogo', None)
+    if entrada is None:
+        return None
+    return entrada[1].get(codificacao)
+
+
+def armazenar_variante(response, codificacao, conteudo):
+    """
+    Guarda o corpo comprimido junto da resposta em cache
+    """
+    entrada = getattr(response, 'cache_catalogo', None)
+    if entrada is None:
+        return
+
+    chave, armazenada = entrada
+    armazenada[codificacao] = conteudo
+    cache.set(chave, armazenada, getattr(settings, 'CACHE_CATALOGO_TIMEOUT', 86400))
@@ -0,0 +1,124 @@
+"""
+Cache com revalidação em segundo plano (stale-while-revalidate)
+
+Para agregados lidos com frequência e caros de calcular (totais do
+histórico de compras, totais do dia, indicadores da home), em que alguns
+segundos de atraso são aceitáveis. Cada entrada tem dois prazos:
+
+- fresco: até ele o valor é retornado direto do cache;
+- máximo: depois do prazo fresco e até ele, o valor antigo é retornado na
+  hora e uma única atualização é feita em segundo plano. Passado o prazo
+  máximo a entrada sai do cache e o valor é calculado na requisição.
+
+O cálculo (inicial ou em segundo plano) é protegido por uma trava por
+chave no próprio backend de cache (cache.add), então, mesmo com vários
+processos, só um recalcula; quem encontra o cache vazio e a trava ocupada
+aguarda o valor por alguns instantes antes de calcular por conta própria.
+
+Chamadas dentro de uma transação (atomic) não usam o cache, pois podem
+depender de escritas ainda não confirmadas. Com mais de um processo o
+backend de cache precisa ser compartilhado (Redis/Memcached).
+"""
+import contextvars
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections
+
+from .db_router import lendo_da_replica
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _agendar(funcao):
+    """
+    Executa a função em uma thread de segundo plano
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'CACHE_REVALIDACAO_THREADS', 2),
+                thread_name_prefix='revalidacao'
+            )
+    # Leva o contexto (ex.: leitura na réplica) para a thread
+    contexto = contextvars.copy_context()
+    _executor.submit(contexto.run, funcao)
+
+
+def _chave(nome, args, kwargs):
+    assinatura = repr((lendo_da_replica(), args, sorted(kwargs.items())))
+    return f'revalidar:{nome}:{hashlib.md5(assinatura.encode()).hexdigest()}'
+
+
+def _calcular_e_armazenar(chave, funcao, args, kwargs, fresco, maximo):
+    valor = funcao(*args, **kwargs)
+    cache.set(chave, {'valor': valor, 'fresco_ate': time.time() + fresco}, maximo)
+    return valor
+
+
+def _atualizar_em_segundo_plano(chave, trava, funcao, args, kwargs, fresco, maximo):
+    try:
+        _calcular_e_armazenar(chave, funcao, args, kwargs, fresco, maximo)
+    except Exception as e:
+        # O valor antigo continua sendo servido até o prazo máximo
+        print(f"[ERRO] Falha ao revalidar {chave}: {str(e)}")
+    finally:
+        cache.delete(trava)
+        # A thread é reaproveitada: devolve as conexões abertas por ela
+        connections.close_all()
+
+
+def cache_revalidado(nome, fresco=30, maximo=300):
+    """
+    Decorator que guarda o resultado no cache e o revalida em segundo plano
+
+    Args:
+        nome (str): Nome da função (parte da chave do cache)
+        fresco (int): Segundos em que o valor é servido sem revalidar
+        maximo (int): Segundos em que o valor antigo ainda pode ser servido
+    """
+    def decorator(funcao):
+        @wraps(funcao)
+        def _wrapped(*args, **kwargs):
+            if connection.in_atomic_block:
+                return funcao(*args, **kwargs)
+
+            chave = _chave(nome, args, kwargs)
+            trava = f'{chave}:trava'
+            prazo_trava = getattr(settings, 'CACHE_REVALIDACAO_TRAVA_SEGUNDOS', 30)
+
+            entrada = cache.get(chave)
+            if entrada is not None:
+                if entrada['fresco_ate'] <= time.time() and cache.add(trava, 1, prazo_trava):
+                    _agendar(lambda: _atualizar_em_segundo_plano(
+                        chave, trava, funcao, args, kwargs, fresco, maximo
+                    ))
+                return entrada['valor']
+
+            # Cache vazio: só quem obtém a trava calcula; os demais aguardam
+            # o valor por um tempo limitado
+            if not cache.add(trava, 1, prazo_trava):
+                limite = time.monotonic() + getattr(settings, 'CACHE_REVALIDACAO_ESPERA_SEGUNDOS', 5)
+                while time.monotonic() < limite:
+                    time.sleep(0.05)
+                    entrada = cache.get(chave)
+                    if entrada is not None:
+                        return entrada['valor']
+                return _calcular_e_armazenar(chave, funcao, args, kwargs, fresco, maximo)
+
+            try:
+                return _calcular_e_armazenar(chave, funcao, args, kwargs, fresco, maximo)
+            finally:
+                cache.delete(trava)
+
+        return _wrapped
+
+    return decorator
@@ -0,0 +1,117 @@
+"""
+Coalescência de leituras idênticas e simultâneas (single-flight)
+
+Quando várias requisições do mesmo processo pedem a mesma consulta ao
+mesmo tempo (mesma função e mesmos argumentos), apenas a primeira executa;
+as demais aguardam e recebem o mesmo resultado (ou a mesma exceção). Os
+contadores por função indicam quantas execuções foram economizadas.
+
+O resultado é compartilhado entre as requisições e deve ser tratado como
+somente leitura. Chamadas dentro de uma transação (atomic) não são
+coalescidas, pois podem depender de escritas ainda não confirmadas, e
+leituras na réplica e no principal nunca compartilham resultado.
+"""
+import threading
+from functools import wraps
+
+from django.db import connection
+
+from .db_router import lendo_da_replica
+
+
+class _Chamada:
+    """
+    Execução em andamento de uma chave
+    """
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class Coalescedor:
+    """
+    Registro das execuções em andamento e dos contadores por função
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.em_andamento = {}
+        self.contadores = {}
+
+    def executar(self, nome, chave, funcao, *args, **kwargs):
+        """
+        Executa a função, ou aguarda a execução idêntica já em andamento
+        """
+        with self.lock:
+            contador = self.contadores.setdefault(nome, {'executadas': 0, 'economizadas': 0})
+            chamada = self.em_andamento.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = self.em_andamento[chave] = _Chamada()
+                contador['executadas'] += 1
+            else:
+                contador['economizadas'] += 1
+
+        if not lider:
+            chamada.evento.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = funcao(*args, **kwargs)
+            return chamada.resultado
+        except Exception as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self.lock:
+                del self.em_andamento[chave]
+            chamada.evento.set()
+
+    def estatisticas(self):
+        """
+        Retorna uma cópia dos contadores por função
+        """
+        with self.lock:
+            return {nome: dict(contador) for nome, contador in self.contadores.items()}
+
+    def zerar(self):
+        """
+        Zera os contadores
+        """
+        with self.lock:
+            self.contadores.clear()
+
+
+coalescedor = Coalescedor()
+
+
+def coalescer(nome):
+    """
+    Decorator que coalesce chamadas simultâneas com os mesmos argumentos
+
+    Args:
+        nome (str): Nome da função nos contadores
+    """
+    def decorator(funcao):
+        @wraps(funcao)
+        def _wrapped(*args, **kwargs):
+            if connection.in_atomic_block:
+                return funcao(*args, **kwargs)
+
+            chave = (nome, lendo_da_replica(), repr(args), repr(sorted(kwargs.items())))
+            return coalescedor.executar(nome, chave, funcao, *args, **kwargs)
+
+        return _wrapped
+
+    return decorator
+
+
+def estatisticas():
+    """
+    Contadores do processo: execuções no banco e execuções economizadas
+    """
+    return coalescedor.estatisticas()
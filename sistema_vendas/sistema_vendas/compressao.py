@@ -0,0 +1,119 @@
+"""
+Compressão das respostas JSON e HTML (brotli ou gzip, conforme o
+Accept-Encoding do navegador)
+
+Respostas menores que COMPRESSAO_TAMANHO_MINIMO não são comprimidas. Para
+respostas servidas pelo cache de catálogo os bytes comprimidos ficam
+guardados junto do corpo e são reaproveitados nas próximas requisições.
+
+HTML (que pode conter o token CSRF) usa apenas gzip com bytes aleatórios
+no cabeçalho, como o GZipMiddleware do Django, para mitigar o BREACH.
+"""
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_string
+
+from .cache_catalogo import armazenar_variante, variante_armazenada
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+TIPOS_COMPRIMIVEIS = ('application/json', 'text/html')
+
+re_accept_encoding = _lazy_re_compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*')
+
+
+def codificacoes_aceitas(accept_encoding):
+    """
+    Retorna as codificações aceitas pelo cliente (q > 0)
+    """
+    aceitas = set()
+    for parte in accept_encoding.split(','):
+        encontrado = re_accept_encoding.fullmatch(parte)
+        if not encontrado:
+            continue
+
+        codificacao, q = encontrado.groups()
+        try:
+            if q is not None and float(q) <= 0:
+                continue
+        except ValueError:
+            continue
+        aceitas.add(codificacao.lower())
+
+    return aceitas
+
+
+def escolher_codificacao(accept_encoding, permitir_brotli=True):
+    """
+    Escolhe a codificação da resposta: brotli (se disponível) e depois gzip
+    """
+    aceitas = codificacoes_aceitas(accept_encoding)
+
+    if permitir_brotli and brotli is not None and ('br' in aceitas or '*' in aceitas):
+        return 'br'
+    if 'gzip' in aceitas or '*' in aceitas:
+        return 'gzip'
+    return None
+
+
+def comprimir(conteudo, codificacao, max_random_bytes=None):
+    """
+    Comprime o conteúdo na codificação escolhida
+    """
+    if codificacao == 'br':
+        return brotli.compress(conteudo, quality=5)
+    return compress_string(conteudo, max_random_bytes=max_random_bytes)
+
+
+class CompressaoMiddleware:
+    """
+    Middleware que comprime respostas JSON e HTML acima do tamanho mínimo
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or response.status_code < 200 or response.status_code == 204
+            or not response.get('Content-Type', '').startswith(TIPOS_COMPRIMIVEIS)
+            or len(response.content) < getattr(settings, 'COMPRESSAO_TAMANHO_MINIMO', 1024)
+        ):
+            return response
+
+        html = response['Content-Type'].startswith('text/html')
+        codificacao = escolher_codificacao(
+            request.headers.get('Accept-Encoding', ''), permitir_brotli=not html
+        )
+        if codificacao is None:
+            return response
+
+        conteudo = variante_armazenada(response, codificacao)
+        if conteudo is None:
+            conteudo = comprimir(response.content, codificacao, max_random_bytes=100 if html else None)
+            armazenar_variante(response, codificacao, conteudo)
+
+        if len(conteudo) >= len(response.content):
+            return response
+
+        response.content = conteudo
+        response['Content-Length'] = str(len(conteudo))
+        response['Content-Encoding'] = codificacao
+
+        # O corpo comprimido é outra representação: o ETag passa a ser fraco
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        return response
@@ -0,0 +1,149 @@
+"""
+Roteamento de leituras para a réplica do banco de dados
+
+As telas de relatório e histórico optam pela réplica com o decorator
+``usar_replica``. Escritas sempre vão para o banco principal e, depois de
+uma escrita, o cliente permanece no principal por alguns segundos (janela
+configurada em REPLICA_JANELA_SEGUNDOS) para não ler dados desatualizados.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+COOKIE_JANELA_PRIMARIO = 'primario_ate'
+
+_usar_replica = ContextVar('usar_replica', default=False)
+_houve_escrita = ContextVar('houve_escrita', default=False)
+# Escrita feita dentro do bloco de leitura na réplica: as leituras seguintes
+# do bloco voltam ao principal, que já tem o dado recém-gravado
+_escrita_no_bloco = ContextVar('escrita_no_bloco', default=False)
+
+
+def alias_replica():
+    """
+    Retorna o alias da réplica, ou None se ela não estiver configurada ou
+    apontar para o mesmo banco do principal (desenvolvimento e testes, em
+    que a réplica é um espelho do default)
+    """
+    alias = getattr(settings, 'REPLICA_DB_ALIAS', 'replica')
+    if alias not in settings.DATABASES:
+        return None
+
+    replica = connections[alias].settings_dict
+    principal = connections[DEFAULT_DB_ALIAS].settings_dict
+    if all(replica.get(chave) == principal.get(chave) for chave in ('ENGINE', 'NAME', 'HOST', 'PORT')):
+        return None
+
+    return alias
+
+
+def janela_primario_ativa(request):
+    """
+    Verifica se o cliente escreveu recentemente e deve ler do principal
+    """
+    if _houve_escrita.get():
+        return True
+
+    try:
+        return float(request.COOKIES.get(COOKIE_JANELA_PRIMARIO, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+@contextmanager
+def ler_da_replica():
+    """
+    Envia as leituras do bloco para a réplica (até a primeira escrita)
+    """
+    token = _usar_replica.set(True)
+    token_escrita = _escrita_no_bloco.set(False)
+    try:
+        yield
+    finally:
+        _escrita_no_bloco.reset(token_escrita)
+        _usar_replica.reset(token)
+
+
+def lendo_da_replica():
+    """
+    Indica se as leituras do contexto atual vão para a réplica
+    """
+    return _usar_replica.get() and not _escrita_no_bloco.get() and alias_replica() is not None
+
+
+def usar_replica(view_func):
+    """
+    Decorator para views somente leitura que podem consultar a réplica
+
+    Dentro da janela de leitura no principal (após uma escrita do mesmo
+    cliente) a view é executada normalmente no banco principal.
+    """
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if janela_primario_ativa(request):
+            return view_func(request, *args, **kwargs)
+
+        with ler_da_replica():
+            return view_func(request, *args, **kwargs)
+
+    return _wrapped_view
+
+
+class ReplicaRouter:
+    """
+    Router que direciona para a réplica apenas as leituras marcadas
+    """
+
+    def db_for_read(self, model, **hints):
+        if _usar_replica.get() and not _escrita_no_bloco.get():
+            return alias_replica()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Registra a escrita para abrir a janela de leitura no principal
+        _houve_escrita.set(True)
+        _escrita_no_bloco.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Principal e réplica contêm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == alias_replica():
+            return False
+        return None
+
+
+class JanelaPrimarioMiddleware:
+    """
+    Middleware que, após uma requisição com escrita no banco, mantém o
+    cliente lendo do principal durante REPLICA_JANELA_SEGUNDOS
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _houve_escrita.set(False)
+        try:
+            response = self.get_response(request)
+
+            if _houve_escrita.get():
+                janela = getattr(settings, 'REPLICA_JANELA_SEGUNDOS', 5)
+                response.set_cookie(
+                    COOKIE_JANELA_PRIMARIO,
+                    f'{time.time() + janela:.3f}',
+                    max_age=janela,
+                    httponly=True,
+                    samesite='Lax'
+                )
+        finally:
+            _houve_escrita.reset(token)
+
+        return response
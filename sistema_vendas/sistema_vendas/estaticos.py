@@ -0,0 +1,139 @@
+"""
+Arquivos estáticos com nomes versionados, cache longo e versões
+pré-comprimidas
+
+Em produção (DEBUG=False) o collectstatic grava os arquivos com o hash do
+conteúdo no nome (ManifestStaticFilesStorage) e, ao lado de cada um, as
+versões .gz (e .br, se o brotli estiver instalado). O middleware serve o
+STATIC_ROOT: arquivos versionados recebem cache de um ano (o nome muda
+quando o conteúdo muda) e a versão comprimida é escolhida conforme o
+Accept-Encoding, sem comprimir nada durante a requisição.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .compressao import codificacoes_aceitas
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+EXTENSOES_COMPRIMIVEIS = ('.css', '.js', '.svg', '.json', '.txt', '.map')
+
+# Extensões das versões pré-comprimidas, na ordem de preferência
+CODIFICACOES = (('br', '.br'), ('gzip', '.gz'))
+
+CACHE_VERSIONADO = 'public, max-age=31536000, immutable'
+CACHE_SEM_VERSAO = 'public, max-age=60'
+
+# Hash de 12 caracteres que o ManifestStaticFilesStorage insere no nome
+re_nome_versionado = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+
+
+def comprimir_arquivo(caminho):
+    """
+    Grava as versões .gz e .br de um arquivo quando ficam menores que ele
+    """
+    with open(caminho, 'rb') as arquivo:
+        conteudo = arquivo.read()
+
+    variantes = {'.gz': gzip.compress(conteudo, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variantes['.br'] = brotli.compress(conteudo, quality=11)
+
+    for extensao, comprimido in variantes.items():
+        if len(comprimido) < len(conteudo):
+            with open(caminho + extensao, 'wb') as arquivo:
+                arquivo.write(comprimido)
+
+
+class ArmazenamentoEstaticoComprimido(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage que também gera as versões pré-comprimidas
+    dos arquivos versionados
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        versionados = set()
+        for nome, nome_versionado, processado in super().post_process(paths, dry_run, **options):
+            if nome_versionado and not isinstance(processado, Exception):
+                versionados.add(nome_versionado)
+            yield nome, nome_versionado, processado
+
+        if dry_run:
+            return
+
+        for nome in versionados:
+            if nome.endswith(EXTENSOES_COMPRIMIVEIS):
+                comprimir_arquivo(self.path(nome))
+
+
+class ArquivosEstaticosMiddleware:
+    """
+    Middleware que serve o STATIC_ROOT com cache longo e negociação das
+    versões pré-comprimidas
+
+    Em desenvolvimento o runserver serve os arquivos antes dos middlewares,
+    então este só atua em produção.
+    """
+
+    def __init__(self, get_response):
+        if not settings.STATIC_ROOT or not settings.STATIC_URL:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        prefixo = settings.STATIC_URL
+        if request.method not in ('GET', 'HEAD') or not request.path.startswith(prefixo):
+            return self.get_response(request)
+
+        nome = request.path[len(prefixo):]
+        try:
+            caminho = safe_join(settings.STATIC_ROOT, nome)
+        except SuspiciousFileOperation:
+            return self.get_response(request)
+
+        if not nome or not os.path.isfile(caminho):
+            return self.get_response(request)
+
+        return self.servir(request, nome, caminho)
+
+    @staticmethod
+    def servir(request, nome, caminho):
+        """
+        Monta a resposta do arquivo, usando a versão comprimida se aceita
+        """
+        aceitas = codificacoes_aceitas(request.headers.get('Accept-Encoding', ''))
+        codificacao = None
+        for candidata, extensao in CODIFICACOES:
+            if (candidata in aceitas or '*' in aceitas) and os.path.isfile(caminho + extensao):
+                codificacao = candidata
+                caminho += extensao
+                break
+
+        estado = os.stat(caminho)
+        if not was_modified_since(request.headers.get('If-Modified-Since'), estado.st_mtime):
+            response = HttpResponseNotModified()
+        else:
+            content_type = mimetypes.guess_type(nome)[0] or 'application/octet-stream'
+            response = FileResponse(open(caminho, 'rb'), content_type=content_type)
+            if codificacao:
+                response['Content-Encoding'] = codificacao
+
+        response['Last-Modified'] = http_date(estado.st_mtime)
+        response['Cache-Control'] = CACHE_VERSIONADO if re_nome_versionado.search(nome) else CACHE_SEM_VERSAO
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
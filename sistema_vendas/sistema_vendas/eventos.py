@@ -0,0 +1,127 @@
+"""
+Canal de eventos em memória para o stream de Server-Sent Events
+
+As escritas publicam eventos (nova venda, alteração de estoque) após o
+commit da transação; cada conexão SSE aberta no processo é um assinante
+com uma fila própria. O canal guarda os últimos eventos para que um
+cliente que reconecta (cabeçalho Last-Event-ID) receba o que perdeu.
+
+O canal é do processo: com mais de um processo (workers do servidor ASGI),
+cada um só entrega os eventos gerados nele, e a distribuição entre
+processos precisaria de um broker compartilhado (ex.: Redis pub/sub).
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+
+
+class Assinatura:
+    """
+    Fila de eventos de uma conexão, ligada ao event loop que a consome
+    """
+
+    def __init__(self, loop, tamanho):
+        self.loop = loop
+        self.fila = asyncio.Queue(maxsize=tamanho)
+        self.encerrada = False
+
+    def entregar(self, evento):
+        # Executado no event loop da conexão
+        if self.encerrada:
+            return
+        try:
+            self.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento: encerra a conexão; ao reconectar ele recupera
+            # os eventos perdidos pelo Last-Event-ID
+            self.encerrada = True
+
+    async def proximo(self, timeout):
+        """
+        Aguarda o próximo evento; None em caso de timeout ou encerramento
+        """
+        if self.encerrada:
+            return None
+        try:
+            return await asyncio.wait_for(self.fila.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class CanalEventos:
+    """
+    Publicação e assinatura de eventos dentro do processo
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.assinaturas = set()
+        # IDs começam pelo relógio (microssegundos) para continuarem
+        # crescentes depois de um reinício do processo
+        self.ultimo = time.time_ns() // 1000
+        self.historico = deque(maxlen=getattr(settings, 'EVENTOS_HISTORICO', 200))
+
+    def publicar(self, tipo, dados):
+        """
+        Publica um evento para todas as conexões abertas
+
+        Pode ser chamado de qualquer thread (views síncronas ou assíncronas).
+        """
+        with self.lock:
+            self.ultimo += 1
+            evento = {'id': self.ultimo, 'tipo': tipo, 'dados': dados}
+            self.historico.append(evento)
+            assinaturas = list(self.assinaturas)
+
+        for assinatura in assinaturas:
+            try:
+                assinatura.loop.call_soon_threadsafe(assinatura.entregar, evento)
+            except RuntimeError:
+                # Event loop já encerrado
+                self.cancelar(assinatura)
+        return evento
+
+    def assinar(self):
+        """
+        Cria uma assinatura no event loop atual
+        """
+        assinatura = Assinatura(asyncio.get_running_loop(), getattr(settings, 'EVENTOS_FILA_MAXIMA', 100))
+        with self.lock:
+            self.assinaturas.add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura):
+        """
+        Remove uma assinatura
+        """
+        with self.lock:
+            self.assinaturas.discard(assinatura)
+
+    def ultimo_id(self):
+        """
+        ID do último evento publicado
+        """
+        with self.lock:
+            return self.ultimo
+
+    def desde(self, ultimo_id):
+        """
+        Eventos do histórico posteriores ao ID informado
+        """
+        with self.lock:
+            return [evento for evento in self.historico if evento['id'] > ultimo_id]
+
+
+canal_eventos = CanalEventos()
+
+
+def publicar_apos_commit(tipo, dados):
+    """
+    Publica o evento após o commit da transação atual (ou na hora, fora de
+    uma transação); em caso de rollback nada é publicado
+    """
+    transaction.on_commit(lambda: canal_eventos.publicar(tipo, dados))
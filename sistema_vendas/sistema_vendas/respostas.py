@@ -0,0 +1,101 @@
+"""
+Resposta JSON usada pelas APIs do sistema
+
+Substitui o JsonResponse do Django: usa o orjson quando instalado (bem mais
+rápido em listagens grandes) e o json da biblioteca padrão caso contrário.
+Decimal e datetime são serializados diretamente, então as views e services
+não precisam converter valores com float() antes de responder.
+
+Os dois caminhos geram o mesmo conteúdo, para que a resposta não mude
+quando o orjson não está instalado:
+
+- Decimal é sempre número JSON (Decimal('10.50') -> 10.5), qualquer que
+  seja o valor, para que o mesmo campo tenha sempre o mesmo tipo. Os
+  DecimalField dos models têm até 10 dígitos, que um double representa sem
+  perda;
+- datas e horas seguem o formato do DjangoJSONEncoder (ISO 8601 com
+  milissegundos e 'Z' para UTC), também no orjson.
+"""
+import datetime
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def converter_decimal(valor):
+    """
+    Converte um Decimal para número JSON (NaN e infinito, que não existem em
+    JSON, viram null)
+    """
+    if not valor.is_finite():
+        return None
+    return float(valor)
+
+
+class EncoderJSON(DjangoJSONEncoder):
+    """
+    Encoder da biblioteca padrão com a mesma regra de Decimal do orjson
+    """
+
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return converter_decimal(o)
+        return super().default(o)
+
+
+def _default_orjson(valor):
+    if isinstance(valor, Decimal):
+        return converter_decimal(valor)
+    # Datas chegam aqui pelo OPT_PASSTHROUGH_DATETIME: mesmo formato do fallback
+    if isinstance(valor, (datetime.datetime, datetime.date, datetime.time, datetime.timedelta)):
+        return DjangoJSONEncoder().default(valor)
+    raise TypeError(f'Objeto do tipo {type(valor).__name__} não é serializável em JSON')
+
+
+def usar_orjson():
+    """
+    Indica se o encoder acelerado está disponível e habilitado
+    """
+    return orjson is not None and getattr(settings, 'RESPOSTA_JSON_ACELERADA', True)
+
+
+def serializar_json(dados):
+    """
+    Serializa os dados em bytes JSON (UTF-8)
+    """
+    if usar_orjson():
+        return orjson.dumps(
+            dados,
+            default=_default_orjson,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+    return json.dumps(dados, cls=EncoderJSON, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class RespostaJSON(HttpResponse):
+    """
+    HttpResponse com corpo JSON, compatível com o JsonResponse do Django
+
+    Args:
+        dados: Objeto a serializar (dict, a menos que safe=False)
+        safe (bool): Exige que os dados sejam um dict, como no JsonResponse
+    """
+
+    def __init__(self, dados, safe=True, **kwargs):
+        if safe and not isinstance(dados, dict):
+            raise TypeError(
+                'Somente objetos dict podem ser serializados. Para outros '
+                'tipos use safe=False.'
+            )
+
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=serializar_json(dados), **kwargs)
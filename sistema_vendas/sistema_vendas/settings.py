@@ -42,17 +42,21 @@ INSTALLED_APPS = [
     'funcionarios',
     'home',
     'produtos',
+    'tarefas',
     'vendas'
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'sistema_vendas.estaticos.ArquivosEstaticosMiddleware',
+    'sistema_vendas.compressao.CompressaoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'sistema_vendas.db_router.JanelaPrimarioMiddleware',
 ]
 
 ROOT_URLCONF = 'sistema_vendas.urls'
@@ -86,9 +90,83 @@ DATABASES = {
         'PASSWORD': '',
         'HOST': 'localhost',
         'PORT': '5432'
+    },
+    # Réplica somente leitura usada pelas telas de relatório e histórico
+    # (ajuste HOST para o servidor da réplica). Nos testes aponta para o default.
+    'replica': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': 'SistemaVendas',
+        'USER': 'postgres',
+        'PASSWORD': '',
+        'HOST': 'localhost',
+        'PORT': '5432',
+        'TEST': {
+            'MIRROR': 'default',
+        },
     }
 }
 
+# Cache local por processo; com vários workers use um backend compartilhado
+# (Redis/Memcached) para que a invalidação do cache de catálogo chegue a todos
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sistema-vendas',
+        # Os relatórios guardam um agregado por dia encerrado
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Validade (segundos) dos agregados por dia encerrado dos relatórios de
+# vendas; None = sem expiração (só são invalidados por vendas retroativas)
+CACHE_RELATORIOS_TIMEOUT = None
+
+# Cache com revalidação em segundo plano dos agregados de relatórios:
+# threads de atualização por processo, validade da trava de recálculo e
+# quanto tempo uma requisição aguarda o cálculo feito por outra
+CACHE_REVALIDACAO_THREADS = 2
+CACHE_REVALIDACAO_TRAVA_SEGUNDOS = 30
+CACHE_REVALIDACAO_ESPERA_SEGUNDOS = 5
+
+# Painel gerencial: produtos com estoque até ESTOQUE_MINIMO aparecem como
+# estoque baixo, e o ranking de mais vendidos cobre os últimos N dias
+ESTOQUE_MINIMO = 10
+DASHBOARD_DIAS_RANKING = 7
+
+# Stream de eventos (SSE) de vendas e estoque: eventos guardados para quem
+# reconecta (Last-Event-ID) e eventos pendentes por conexão antes de
+# desconectar um cliente lento. O stream contínuo requer servidor ASGI
+# (ex.: uvicorn sistema_vendas.asgi:application)
+EVENTOS_HISTORICO = 200
+EVENTOS_FILA_MAXIMA = 100
+
+# Respostas JSON/HTML menores que isso (bytes) não são comprimidas
+COMPRESSAO_TAMANHO_MINIMO = 1024
+
+# Usa o orjson (se instalado) para serializar as respostas JSON
+RESPOSTA_JSON_ACELERADA = True
+
+# Validade (segundos) das respostas de catálogo guardadas no cache
+CACHE_CATALOGO_TIMEOUT = 60 * 60 * 24
+
+# Atraso (segundos) da janela da sincronização incremental do catálogo,
+# maior que a duração esperada das transações que alteram produtos
+CATALOGO_DELTA_MARGEM_SEGUNDOS = 5
+
+# Atraso (segundos) do fim da janela da exportação incremental para BI
+# (manage.py exportar_analytics), pelo mesmo motivo
+EXPORTACAO_MARGEM_SEGUNDOS = 60
+
+# Diretório do snapshot comprimido do catálogo (manage.py gerar_snapshot_catalogo)
+CATALOGO_SNAPSHOT_DIR = BASE_DIR / 'snapshots'
+
+DATABASE_ROUTERS = ['sistema_vendas.db_router.ReplicaRouter']
+
+REPLICA_DB_ALIAS = 'replica'
+
+# Segundos em que o cliente continua lendo do principal após uma escrita
+REPLICA_JANELA_SEGUNDOS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -126,6 +204,22 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Em produção os arquivos estáticos têm o hash do conteúdo no nome e
+# versões pré-comprimidas (python manage.py collectstatic)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'sistema_vendas.estaticos.ArmazenamentoEstaticoComprimido'
+        ),
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -24,5 +24,6 @@ urlpatterns = [
     path('funcionarios/', include('funcionarios.urls')),
     path('venda/', include('vendas.urls')),
     path('produtos/', include('produtos.urls')),
+    path('tarefas/', include('tarefas.urls')),
     path('admin/', admin.site.urls),
 ]
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TarefasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tarefas'
+
+    def ready(self):
+        # Carrega os módulos tarefas.py de cada app, que registram os tipos de tarefa
+        autodiscover_modules('tarefas')
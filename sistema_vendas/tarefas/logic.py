@@ -0,0 +1,165 @@
+from datetime import timedelta
+import traceback
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Tarefa
+
+
+# Tipos de tarefa registrados: nome -> função que recebe os parâmetros
+TIPOS_TAREFA = {}
+
+
+class TarefaLogic:
+    """
+    Classe com a lógica da fila de tarefas em segundo plano
+
+    A fila é a própria tabela de tarefas: as views enfileiram e retornam o
+    ID imediatamente, e o comando processar_tarefas executa as pendentes.
+    """
+    
+    @staticmethod
+    def registrar(tipo):
+        """
+        Decorator que registra uma função como tipo de tarefa
+        
+        A função recebe o dicionário de parâmetros e retorna o resultado
+        (serializável em JSON), que fica gravado na tarefa.
+        """
+        def decorator(funcao):
+            TIPOS_TAREFA[tipo] = funcao
+            return funcao
+        return decorator
+    
+    @staticmethod
+    def enfileirar(tipo, parametros=None, max_tentativas=1):
+        """
+        Cria uma tarefa pendente
+        
+        Raises:
+            ValueError: Se o tipo não estiver registrado
+        """
+        if tipo not in TIPOS_TAREFA:
+            raise ValueError(f'Tipo de tarefa desconhecido: {tipo}')
+        
+        return Tarefa.objects.create(
+            tipo=tipo,
+            parametros=parametros or {},
+            max_tentativas=max_tentativas
+        )
+    
+    @staticmethod
+    def reservar_proxima():
+        """
+        Marca a próxima tarefa pendente como em execução e a retorna
+        
+        O SKIP LOCKED permite vários workers sem que dois peguem a mesma tarefa.
+        """
+        with transaction.atomic():
+            tarefa = Tarefa.objects.select_for_update(skip_locked=True).filter(
+                status='pendente'
+            ).order_by('id').first()
+            
+            if tarefa is None:
+                return None
+            
+            tarefa.status = 'executando'
+            tarefa.iniciado_em = timezone.now()
+            tarefa.tentativas += 1
+            tarefa.save(update_fields=['status', 'iniciado_em', 'tentativas'])
+        
+        return tarefa
+    
+    @staticmethod
+    def executar(tarefa):
+        """
+        Executa uma tarefa reservada e grava o resultado ou o erro
+        """
+        funcao = TIPOS_TAREFA.get(tarefa.tipo)
+        
+        try:
+            if funcao is None:
+                raise ValueError(f'Tipo de tarefa desconhecido: {tarefa.tipo}')
+            
+            tarefa.resultado = funcao(tarefa.parametros)
+            tarefa.status = 'concluida'
+            tarefa.erro = ''
+        except Exception:
+            tarefa.erro = traceback.format_exc()
+            # Volta para a fila enquanto houver tentativas
+            tarefa.status = 'pendente' if tarefa.tentativas < tarefa.max_tentativas else 'erro'
+        
+        tarefa.concluido_em = timezone.now() if tarefa.status != 'pendente' else None
+        # Só grava se a reserva ainda é deste worker: se a tarefa foi
+        # liberada como travada (e talvez reservada por outro), o resultado
+        # atrasado é descartado
+        Tarefa.objects.filter(
+            pk=tarefa.pk,
+            status='executando',
+            iniciado_em=tarefa.iniciado_em
+        ).update(
+            resultado=tarefa.resultado,
+            status=tarefa.status,
+            erro=tarefa.erro,
+            concluido_em=tarefa.concluido_em
+        )
+        
+        return tarefa
+    
+    @staticmethod
+    def processar_pendentes(limite=None):
+        """
+        Executa tarefas pendentes até esvaziar a fila (ou atingir o limite)
+        
+        Returns:
+            int: Quantidade de tarefas executadas
+        """
+        executadas = 0
+        while limite is None or executadas < limite:
+            tarefa = TarefaLogic.reservar_proxima()
+            if tarefa is None:
+                break
+            
+            TarefaLogic.executar(tarefa)
+            executadas += 1
+        
+        return executadas
+    
+    @staticmethod
+    def liberar_travadas(minutos=30):
+        """
+        Devolve à fila tarefas em execução há muito tempo (worker interrompido)
+        
+        Só são liberadas tarefas ainda em execução e reservadas antes do
+        limite; a condição fica no próprio UPDATE, então uma tarefa concluída
+        ou reservada de novo nesse meio-tempo não é afetada. Tarefas de
+        outros workers ainda ativos (reservadas há menos tempo) continuam
+        com eles.
+        
+        Returns:
+            int: Quantidade de tarefas liberadas
+        """
+        limite = timezone.now() - timedelta(minutes=minutos)
+        return Tarefa.objects.filter(
+            status='executando',
+            iniciado_em__isnull=False,
+            iniciado_em__lt=limite
+        ).update(status='pendente')
+    
+    @staticmethod
+    def serializar_tarefa(tarefa):
+        """
+        Converte a tarefa para o formato da API de status
+        """
+        return {
+            'id': tarefa.id,
+            'tipo': tarefa.tipo,
+            'status': tarefa.status,
+            'tentativas': tarefa.tentativas,
+            'criado_em': tarefa.criado_em.isoformat(),
+            'iniciado_em': tarefa.iniciado_em.isoformat() if tarefa.iniciado_em else None,
+            'concluido_em': tarefa.concluido_em.isoformat() if tarefa.concluido_em else None,
+            'resultado': tarefa.resultado if tarefa.status == 'concluida' else None,
+            'erro': tarefa.erro.strip().splitlines()[-1] if tarefa.status == 'erro' and tarefa.erro else None,
+        }
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tarefas.logic import TarefaLogic
+
+
+class Command(BaseCommand):
+    """
+    Worker da fila de tarefas em segundo plano
+
+    Uso:
+        python manage.py processar_tarefas
+        python manage.py processar_tarefas --uma-vez
+    """
+
+    help = 'Executa as tarefas pendentes da fila'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--uma-vez',
+            action='store_true',
+            help='Processa as tarefas pendentes e encerra'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=2.0,
+            help='Segundos de espera quando a fila está vazia'
+        )
+        parser.add_argument(
+            '--travadas-minutos',
+            type=int,
+            default=30,
+            help='Devolve à fila tarefas em execução há mais minutos que isso'
+        )
+        parser.add_argument(
+            '--liberar-a-cada',
+            type=float,
+            default=60.0,
+            help='Segundos entre as verificações de tarefas travadas'
+        )
+
+    def handle(self, *args, **options):
+        proxima_liberacao = 0
+
+        while True:
+            # Processo de longa duração: descarta conexões que passaram do
+            # CONN_MAX_AGE ou caíram (ex.: reinício do banco) antes de cada ciclo
+            close_old_connections()
+
+            # Verificação periódica, e não só na partida: a reserva de um
+            # worker que morreu enquanto os outros seguem rodando também volta à fila
+            if time.monotonic() >= proxima_liberacao:
+                liberadas = TarefaLogic.liberar_travadas(options['travadas_minutos'])
+                if liberadas:
+                    self.stdout.write(f'{liberadas} tarefa(s) travada(s) devolvida(s) à fila')
+                proxima_liberacao = time.monotonic() + options['liberar_a_cada']
+
+            executadas = TarefaLogic.processar_pendentes()
+            if executadas:
+                self.stdout.write(f'{executadas} tarefa(s) executada(s)')
+
+            if options['uma_vez']:
+                break
+
+            time.sleep(options['intervalo'])
@@ -0,0 +1,46 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class Tarefa(models.Model):
+    """
+    Model que representa uma tarefa em segundo plano (relatórios pesados,
+    operações em lote), executada pelo comando processar_tarefas
+    """
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('executando', 'Executando'),
+        ('concluida', 'Concluída'),
+        ('erro', 'Erro'),
+    ]
+    
+    id = models.BigAutoField(primary_key=True)
+    tipo = models.CharField(max_length=100, verbose_name="Tipo")
+    parametros = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name="Parâmetros")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pendente',
+        verbose_name="Status"
+    )
+    resultado = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder, verbose_name="Resultado")
+    erro = models.TextField(blank=True, default='', verbose_name="Erro")
+    tentativas = models.PositiveIntegerField(default=0, verbose_name="Tentativas")
+    max_tentativas = models.PositiveIntegerField(default=1, verbose_name="Máximo de Tentativas")
+    criado_em = models.DateTimeField(default=timezone.now, verbose_name="Criado em")
+    iniciado_em = models.DateTimeField(null=True, blank=True, verbose_name="Iniciado em")
+    concluido_em = models.DateTimeField(null=True, blank=True, verbose_name="Concluído em")
+    
+    class Meta:
+        db_table = 'tarefas'
+        verbose_name = "Tarefa"
+        verbose_name_plural = "Tarefas"
+        ordering = ['-id']
+        indexes = [
+            # Fila: próximas tarefas pendentes em ordem de chegada
+            models.Index(fields=['status', 'id'], name='tarefa_status_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Tarefa #{self.id} - {self.tipo} ({self.get_status_display()})"
@@ -0,0 +1,207 @@
+from django.test import TestCase, TransactionTestCase, Client
+from django.urls import reverse
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+import json
+
+from fornecedores.models import Fornecedor
+from produtos.models import Produto
+from vendas.models import Venda, ItemVenda
+from .logic import TarefaLogic, TIPOS_TAREFA
+from .models import Tarefa
+
+
+class TarefaLogicTest(TestCase):
+    """Testes da fila de tarefas"""
+    
+    def setUp(self):
+        self.chamadas = []
+        
+        def somar(parametros):
+            self.chamadas.append(parametros)
+            return {'soma': parametros['a'] + parametros['b']}
+        
+        def falhar(parametros):
+            raise RuntimeError('falha simulada')
+        
+        TarefaLogic.registrar('teste.somar')(somar)
+        TarefaLogic.registrar('teste.falhar')(falhar)
+        self.addCleanup(TIPOS_TAREFA.pop, 'teste.somar')
+        self.addCleanup(TIPOS_TAREFA.pop, 'teste.falhar')
+    
+    def test_enfileirar_e_processar(self):
+        """Testa que a tarefa fica pendente até o worker executá-la"""
+        tarefa = TarefaLogic.enfileirar('teste.somar', {'a': 1, 'b': 2})
+        
+        self.assertEqual(tarefa.status, 'pendente')
+        self.assertEqual(self.chamadas, [])
+        
+        self.assertEqual(TarefaLogic.processar_pendentes(), 1)
+        
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.status, 'concluida')
+        self.assertEqual(tarefa.resultado, {'soma': 3})
+        self.assertIsNotNone(tarefa.concluido_em)
+    
+    def test_tipo_desconhecido(self):
+        """Testa que não é possível enfileirar tipo não registrado"""
+        with self.assertRaises(ValueError):
+            TarefaLogic.enfileirar('teste.inexistente')
+    
+    def test_erro_com_novas_tentativas(self):
+        """Testa que a tarefa volta à fila até esgotar as tentativas"""
+        tarefa = TarefaLogic.enfileirar('teste.falhar', max_tentativas=2)
+        
+        TarefaLogic.processar_pendentes(limite=1)
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.status, 'pendente')
+        
+        TarefaLogic.processar_pendentes()
+        tarefa.refresh_from_db()
+        self.assertEqual(tarefa.status, 'erro')
+        self.assertEqual(tarefa.tentativas, 2)
+        self.assertIn('falha simulada', tarefa.erro)
+    
+    def test_liberar_travadas(self):
+        """Testa que tarefas interrompidas voltam para a fila"""
+        tarefa = TarefaLogic.enfileirar('teste.somar', {'a': 1, 'b': 1})
+        Tarefa.objects.filter(pk=tarefa.pk).update(
+            status='executando',
+            iniciado_em=timezone.now() - timedelta(hours=1)
+        )
+        
+        self.assertEqual(TarefaLogic.liberar_travadas(minutos=30), 1)
+        self.assertEqual(Tarefa.objects.get(pk=tarefa.pk).status, 'pendente')
+    
+    def test_liberar_travadas_preserva_tarefas_ativas(self):
+        """Testa que só tarefas em execução reservadas antes do limite são liberadas"""
+        recente = TarefaLogic.enfileirar('teste.somar', {'a': 1, 'b': 1})
+        concluida = TarefaLogic.enfileirar('teste.somar', {'a': 1, 'b': 1})
+        Tarefa.objects.filter(pk=recente.pk).update(
+            status='executando',
+            iniciado_em=timezone.now() - timedelta(minutes=5)
+        )
+        Tarefa.objects.filter(pk=concluida.pk).update(
+            status='concluida',
+            iniciado_em=timezone.now() - timedelta(hours=1)
+        )
+        
+        self.assertEqual(TarefaLogic.liberar_travadas(minutos=30), 0)
+        self.assertEqual(Tarefa.objects.get(pk=recente.pk).status, 'executando')
+        self.assertEqual(Tarefa.objects.get(pk=concluida.pk).status, 'concluida')
+    
+    def test_resultado_de_reserva_liberada_descartado(self):
+        """Testa que o worker antigo não sobrescreve a tarefa liberada e reservada de novo"""
+        TarefaLogic.enfileirar('teste.somar', {'a': 1, 'b': 2})
+        antiga = TarefaLogic.reservar_proxima()
+        Tarefa.objects.filter(pk=antiga.pk).update(iniciado_em=timezone.now() - timedelta(hours=1))
+        antiga.iniciado_em = Tarefa.objects.get(pk=antiga.pk).iniciado_em
+        
+        TarefaLogic.liberar_travadas(minutos=30)
+        nova = TarefaLogic.reservar_proxima()
+        TarefaLogic.executar(antiga)
+        
+        tarefa = Tarefa.objects.get(pk=nova.pk)
+        self.assertEqual(tarefa.status, 'executando')
+        self.assertEqual(tarefa.tentativas, 2)
+        
+        TarefaLogic.executar(nova)
+        self.assertEqual(Tarefa.objects.get(pk=nova.pk).status, 'concluida')
+
+
+class ComandoProcessarTarefasTest(TransactionTestCase):
+    """
+    Testes do worker
+
+    O worker chama close_old_connections a cada ciclo, o que fecharia a
+    conexão dentro da transação de um TestCase; por isso TransactionTestCase.
+    """
+    
+    def setUp(self):
+        TarefaLogic.registrar('teste.somar')(lambda parametros: parametros['a'] + parametros['b'])
+        self.addCleanup(TIPOS_TAREFA.pop, 'teste.somar')
+    
+    def test_comando_processar_tarefas(self):
+        """Testa o worker em modo de execução única"""
+        TarefaLogic.enfileirar('teste.somar', {'a': 2, 'b': 2})
+        saida = StringIO()
+        
+        call_command('processar_tarefas', uma_vez=True, stdout=saida)
+        
+        self.assertIn('1 tarefa(s) executada(s)', saida.getvalue())
+        self.assertFalse(Tarefa.objects.filter(status='pendente').exists())
+    
+    def test_liberacao_periodica_de_travadas(self):
+        """Testa que o worker em execução devolve à fila tarefas travadas por outro worker"""
+        tarefas = []
+        
+        def dormir(segundos):
+            if tarefas:
+                raise KeyboardInterrupt
+            # Outro worker reserva uma tarefa e morre depois que este já está rodando
+            tarefa = TarefaLogic.enfileirar('teste.somar', {'a': 1, 'b': 1})
+            Tarefa.objects.filter(pk=tarefa.pk).update(
+                status='executando',
+                iniciado_em=timezone.now() - timedelta(hours=1)
+            )
+            tarefas.append(tarefa)
+        
+        saida = StringIO()
+        with mock.patch('tarefas.management.commands.processar_tarefas.time.sleep', side_effect=dormir):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('processar_tarefas', liberar_a_cada=0, stdout=saida)
+        
+        self.assertIn('1 tarefa(s) travada(s) devolvida(s) à fila', saida.getvalue())
+        self.assertEqual(Tarefa.objects.get(pk=tarefas[0].pk).status, 'concluida')
+
+
+class RelatorioAssincronoTest(TestCase):
+    """Testes do relatório de produtos gerado em segundo plano"""
+    
+    def setUp(self):
+        self.client = Client()
+        
+        fornecedor = Fornecedor.objects.create(nome='Fornecedor', cnpj='12345678901234')
+        produto = Produto.objects.create(
+            descricao='Produto Relatório',
+            preco=Decimal('10.00'),
+            qtd_estoque=10,
+            fornecedor=fornecedor
+        )
+        venda = Venda.objects.create(data_venda=timezone.now(), total_venda=Decimal('30.00'))
+        ItemVenda.objects.create(
+            venda_id=venda,
+            produto_id=produto,
+            quantidade=3,
+            preco_unitario=Decimal('10.00'),
+            subTotal=Decimal('30.00')
+        )
+        self.hoje = timezone.now().strftime('%d/%m/%Y')
+    
+    def test_relatorio_assincrono(self):
+        """Testa que a view retorna o ID da tarefa e o resultado fica disponível na API"""
+        response = self.client.post(
+            reverse('produtos:relatorio_produtos_vendidos'),
+            data=json.dumps({'dataInicio': self.hoje, 'dataFinal': self.hoje, 'assincrono': True}),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 202)
+        status_url = response.json()['status_url']
+        self.assertEqual(self.client.get(status_url).json()['tarefa']['status'], 'pendente')
+        
+        TarefaLogic.processar_pendentes()
+        
+        tarefa = self.client.get(status_url).json()['tarefa']
+        self.assertEqual(tarefa['status'], 'concluida')
+        self.assertEqual(tarefa['resultado']['produtos'][0]['quantidade_vendida'], 3)
+    
+    def test_status_tarefa_inexistente(self):
+        """Testa a API de status com ID inexistente"""
+        response = self.client.get(reverse('tarefas:status_tarefa', args=[99999]))
+        
+        self.assertEqual(response.status_code, 404)
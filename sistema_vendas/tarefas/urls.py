@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'tarefas'
+
+urlpatterns = [
+    # APIs
+    path('api/<int:tarefa_id>/', views.status_tarefa, name='status_tarefa'),
+]
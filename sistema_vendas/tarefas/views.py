@@ -0,0 +1,41 @@
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from sistema_vendas.respostas import RespostaJSON
+
+from .logic import TarefaLogic
+from .models import Tarefa
+
+
+def resposta_tarefa_enfileirada(tarefa):
+    """
+    Resposta padrão (202) das views que enfileiram uma tarefa
+    """
+    return RespostaJSON({
+        'success': True,
+        'tarefa_id': tarefa.id,
+        'status': tarefa.status,
+        'status_url': reverse('tarefas:status_tarefa', args=[tarefa.id])
+    }, status=202)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def status_tarefa(request, tarefa_id):
+    """
+    Retorna o status (e o resultado, quando concluída) de uma tarefa
+    GET /tarefas/api/<id>/
+    """
+    try:
+        tarefa = Tarefa.objects.get(id=tarefa_id)
+    except Tarefa.DoesNotExist:
+        return RespostaJSON({
+            'success': False,
+            'error': 'Tarefa não encontrada'
+        }, status=404)
+    
+    return RespostaJSON({
+        'success': True,
+        'tarefa': TarefaLogic.serializar_tarefa(tarefa)
+    })
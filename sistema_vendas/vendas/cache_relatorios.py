@@ -0,0 +1,114 @@
+"""
+Cache por dia dos relatórios de vendas
+
+Um período é dividido em dias: os dias já encerrados têm o agregado
+guardado no cache sem prazo de validade, e o dia atual é sempre calculado
+na hora. Assim um relatório do mês ou do ano consulta o banco apenas para
+hoje (e para os dias que ainda não estavam no cache).
+
+Cada dia tem um contador de versão na chave. Uma venda gravada, alterada
+ou excluída com data de um dia encerrado (venda retroativa, ajuste)
+incrementa a versão daquele dia após o commit, e só ele é recalculado.
+"""
+import time as relogio
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+
+def _chave_versao(dia):
+    return f'relatorio:versao:{dia.isoformat()}'
+
+
+def _versoes(dias):
+    """
+    Retorna a versão de cada dia, criando as que ainda não existem
+    """
+    chaves = {_chave_versao(dia): dia for dia in dias}
+    versoes = cache.get_many(list(chaves))
+
+    faltantes = [chave for chave in chaves if chave not in versoes]
+    if faltantes:
+        # Começa pelo relógio para não repetir versões já usadas caso a
+        # chave tenha sido descartada do cache
+        for chave in faltantes:
+            cache.add(chave, relogio.time_ns(), timeout=None)
+        versoes.update(cache.get_many(faltantes))
+
+    return {chaves[chave]: versao for chave, versao in versoes.items()}
+
+
+def _incrementar_versao(dia):
+    try:
+        cache.incr(_chave_versao(dia))
+    except ValueError:
+        cache.add(_chave_versao(dia), relogio.time_ns(), timeout=None)
+
+
+def invalidar_dias(*datas):
+    """
+    Invalida os relatórios dos dias das datas informadas (date ou
+    datetime), após o commit da transação atual
+    """
+    dias = set()
+    for data in datas:
+        if isinstance(data, datetime):
+            data = timezone.localdate(data) if timezone.is_aware(data) else data.date()
+        if data:
+            dias.add(data)
+
+    for dia in dias:
+        transaction.on_commit(lambda dia=dia: _incrementar_versao(dia))
+
+
+def intervalo_dias(dias):
+    """
+    Retorna o intervalo [início, fim) de datetimes que cobre os dias
+    informados, para filtrar com o índice de data
+    """
+    inicio = timezone.make_aware(datetime.combine(min(dias), time.min))
+    fim = timezone.make_aware(datetime.combine(max(dias) + timedelta(days=1), time.min))
+    return inicio, fim
+
+
+def agregados_por_dia(nome, data_inicio, data_fim, calcular):
+    """
+    Retorna o agregado de cada dia do período, usando o cache para os dias
+    encerrados
+
+    Args:
+        nome (str): Nome do agregado (parte da chave do cache)
+        data_inicio (date): Primeiro dia do período
+        data_fim (date): Último dia do período (inclusive)
+        calcular (callable): Recebe a lista de dias a calcular e retorna
+            um dict dia -> agregado com todos eles
+
+    Returns:
+        dict: Agregado por dia, na ordem do período
+    """
+    if data_fim < data_inicio:
+        return {}
+
+    hoje = timezone.localdate()
+    dias = [data_inicio + timedelta(days=n) for n in range((data_fim - data_inicio).days + 1)]
+    encerrados = [dia for dia in dias if dia < hoje]
+
+    versoes = _versoes(encerrados)
+    chaves = {dia: f'relatorio:{nome}:{dia.isoformat()}:{versoes[dia]}' for dia in encerrados}
+    armazenados = cache.get_many(list(chaves.values()))
+
+    resultado = {dia: armazenados[chaves[dia]] for dia in encerrados if chaves[dia] in armazenados}
+
+    a_calcular = [dia for dia in dias if dia not in resultado]
+    if a_calcular:
+        calculados = calcular(a_calcular)
+        cache.set_many(
+            {chaves[dia]: calculados[dia] for dia in a_calcular if dia in chaves},
+            getattr(settings, 'CACHE_RELATORIOS_TIMEOUT', None)
+        )
+        resultado.update(calculados)
+
+    return {dia: resultado[dia] for dia in dias}
@@ -0,0 +1,424 @@
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from decimal import Decimal, InvalidOperation
+from datetime import datetime, time, timedelta
+import base64
+
+from sistema_vendas.cache_catalogo import armazenar_itens, invalidar_catalogo, itens_em_cache
+from sistema_vendas.cache_revalidacao import cache_revalidado
+from sistema_vendas.coalescencia import coalescer
+from sistema_vendas.eventos import publicar_apos_commit
+from produtos.logic import ProdutoLogic
+from produtos.models import CodigoBarras, Produto
+from .cache_relatorios import agregados_por_dia, intervalo_dias
+from .models import Venda, ItemVenda, Pagamento
+
+
+class VendaLogic:
+    """
+    Classe com a lógica de negócio para Vendas
+    """
+
+    # Quantidade máxima de códigos por busca em lote
+    LIMITE_CODIGOS_LOTE = 500
+
+    @staticmethod
+    def buscar_produtos(codigos):
+        """
+        Busca vários produtos pelo código (ID ou código de barras), usando o
+        cache do catálogo e uma única consulta (in_bulk) para os que não
+        estiverem nele
+
+        Args:
+            codigos (list): Códigos informados no PDV
+
+        Returns:
+            tuple: (produtos encontrados: list, códigos não encontrados: list),
+                na ordem em que os códigos foram informados
+
+        Raises:
+            ValueError: Se a quantidade de códigos passar do limite
+        """
+        if len(codigos) > VendaLogic.LIMITE_CODIGOS_LOTE:
+            raise ValueError(f'Informe no máximo {VendaLogic.LIMITE_CODIGOS_LOTE} códigos por busca')
+
+        ids = {}
+        codigos_barras = {}
+        for codigo in codigos:
+            texto = str(codigo).strip()
+            if CodigoBarras.valido(texto):
+                codigos_barras[codigo] = texto
+                continue
+            try:
+                ids[codigo] = int(texto)
+            except ValueError:
+                ids[codigo] = None
+
+        if codigos_barras:
+            resolvidos = ProdutoLogic.ids_por_codigo_barras(set(codigos_barras.values()))
+            # GTIN sem código de barras cadastrado ainda pode ser um ID
+            ids.update({codigo: resolvidos.get(texto, int(texto)) for codigo, texto in codigos_barras.items()})
+        # Mantém a ordem em que os códigos foram informados
+        ids = {codigo: ids[codigo] for codigo in codigos}
+
+        validos = {produto_id for produto_id in ids.values() if produto_id is not None}
+        produtos = itens_em_cache('produtos', validos)
+
+        faltantes = validos - produtos.keys()
+        if faltantes:
+            encontrados = {
+                produto.id: {
+                    'id': produto.id,
+                    'descricao': produto.descricao,
+                    'preco': produto.preco,
+                    'qtd_estoque': produto.qtd_estoque
+                }
+                for produto in Produto.objects.in_bulk(list(faltantes)).values()
+            }
+            armazenar_itens('produtos', encontrados)
+            produtos.update(encontrados)
+
+        encontrados, nao_encontrados = [], []
+        vistos = set()
+        for codigo, produto_id in ids.items():
+            if produto_id in produtos:
+                if produto_id not in vistos:
+                    encontrados.append(produtos[produto_id])
+                    vistos.add(produto_id)
+            else:
+                nao_encontrados.append(codigo)
+
+        return encontrados, nao_encontrados
+
+    @staticmethod
+    def agrupar_itens(itens):
+        """
+        Agrupa os itens do carrinho por código de produto
+
+        Args:
+            itens (list): Lista de itens enviados pelo PDV
+                - codigo (int): ID do produto
+                - quantidade (int): Quantidade
+
+        Returns:
+            dict: Quantidade total por ID de produto, na ordem do carrinho
+        """
+        quantidades = {}
+        for item in itens:
+            codigo = int(item['codigo'])
+            quantidade = int(item['quantidade'])
+
+            if quantidade <= 0:
+                raise ValueError('A quantidade deve ser maior que zero')
+
+            quantidades[codigo] = quantidades.get(codigo, 0) + quantidade
+
+        return quantidades
+
+    @staticmethod
+    def calcular_itens(quantidades, produtos):
+        """
+        Calcula preço unitário e subtotal de cada item a partir do preço
+        atual do produto, sem considerar valores enviados pelo cliente
+
+        Args:
+            quantidades (dict): Quantidade por ID de produto
+            produtos (dict): Produtos carregados por ID (in_bulk)
+
+        Returns:
+            tuple: (itens calculados: list, total: Decimal)
+        """
+        itens_calculados = [
+            {
+                'produto': produtos[codigo],
+                'quantidade': quantidade,
+                'preco_unitario': produtos[codigo].preco,
+                'subtotal': produtos[codigo].preco * quantidade
+            }
+            for codigo, quantidade in quantidades.items()
+        ]
+        total = sum((item['subtotal'] for item in itens_calculados), Decimal('0.00'))
+
+        return itens_calculados, total
+
+    @staticmethod
+    @transaction.atomic
+    def registrar_venda(itens, cliente=None, observacoes=''):
+        """
+        Registra uma venda com os preços e o total calculados no servidor
+
+        Os produtos do carrinho são carregados (e bloqueados) em uma única
+        consulta; itens e estoque são gravados em lote.
+
+        Args:
+            itens (list): Lista de itens enviados pelo PDV
+            cliente (Cliente, optional): Cliente da venda
+            observacoes (str, optional): Observações
+
+        Returns:
+            Venda: Venda registrada
+
+        Raises:
+            Produto.DoesNotExist: Se algum código não existir
+            ValueError: Se a quantidade for inválida ou o estoque insuficiente
+        """
+        quantidades = VendaLogic.agrupar_itens(itens)
+
+        # Bloqueia as linhas sempre na mesma ordem (por id): duas vendas com
+        # produtos em comum não podem travar uma à outra (deadlock)
+        produtos = {
+            produto.id: produto
+            for produto in Produto.objects.select_for_update().filter(pk__in=list(quantidades)).order_by('pk')
+        }
+
+        for codigo, quantidade in quantidades.items():
+            produto = produtos.get(codigo)
+
+            if produto is None:
+                raise Produto.DoesNotExist(f'Produto código {codigo} não encontrado')
+
+            if produto.qtd_estoque < quantidade:
+                raise ValueError(
+                    f'Estoque insuficiente para {produto.descricao}. '
+                    f'Disponível: {produto.qtd_estoque}, Solicitado: {quantidade}'
+                )
+
+        itens_calculados, total = VendaLogic.calcular_itens(quantidades, produtos)
+
+        venda = Venda.objects.create(
+            cliente_id=cliente,
+            data_venda=timezone.now(),
+            total_venda=total,
+            observacoes=observacoes
+        )
+
+        ItemVenda.objects.bulk_create([
+            ItemVenda(
+                venda_id=venda,
+                produto_id=item['produto'],
+                quantidade=item['quantidade'],
+                preco_unitario=item['preco_unitario'],
+                subTotal=item['subtotal']
+            )
+            for item in itens_calculados
+        ])
+
+        # Baixa de estoque em um único UPDATE em lote
+        for item in itens_calculados:
+            item['produto'].qtd_estoque -= item['quantidade']
+        Produto.objects.bulk_update([item['produto'] for item in itens_calculados], ['qtd_estoque'])
+        invalidar_catalogo('produtos')
+
+        # Eventos para as telas abertas (stream SSE), só após o commit
+        publicar_apos_commit('venda', VendaLogic.dados_evento_venda(venda))
+        publicar_apos_commit('estoque', {
+            'produtos': [
+                {'id': item['produto'].id, 'qtd_estoque': item['produto'].qtd_estoque}
+                for item in itens_calculados
+            ]
+        })
+
+        return venda
+
+    @staticmethod
+    def dados_evento_venda(venda):
+        """
+        Dados de uma venda no evento do stream, no mesmo formato da linha do
+        histórico
+
+        Args:
+            venda (Venda): Venda registrada
+
+        Returns:
+            dict: id, codigo, data, cliente, total e obs
+        """
+        data_venda = timezone.localtime(venda.data_venda)
+        return {
+            'id': venda.id,
+            'codigo': str(venda.id).zfill(6),
+            'data': data_venda.strftime('%d/%m/%Y'),
+            'data_hora': data_venda.isoformat(),
+            'cliente': venda.cliente_id.nome if venda.cliente_id else 'Cliente não identificado',
+            'total': venda.total_venda,
+            'obs': venda.observacoes[:50] if venda.observacoes else ''
+        }
+
+    @staticmethod
+    def converter_data_br(data_str):
+        """
+        Converte data no formato brasileiro (dd/mm/yyyy) para date
+        """
+        try:
+            return datetime.strptime(data_str, '%d/%m/%Y').date()
+        except (TypeError, ValueError):
+            raise ValueError('Data inválida. Use o formato DD/MM/YYYY')
+
+    @staticmethod
+    def filtrar_vendas(filtros):
+        """
+        Monta a consulta de vendas de um período com filtros opcionais
+
+        O período é aplicado como intervalo sobre data_venda (e não sobre
+        data_venda__date) para que o índice (data_venda, id) seja usado.
+
+        Args:
+            filtros (dict): Filtros da consulta
+                - dataInicio (str): Data início no formato dd/mm/yyyy
+                - dataFim (str): Data fim no formato dd/mm/yyyy
+                - cliente (int, optional): ID do cliente
+                - valorMinimo (str/float, optional): Total mínimo da venda
+                - valorMaximo (str/float, optional): Total máximo da venda
+
+        Returns:
+            QuerySet: Vendas do período
+        """
+        data_inicio = VendaLogic.converter_data_br(filtros.get('dataInicio'))
+        data_fim = VendaLogic.converter_data_br(filtros.get('dataFim'))
+
+        inicio = timezone.make_aware(datetime.combine(data_inicio, time.min))
+        fim = timezone.make_aware(datetime.combine(data_fim + timedelta(days=1), time.min))
+
+        vendas = Venda.objects.filter(data_venda__gte=inicio, data_venda__lt=fim)
+
+        if filtros.get('cliente'):
+            try:
+                vendas = vendas.filter(cliente_id=int(filtros['cliente']))
+            except (TypeError, ValueError):
+                raise ValueError('Cliente inválido')
+
+        try:
+            if filtros.get('valorMinimo') not in (None, ''):
+                vendas = vendas.filter(total_venda__gte=Decimal(str(filtros['valorMinimo'])))
+
+            if filtros.get('valorMaximo') not in (None, ''):
+                vendas = vendas.filter(total_venda__lte=Decimal(str(filtros['valorMaximo'])))
+        except InvalidOperation:
+            raise ValueError('Valor inválido')
+
+        return vendas
+
+    @staticmethod
+    def codificar_cursor(venda):
+        """
+        Gera o cursor opaco da próxima página a partir da última venda
+        """
+        chave = f'{venda.data_venda.isoformat()}|{venda.id}'
+        return base64.urlsafe_b64encode(chave.encode()).decode()
+
+    @staticmethod
+    def aplicar_cursor(vendas, cursor):
+        """
+        Restringe a consulta às vendas posteriores ao cursor na ordenação
+        (-data_venda, -id), sem OFFSET
+
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        try:
+            data_str, id_str = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            data_venda = datetime.fromisoformat(data_str)
+            venda_id = int(id_str)
+        except (AttributeError, TypeError, ValueError):
+            raise ValueError('Cursor inválido')
+
+        return vendas.filter(
+            Q(data_venda__lt=data_venda) |
+            Q(data_venda=data_venda, id__lt=venda_id)
+        )
+
+    @staticmethod
+    def totais_vendas_por_dia(data_inicio, data_fim):
+        """
+        Total vendido e quantidade de vendas de cada dia do período, com os
+        dias encerrados vindos do cache de relatórios
+
+        Returns:
+            dict: {'total': Decimal, 'quantidade': int} por dia
+        """
+        def calcular(dias):
+            inicio, fim = intervalo_dias(dias)
+            totais = {dia: {'total': Decimal('0'), 'quantidade': 0} for dia in dias}
+
+            for linha in Venda.objects.filter(
+                data_venda__gte=inicio, data_venda__lt=fim
+            ).annotate(
+                dia=TruncDate('data_venda')
+            ).values('dia').annotate(
+                total=Sum('total_venda'),
+                quantidade=Count('id')
+            ).order_by():
+                if linha['dia'] in totais:
+                    totais[linha['dia']] = {'total': linha['total'], 'quantidade': linha['quantidade']}
+
+            return totais
+
+        return agregados_por_dia('totais_vendas', data_inicio, data_fim, calcular)
+
+    @staticmethod
+    def totais_vendas_periodo(data_inicio, data_fim):
+        """
+        Total vendido e quantidade de vendas de um período
+
+        Returns:
+            dict: {'total': Decimal, 'quantidade': int}
+        """
+        por_dia = VendaLogic.totais_vendas_por_dia(data_inicio, data_fim).values()
+        return {
+            'total': sum((dia['total'] for dia in por_dia), Decimal('0')),
+            'quantidade': sum(dia['quantidade'] for dia in por_dia)
+        }
+
+    @staticmethod
+    @cache_revalidado('vendas.total_vendas_data', fresco=15)
+    @coalescer('vendas.total_vendas_data')
+    def total_vendas_data(data):
+        """
+        Soma o total das vendas de uma data
+
+        Args:
+            data (date): Data das vendas
+
+        Returns:
+            Decimal: Total vendido na data
+        """
+        return VendaLogic.totais_vendas_periodo(data, data)['total']
+
+    @staticmethod
+    @cache_revalidado('vendas.totais_pagamentos', fresco=15)
+    @coalescer('vendas.totais_pagamentos')
+    def totais_pagamentos(data_inicio, data_fim, por_dia=False):
+        """
+        Totaliza os pagamentos de um período por forma (e por dia)
+
+        Args:
+            data_inicio (date): Início do período
+            data_fim (date): Fim do período
+            por_dia (bool): Agrupa também por dia
+
+        Returns:
+            list: Quantidade, valor, troco e líquido por grupo
+        """
+        # Intervalo [início, fim) sobre a coluna, para usar os índices de
+        # data_pagamento (um __date envolveria a coluna em um cast)
+        if data_fim < data_inicio:
+            return []
+
+        inicio, fim = intervalo_dias([data_inicio, data_fim])
+        pagamentos = Pagamento.objects.filter(
+            data_pagamento__gte=inicio,
+            data_pagamento__lt=fim
+        )
+
+        grupos = ('forma',)
+        if por_dia:
+            pagamentos = pagamentos.annotate(dia=TruncDate('data_pagamento'))
+            grupos = ('dia', 'forma')
+
+        return list(pagamentos.values(*grupos).annotate(
+            quantidade=Count('id'),
+            valor_total=Sum('valor'),
+            troco_total=Sum('troco'),
+            liquido=Sum(F('valor') - F('troco'))
+        ).order_by(*grupos))
@@ -0,0 +1,344 @@
+import csv
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from fornecedores.models import Compra, ItemCompra
+from vendas.models import Venda, ItemVenda
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+# Tabelas exportadas: (modelo, campo de data da partição, marca d'água, colunas)
+# A marca é o atualizado_em de cada tabela, que captura linhas novas e
+# alteradas (o BI deve manter a versão mais recente por id).
+TABELAS = {
+    'vendas_venda': {
+        'modelo': Venda,
+        'particao': 'data_venda',
+        'marca': 'atualizado_em',
+        'colunas': [
+            ('id', 'id', 'inteiro'),
+            ('cliente_id', 'cliente_id_id', 'inteiro'),
+            ('data_venda', 'data_venda', 'data_hora'),
+            ('total_venda', 'total_venda', 'decimal'),
+            ('observacoes', 'observacoes', 'texto'),
+            ('atualizado_em', 'atualizado_em', 'data_hora'),
+        ],
+    },
+    'vendas_itemvenda': {
+        'modelo': ItemVenda,
+        'particao': 'venda_id__data_venda',
+        'marca': 'atualizado_em',
+        'colunas': [
+            ('id', 'id', 'inteiro'),
+            ('venda_id', 'venda_id_id', 'inteiro'),
+            ('produto_id', 'produto_id_id', 'inteiro'),
+            ('quantidade', 'quantidade', 'inteiro'),
+            ('preco_unitario', 'preco_unitario', 'decimal'),
+            ('subtotal', 'subTotal', 'decimal'),
+            ('data_venda', 'venda_id__data_venda', 'data_hora'),
+            ('atualizado_em', 'atualizado_em', 'data_hora'),
+        ],
+    },
+    'compras': {
+        'modelo': Compra,
+        'particao': 'data_compra',
+        'marca': 'atualizado_em',
+        'colunas': [
+            ('id', 'id', 'inteiro'),
+            ('numero_pedido', 'numero_pedido', 'texto'),
+            ('fornecedor_id', 'fornecedor_id', 'inteiro'),
+            ('data_compra', 'data_compra', 'data_hora'),
+            ('status', 'status', 'texto'),
+            ('valor_frete', 'valor_frete', 'decimal'),
+            ('valor_desconto', 'valor_desconto', 'decimal'),
+            ('valor_total', 'valor_total', 'decimal'),
+            ('atualizado_em', 'atualizado_em', 'data_hora'),
+        ],
+    },
+    'itens_compra': {
+        'modelo': ItemCompra,
+        'particao': 'compra__data_compra',
+        'marca': 'atualizado_em',
+        'colunas': [
+            ('id', 'id', 'inteiro'),
+            ('compra_id', 'compra_id', 'inteiro'),
+            ('produto_id', 'produto_id', 'inteiro'),
+            ('quantidade', 'quantidade', 'inteiro'),
+            ('preco_unitario', 'preco_unitario', 'decimal'),
+            ('subtotal', 'subtotal', 'decimal'),
+            ('data_compra', 'compra__data_compra', 'data_hora'),
+            ('atualizado_em', 'atualizado_em', 'data_hora'),
+        ],
+    },
+}
+
+ARQUIVO_MARCAS = '_marcas.json'
+
+EXTENSOES = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+    'csv': '.csv.gz',
+}
+
+
+def tipo_arrow(tipo):
+    """
+    Converte o tipo lógico da coluna para o tipo Arrow
+    """
+    return {
+        'inteiro': pa.int64(),
+        'decimal': pa.decimal128(12, 2),
+        'data_hora': pa.timestamp('us', tz='UTC'),
+        'texto': pa.string(),
+    }[tipo]
+
+
+class EscritorCSV:
+    """
+    Escritor incremental de CSV compactado com gzip
+    """
+
+    def __init__(self, caminho, colunas):
+        self.arquivo = gzip.open(caminho, 'wt', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.arquivo)
+        self.writer.writerow(colunas)
+
+    def escrever(self, linhas):
+        self.writer.writerows(
+            [valor.isoformat() if isinstance(valor, datetime) else valor for valor in linha]
+            for linha in linhas
+        )
+
+    def fechar(self):
+        self.arquivo.close()
+
+
+class EscritorArrow:
+    """
+    Escritor incremental de Parquet (zstd) ou Arrow IPC (lz4)
+    """
+
+    def __init__(self, caminho, colunas, tipos, formato):
+        self.schema = pa.schema([(nome, tipo_arrow(tipo)) for nome, tipo in zip(colunas, tipos)])
+        if formato == 'parquet':
+            self.writer = pq.ParquetWriter(str(caminho), self.schema, compression='zstd')
+        else:
+            self.writer = pa_ipc.new_file(
+                str(caminho), self.schema,
+                options=pa_ipc.IpcWriteOptions(compression='lz4')
+            )
+
+    def escrever(self, linhas):
+        colunas = list(zip(*linhas))
+        self.writer.write_table(pa.Table.from_arrays(
+            [pa.array(valores, type=campo.type) for valores, campo in zip(colunas, self.schema)],
+            schema=self.schema
+        ))
+
+    def fechar(self):
+        self.writer.close()
+
+
+class Command(BaseCommand):
+    """
+    Exporta vendas e compras para arquivos colunares particionados por mês,
+    de forma incremental (marca d'água por atualizado_em)
+
+    Cada execução grava apenas as linhas novas ou alteradas desde a última
+    marca, em arquivos <saida>/<tabela>/mes=AAAA-MM/<tabela>-<execucao>.<ext>.
+    As linhas são lidas com iterator() e gravadas em lotes, então o consumo
+    de memória não depende do tamanho das tabelas.
+
+    A janela termina EXPORTACAO_MARGEM_SEGUNDOS antes do instante atual:
+    uma transação ainda aberta pode gravar um atualizado_em anterior a
+    linhas já confirmadas, e a margem evita que ela fique atrás da marca.
+
+    Uso:
+        python manage.py exportar_analytics
+        python manage.py exportar_analytics --formato csv --saida /dados/bi
+    """
+
+    help = 'Exporta vendas e compras em formato colunar para análise offline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--saida',
+            default=str(Path(settings.BASE_DIR) / 'exportacoes'),
+            help='Diretório de destino dos arquivos'
+        )
+        parser.add_argument(
+            '--formato',
+            choices=sorted(EXTENSOES),
+            default='parquet',
+            help='Formato dos arquivos (csv é usado se o pyarrow não estiver instalado)'
+        )
+        parser.add_argument(
+            '--tabela',
+            action='append',
+            choices=sorted(TABELAS),
+            help='Exporta apenas as tabelas informadas (pode ser repetido)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=5000,
+            help='Quantidade de linhas lidas e gravadas por lote'
+        )
+        parser.add_argument(
+            '--reiniciar',
+            action='store_true',
+            help="Ignora a marca d'água e exporta as tabelas desde o início"
+        )
+
+    def handle(self, *args, **options):
+        formato = options['formato']
+        if formato != 'csv' and pa is None:
+            self.stderr.write('pyarrow não instalado; exportando em CSV')
+            formato = 'csv'
+
+        if options['lote'] <= 0:
+            raise CommandError('O tamanho do lote deve ser maior que zero')
+
+        saida = Path(options['saida'])
+        saida.mkdir(parents=True, exist_ok=True)
+
+        marcas = {} if options['reiniciar'] else self.ler_marcas(saida)
+        execucao = timezone.now().strftime('%Y%m%dT%H%M%S%f')
+
+        for nome in options['tabela'] or TABELAS:
+            total, marca = self.exportar_tabela(
+                nome, TABELAS[nome], marcas.get(nome), saida, formato, execucao, options['lote']
+            )
+
+            if marca is not None:
+                marcas[nome] = marca
+                # Grava a marca após cada tabela para não reexportar em caso de falha
+                self.gravar_marcas(saida, marcas)
+
+            self.stdout.write(f'{nome}: {total} linha(s) exportada(s)')
+
+        self.stdout.write(self.style.SUCCESS(f'Exportação concluída em {saida}'))
+
+    def exportar_tabela(self, nome, tabela, marca, saida, formato, execucao, lote):
+        """
+        Exporta as linhas alteradas entre a marca e o fim da janela
+        (agora menos a margem), agrupando-as por mês
+
+        Returns:
+            tuple: (linhas exportadas: int, nova marca ou None se nada mudou)
+        """
+        colunas = [coluna for coluna, _, _ in tabela['colunas']]
+        campos = [campo for _, campo, _ in tabela['colunas']]
+        tipos = [tipo for _, _, tipo in tabela['colunas']]
+
+        campo_marca = tabela['marca']
+        posicao_particao = campos.index(tabela['particao'])
+        posicao_id = campos.index('id')
+        posicao_marca = campos.index(campo_marca)
+
+        margem = getattr(settings, 'EXPORTACAO_MARGEM_SEGUNDOS', 60)
+        ate = timezone.now() - timedelta(seconds=margem)
+
+        consulta = tabela['modelo'].objects.filter(**{f'{campo_marca}__lte': ate})
+        if marca is not None:
+            ultima = datetime.fromisoformat(marca['valor'])
+            consulta = consulta.filter(
+                Q(**{f'{campo_marca}__gt': ultima}) |
+                Q(**{campo_marca: ultima, 'id__gt': marca['id']})
+            )
+        consulta = consulta.order_by(campo_marca, 'id')
+
+        escritores = {}
+        pendentes = {}
+        total = 0
+        ultima_linha = None
+
+        try:
+            for linha in consulta.values_list(*campos).iterator(chunk_size=lote):
+                particao = self.mes_particao(linha[posicao_particao])
+                pendentes.setdefault(particao, []).append(linha)
+                ultima_linha = linha
+                total += 1
+
+                if len(pendentes[particao]) >= lote:
+                    self.descarregar(escritores, particao, pendentes.pop(particao),
+                                     nome, colunas, tipos, saida, formato, execucao)
+
+            for particao, linhas in pendentes.items():
+                self.descarregar(escritores, particao, linhas,
+                                 nome, colunas, tipos, saida, formato, execucao)
+        finally:
+            for escritor in escritores.values():
+                escritor.fechar()
+
+        if ultima_linha is None:
+            return 0, None
+
+        return total, {
+            'id': ultima_linha[posicao_id],
+            'valor': ultima_linha[posicao_marca].isoformat()
+        }
+
+    def descarregar(self, escritores, particao, linhas, nome, colunas, tipos, saida, formato, execucao):
+        """
+        Grava um lote no arquivo da partição, abrindo-o na primeira vez
+        """
+        if particao not in escritores:
+            diretorio = saida / nome / f'mes={particao}'
+            diretorio.mkdir(parents=True, exist_ok=True)
+            caminho = diretorio / f'{nome}-{execucao}{EXTENSOES[formato]}'
+
+            if formato == 'csv':
+                escritores[particao] = EscritorCSV(caminho, colunas)
+            else:
+                escritores[particao] = EscritorArrow(caminho, colunas, tipos, formato)
+
+        escritores[particao].escrever(linhas)
+
+    @staticmethod
+    def mes_particao(data):
+        """
+        Retorna a partição (AAAA-MM) de uma data, em UTC
+        """
+        if timezone.is_aware(data):
+            data = data.astimezone(dt_timezone.utc)
+        return data.strftime('%Y-%m')
+
+    @staticmethod
+    def ler_marcas(saida):
+        """
+        Lê as marcas d'água da última exportação
+        """
+        caminho = saida / ARQUIVO_MARCAS
+        if not caminho.exists():
+            return {}
+
+        with open(caminho, encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+
+    @staticmethod
+    def gravar_marcas(saida, marcas):
+        """
+        Grava as marcas d'água de forma atômica (arquivo temporário + rename)
+        """
+        caminho = saida / ARQUIVO_MARCAS
+        temporario = saida / f'{ARQUIVO_MARCAS}.tmp'
+
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(marcas, arquivo, indent=2)
+
+        os.replace(temporario, caminho)
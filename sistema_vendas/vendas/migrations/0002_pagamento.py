@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Pagamento',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('forma', models.CharField(choices=[('dinheiro', 'Dinheiro'), ('cartao', 'Cartão'), ('cheque', 'Cheque')], max_length=20)),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('troco', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('data_pagamento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('venda', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pagamentos', to='vendas.venda')),
+            ],
+            options={
+                'verbose_name': 'Pagamento',
+                'verbose_name_plural': 'Pagamentos',
+                'db_table': 'vendas_pagamento',
+                'indexes': [models.Index(fields=['data_pagamento'], name='pagamento_data_idx'), models.Index(fields=['forma', 'data_pagamento'], name='pagamento_forma_data_idx')],
+            },
+        ),
+    ]
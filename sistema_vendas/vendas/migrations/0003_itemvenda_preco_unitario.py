@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:41
+
+from django.db import migrations, models
+
+
+def preencher_preco_unitario(apps, schema_editor):
+    """Deriva o preço unitário dos itens já existentes a partir do subtotal"""
+    ItemVenda = apps.get_model('vendas', 'ItemVenda')
+    ItemVenda.objects.filter(quantidade__gt=0).update(
+        preco_unitario=models.F('subTotal') / models.F('quantidade')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendas', '0002_pagamento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemvenda',
+            name='preco_unitario',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(preencher_preco_unitario, migrations.RunPython.noop),
+    ]
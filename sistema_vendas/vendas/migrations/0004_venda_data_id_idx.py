@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0001_initial'),
+        ('vendas', '0003_itemvenda_preco_unitario'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='venda',
+            index=models.Index(fields=['data_venda', 'id'], name='venda_data_id_idx'),
+        ),
+    ]
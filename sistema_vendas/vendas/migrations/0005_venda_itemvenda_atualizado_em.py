@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 21:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendas', '0004_venda_data_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venda',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Atualizado em'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='itemvenda',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Atualizado em'),
+            preserve_default=False,
+        ),
+    ]
@@ -1,6 +1,10 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 from clientes.models import Cliente
 from produtos.models import Produto
+from .cache_relatorios import invalidar_dias
 
 # Create your models here.
 class Venda(models.Model):
@@ -19,15 +23,26 @@ class Venda(models.Model):
     data_venda = models.DateTimeField(null=False)
     total_venda = models.DecimalField(null=False, blank=False, max_digits=10, decimal_places=2)
     observacoes = models.TextField(blank=True, default='')
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Atualizado em")
     
     class Meta:
         db_table = 'vendas_venda'
         managed = True  # IMPORTANTE: Django não vai tentar criar/alterar a tabela
         verbose_name = 'Venda'
         verbose_name_plural = 'Vendas'
+        indexes = [
+            models.Index(fields=['data_venda', 'id'], name='venda_data_id_idx'),
+        ]
     
     def __str__(self):
         return f"Venda {self.id} - R$ {self.total_venda}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._data_venda_original = getattr(instancia, 'data_venda', None)
+        return instancia
+    
 
 
 class ItemVenda(models.Model):
@@ -50,6 +65,13 @@ class ItemVenda(models.Model):
         db_column='produto_id_id'
     )
     quantidade = models.IntegerField(null=False, default=1)
+    preco_unitario = models.DecimalField(
+        null=False, 
+        blank=False, 
+        max_digits=10, 
+        decimal_places=2,
+        default=0
+    )
     subTotal = models.DecimalField(
         null=False, 
         blank=False, 
@@ -57,6 +79,7 @@ class ItemVenda(models.Model):
         decimal_places=2,
         db_column='subTotal'
     )
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Atualizado em")
     
     class Meta:
         db_table = 'vendas_itemvenda'
@@ -66,4 +89,69 @@ class ItemVenda(models.Model):
     
     def __str__(self):
         return f"Item {self.id} - Venda {self.venda_id.id}"
+    
+
+
+class Pagamento(models.Model):
+    """
+    Representa um pagamento registrado para uma venda.
+    Uma venda pode ter vários pagamentos (um por forma de pagamento).
+    """
+
+    FORMA_CHOICES = [
+        ('dinheiro', 'Dinheiro'),
+        ('cartao', 'Cartão'),
+        ('cheque', 'Cheque'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    venda = models.ForeignKey(
+        Venda,
+        on_delete=models.CASCADE,
+        related_name='pagamentos'
+    )
+    forma = models.CharField(max_length=20, choices=FORMA_CHOICES)
+    valor = models.DecimalField(max_digits=10, decimal_places=2)
+    troco = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    data_pagamento = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'vendas_pagamento'
+        verbose_name = 'Pagamento'
+        verbose_name_plural = 'Pagamentos'
+        indexes = [
+            models.Index(fields=['data_pagamento'], name='pagamento_data_idx'),
+            models.Index(fields=['forma', 'data_pagamento'], name='pagamento_forma_data_idx'),
+        ]
+
+    def __str__(self):
+        return f"Pagamento {self.id} - {self.get_forma_display()} R$ {self.valor}"
+
+
+# Invalidação do cache dos relatórios por dia. Os sinais (e não save() e
+# delete() dos models) também disparam nas exclusões em cascata, como ao
+# excluir um cliente ou um produto com vendas
+
+@receiver(post_save, sender=Venda)
+def venda_salva(sender, instance, **kwargs):
+    # Vendas retroativas ou alteradas invalidam o dia (e o dia antigo, se a data mudou)
+    invalidar_dias(instance.data_venda, getattr(instance, '_data_venda_original', None))
+    instance._data_venda_original = instance.data_venda
+
+
+@receiver(post_delete, sender=Venda)
+def venda_excluida(sender, instance, **kwargs):
+    invalidar_dias(instance.data_venda)
+
+
+def _data_da_venda(item):
+    if ItemVenda.venda_id.is_cached(item):
+        return item.venda_id.data_venda
+    # Na exclusão em cascata a venda não vem carregada (e pode já ter sido excluída)
+    return Venda.objects.filter(pk=item.venda_id_id).values_list('data_venda', flat=True).first()
+
 
+@receiver(post_save, sender=ItemVenda)
+@receiver(post_delete, sender=ItemVenda)
+def item_venda_alterado(sender, instance, **kwargs):
+    invalidar_dias(_data_da_venda(instance))
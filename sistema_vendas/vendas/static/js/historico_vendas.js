@@ -1,5 +1,11 @@
 const URL_PERIODO = URL.parse("http://127.0.0.1:8000/venda/api/periodo/")
 const URL_TOTAL = URL.parse("http://127.0.0.1:8000/venda/api/total/");
+const URL_EVENTOS = URL.parse("http://127.0.0.1:8000/venda/api/eventos/");
+
+// Estado da paginação do histórico (cursor retornado pelo servidor)
+let filtroHistorico = null;
+let proximoCursor = null;
+let totaisHistorico = null;
 
 
 // Máscara para data DD/MM/AAAA
@@ -40,6 +46,11 @@ document.addEventListener('DOMContentLoaded', function() {
         pesquisarHistorico();
     });
     
+    // Botão para carregar a próxima página do histórico
+    document.getElementById('btnCarregarMais').addEventListener('click', function() {
+        carregarMaisHistorico();
+    });
+    
     // Botão de pesquisa do total de vendas
     const btnPesquisarTotal = document.querySelector('.sales-total .btn-search');
     btnPesquisarTotal.addEventListener('click', function() {
@@ -82,10 +93,24 @@ async function pesquisarHistorico() {
     
     // Aqui você fará a chamada para o backend
     console.log('Pesquisando vendas de', dataInicio, 'até', dataFim);
-    let vendasPeriodo = await buscarVendasPorPeriodo(dataInicio, dataFim);
+    filtroHistorico = { dataInicio: dataInicio, dataFim: dataFim };
+    let pagina = await buscarVendasPorPeriodo(filtroHistorico, null);
     
-    // Exemplo de como preencher a tabela (simulação)
-    exibirResultadosHistorico(vendasPeriodo);
+    exibirResultadosHistorico(pagina.vendas);
+    exibirTotaisHistorico(pagina.totais);
+    atualizarPaginacao(pagina.proximo_cursor);
+}
+
+// Função para carregar a próxima página do histórico
+async function carregarMaisHistorico() {
+    if (!filtroHistorico || !proximoCursor) {
+        return;
+    }
+    
+    let pagina = await buscarVendasPorPeriodo(filtroHistorico, proximoCursor);
+    
+    adicionarLinhasHistorico(pagina.vendas);
+    atualizarPaginacao(pagina.proximo_cursor);
 }
 
 // Função para pesquisar total de vendas por data
@@ -147,6 +172,13 @@ function exibirResultadosHistorico(vendas) {
         return;
     }
     
+    adicionarLinhasHistorico(vendas);
+}
+
+// Função para acrescentar linhas de vendas na tabela
+function adicionarLinhasHistorico(vendas) {
+    const tbody = document.getElementById('salesTableBody');
+    
     vendas.forEach(venda => {
         const tr = document.createElement('tr');
         tr.innerHTML = `
@@ -160,6 +192,21 @@ function exibirResultadosHistorico(vendas) {
     });
 }
 
+// Função para exibir os totais do período pesquisado
+function exibirTotaisHistorico(totais) {
+    const totaisEl = document.getElementById('salesTotals');
+    totaisHistorico = totais;
+    totaisEl.textContent = totais
+        ? `${totais.quantidade} venda(s) no período - Total: ${totais.total}`
+        : '';
+}
+
+// Função para exibir ou ocultar o botão de próxima página
+function atualizarPaginacao(cursor) {
+    proximoCursor = cursor;
+    document.getElementById('btnCarregarMais').hidden = !cursor;
+}
+
 // Função para exibir o total de vendas
 function exibirTotal(total) {
     const resultBox = document.querySelector('.result-box');
@@ -169,7 +216,7 @@ function exibirTotal(total) {
 // Funções auxiliares para integração com backend (exemplos)
 
 // Exemplo de função para fazer requisição ao backend
-async function buscarVendasPorPeriodo(dataInicio, dataFim) {
+async function buscarVendasPorPeriodo(filtro, cursor) {
     try {
         const response = await fetch(URL_PERIODO, {
             method: 'POST',
@@ -177,8 +224,8 @@ async function buscarVendasPorPeriodo(dataInicio, dataFim) {
                 'Content-Type': 'application/json'
             },
             body: JSON.stringify({
-                dataInicio: dataInicio,
-                dataFim: dataFim
+                ...filtro,
+                cursor: cursor
             })
         });
         
@@ -188,11 +235,11 @@ async function buscarVendasPorPeriodo(dataInicio, dataFim) {
         
         const dados = await response.json();
         console.log(dados);
-        return dados.vendas;
+        return dados;
     } catch (error) {
         console.error('Erro:', error);
         alert('Erro ao buscar dados do servidor');
-        return [];
+        return { vendas: [], totais: null, proximo_cursor: null };
     }
 }
 
@@ -222,3 +269,62 @@ async function buscarTotalPorData(data) {
         return null;
     }
 }
+
+
+// ========== VENDAS EM TEMPO REAL ==========
+
+// Converte DD/MM/AAAA em AAAAMMDD para comparar datas como texto
+function chaveData(data) {
+    const [dia, mes, ano] = data.split('/');
+    return ano + mes + dia;
+}
+
+// "R$ 1234,56" -> 1234.56
+function valorMoeda(texto) {
+    return parseFloat(texto.replace('R$', '').trim().replace(',', '.')) || 0;
+}
+
+function formatarMoedaHistorico(valor) {
+    return 'R$ ' + Number(valor).toFixed(2).replace('.', ',');
+}
+
+// Nova venda recebida pelo stream: entra no topo da tabela (e nos totais)
+// se estiver no período pesquisado, sem refazer a consulta
+function receberVenda(venda) {
+    if (!filtroHistorico) {
+        return;
+    }
+    
+    const dia = chaveData(venda.data);
+    if (dia < chaveData(filtroHistorico.dataInicio) || dia > chaveData(filtroHistorico.dataFim)) {
+        return;
+    }
+    
+    const tbody = document.getElementById('salesTableBody');
+    const vazio = tbody.querySelector('.empty-state');
+    if (vazio) {
+        vazio.remove();
+    }
+    
+    const tr = document.createElement('tr');
+    [venda.codigo, venda.data, venda.cliente, formatarMoedaHistorico(venda.total), venda.obs].forEach(valor => {
+        const td = document.createElement('td');
+        td.textContent = valor;
+        tr.appendChild(td);
+    });
+    tbody.prepend(tr);
+    
+    if (totaisHistorico) {
+        exibirTotaisHistorico({
+            quantidade: totaisHistorico.quantidade + 1,
+            total: formatarMoedaHistorico(valorMoeda(totaisHistorico.total) + Number(venda.total))
+        });
+    }
+}
+
+// O navegador reconecta sozinho e envia o Last-Event-ID, recebendo os
+// eventos perdidos durante a queda
+const streamVendas = new EventSource(URL_EVENTOS);
+streamVendas.addEventListener('venda', function(e) {
+    receberVenda(JSON.parse(e.data));
+});
@@ -24,6 +24,7 @@ document.addEventListener('DOMContentLoaded', () => {
   let total = 0;
   let clienteId = null;
   let estoqueAtual = {};
+  let produtoAtual = null;
   
   // Configurar data atual
   const hoje = new Date().toISOString().split('T')[0];
@@ -192,6 +193,79 @@ document.addEventListener('DOMContentLoaded', () => {
     }
   });
   
+  // ========== CATÁLOGO LOCAL ==========
+  
+  // Os produtos ficam em memória e são sincronizados de forma incremental;
+  // a busca só consulta o servidor para códigos fora do catálogo local
+  const catalogo = new Map();
+  const codigosBarras = new Map();
+  let marcaCatalogo = null;
+  const INTERVALO_SINCRONIZACAO = 30000;
+  
+  function guardarProduto(produto) {
+    removerProduto(produto.id);
+    catalogo.set(String(produto.id), produto);
+    (produto.codigos_barras || []).forEach(codigo => codigosBarras.set(codigo, String(produto.id)));
+  }
+  
+  function removerProduto(id) {
+    const anterior = catalogo.get(String(id));
+    if (!anterior) return;
+    
+    (anterior.codigos_barras || []).forEach(codigo => {
+      if (codigosBarras.get(codigo) === String(id)) codigosBarras.delete(codigo);
+    });
+    catalogo.delete(String(id));
+  }
+  
+  // Carga inicial pelo snapshot comprimido; sem snapshot, a primeira
+  // sincronização incremental traz o catálogo completo
+  async function carregarSnapshot() {
+    try {
+      const response = await fetch('/produtos/api/snapshot/');
+      if (!response.ok) return;
+      
+      const data = await response.json();
+      data.produtos.forEach(guardarProduto);
+      marcaCatalogo = data.marca;
+    } catch (error) {
+      console.error('Erro ao carregar snapshot do catálogo:', error);
+    }
+  }
+  
+  async function sincronizarCatalogo() {
+    const url = marcaCatalogo === null
+      ? '/produtos/api/alteracoes/'
+      : `/produtos/api/alteracoes/?desde=${marcaCatalogo}`;
+    
+    try {
+      const response = await fetch(url);
+      const data = await response.json();
+      
+      if (response.ok && data.success) {
+        data.produtos.forEach(guardarProduto);
+        data.removidos.forEach(removerProduto);
+        marcaCatalogo = data.marca;
+      }
+    } catch (error) {
+      console.error('Erro ao sincronizar catálogo:', error);
+    }
+  }
+  
+  carregarSnapshot().then(sincronizarCatalogo);
+  setInterval(sincronizarCatalogo, INTERVALO_SINCRONIZACAO);
+  
+  // Estoque atualizado em tempo real pelo stream de eventos (vendas de
+  // outros caixas e entradas de compras); a sincronização periódica
+  // continua cobrindo as demais alterações
+  const streamEventos = new EventSource('/venda/api/eventos/');
+  streamEventos.addEventListener('estoque', (e) => {
+    JSON.parse(e.data).produtos.forEach(({ id, qtd_estoque }) => {
+      const produto = catalogo.get(String(id));
+      if (produto) produto.qtd_estoque = qtd_estoque;
+    });
+  });
+  
   // ========== BUSCAR PRODUTO ==========
   
   async function buscarProduto() {
@@ -207,15 +281,23 @@ document.addEventListener('DOMContentLoaded', () => {
     btnBuscarProduto.innerHTML = '<i class="fa-solid fa-spinner fa-spin"></i>';
     
     try {
-      const response = await fetch(`/venda/buscar_produto/?codigo=${encodeURIComponent(codigo)}`);
-      const data = await response.json();
+      // O código lido pode ser um código de barras ou o ID do produto
+      let data = catalogo.get(codigosBarras.get(codigo) || codigo);
+      let encontrado = Boolean(data);
+      
+      if (!encontrado) {
+        const response = await fetch(`/venda/buscar_produto/?codigo=${encodeURIComponent(codigo)}`);
+        data = await response.json();
+        encontrado = response.ok && Boolean(data.descricao);
+      }
       
-      if (response.ok && data.descricao) {
+      if (encontrado) {
         prodInput.value = data.descricao;
         precoInput.value = formatarMoeda(data.preco);
         qtdInput.value = 1;
         qtdInput.max = data.qtd_estoque;
-        estoqueAtual[codigo] = data.qtd_estoque;
+        estoqueAtual[data.id] = data.qtd_estoque;
+        produtoAtual = data;
         
         if (data.qtd_estoque === 0) {
           mostrarNotificacao('⚠️ Produto sem estoque!', 'aviso');
@@ -250,6 +332,7 @@ document.addEventListener('DOMContentLoaded', () => {
   }
   
   function limparCamposProduto() {
+    produtoAtual = null;
     prodInput.value = '';
     precoInput.value = '0,00';
     qtdInput.value = 0;
@@ -307,7 +390,7 @@ document.addEventListener('DOMContentLoaded', () => {
     
     // Adiciona o item
     itens.push({
-      codigo: codigo,
+      codigo: produtoAtual ? produtoAtual.id : codigo,
       produto: produto,
       quantidade: qtd,
       preco: preco,
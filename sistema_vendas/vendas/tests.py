@@ -1,13 +1,37 @@
-from django.test import TestCase, Client
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, Client, RequestFactory, override_settings
+from django.http import HttpResponse
 from django.urls import reverse
 from decimal import Decimal
 from django.utils import timezone
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db import connections, router
+from datetime import datetime, timedelta
+from io import StringIO
+from pathlib import Path
+import asyncio
+import copy
+import csv
+import gzip
 import json
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
 
+from sistema_vendas.cache_revalidacao import cache_revalidado
+from sistema_vendas.coalescencia import coalescedor, coalescer, estatisticas
+from sistema_vendas.eventos import canal_eventos
+from sistema_vendas.db_router import JanelaPrimarioMiddleware, alias_replica, ler_da_replica, usar_replica
+from sistema_vendas.respostas import RespostaJSON
 from clientes.models import Cliente
-from produtos.models import Produto
+from produtos.models import CodigoBarras, Produto
 from fornecedores.models import Fornecedor
-from .models import Venda as VendaModel, ItemVenda
+from produtos.logic import ProdutoLogic
+from .cache_relatorios import agregados_por_dia
+from .logic import VendaLogic
+from .models import Venda as VendaModel, ItemVenda, Pagamento as PagamentoModel
 
 
 class PagamentosTestCase(TestCase):
@@ -139,11 +163,16 @@ class PagamentosTestCase(TestCase):
         result = response.json()
         self.assertEqual(result['troco'], 0.0)
         
-        # Verifica se as informações foram salvas
+        # Verifica se os pagamentos foram registrados por forma
+        pagamentos = {p.forma: p.valor for p in PagamentoModel.objects.filter(venda=venda)}
+        self.assertEqual(pagamentos, {
+            'dinheiro': Decimal('50.00'),
+            'cartao': Decimal('30.00'),
+            'cheque': Decimal('20.00'),
+        })
+        
         venda_atualizada = VendaModel.objects.get(id=venda.id)
-        self.assertIn('Dinheiro R$50', venda_atualizada.observacoes)
-        self.assertIn('Cartão R$30', venda_atualizada.observacoes)
-        self.assertIn('Cheque R$20', venda_atualizada.observacoes)
+        self.assertEqual(venda_atualizada.observacoes, 'Pagamento misto')
     
     def test_pagamento_cartao_valor_exato(self):
         """Testa pagamento apenas com cartão"""
@@ -460,6 +489,1215 @@ class PagamentosTestCase(TestCase):
         self.assertIn('Nenhuma venda em andamento', result['erro'])
 
 
+class RelatorioPagamentosTestCase(TestCase):
+    """Testes dos registros e relatórios de pagamentos"""
+    
+    def setUp(self):
+        """Configuração inicial"""
+        self.client = Client()
+        
+        self.venda = VendaModel.objects.create(
+            data_venda=timezone.now(),
+            total_venda=Decimal('100.00')
+        )
+    
+    def pagar(self, dinheiro=0, cartao=0, cheque=0):
+        """Método auxiliar para processar o pagamento da venda"""
+        session = self.client.session
+        session['venda_id'] = self.venda.id
+        session.save()
+        
+        return self.client.post(
+            reverse('processar_pagamento'),
+            data=json.dumps({
+                'dinheiro': dinheiro,
+                'cartao': cartao,
+                'cheque': cheque,
+                'observacoes': ''
+            }),
+            content_type='application/json'
+        )
+    
+    def periodo_hoje(self):
+        """Retorna o JSON de período para o dia atual"""
+        hoje = timezone.now().strftime('%d/%m/%Y')
+        return json.dumps({'dataInicio': hoje, 'dataFim': hoje})
+    
+    def test_troco_registrado_no_pagamento_em_dinheiro(self):
+        """Testa se o troco fica no registro em dinheiro"""
+        response = self.pagar(dinheiro=50.00, cartao=60.00)
+        
+        self.assertEqual(response.status_code, 200)
+        dinheiro = PagamentoModel.objects.get(venda=self.venda, forma='dinheiro')
+        cartao = PagamentoModel.objects.get(venda=self.venda, forma='cartao')
+        self.assertEqual(dinheiro.troco, Decimal('10.00'))
+        self.assertEqual(cartao.troco, Decimal('0.00'))
+    
+    def test_total_por_forma(self):
+        """Testa a totalização dos pagamentos por forma"""
+        self.pagar(dinheiro=120.00)
+        
+        response = self.client.post(
+            reverse('total_pagamentos_por_forma'),
+            data=self.periodo_hoje(),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(len(result['pagamentos']), 1)
+        self.assertEqual(result['pagamentos'][0]['forma'], 'dinheiro')
+        self.assertEqual(result['pagamentos'][0]['total'], 120.0)
+        self.assertEqual(result['pagamentos'][0]['troco'], 20.0)
+        self.assertEqual(result['pagamentos'][0]['liquido'], 100.0)
+    
+    def test_total_por_dia(self):
+        """Testa a totalização dos pagamentos por dia e forma"""
+        self.pagar(dinheiro=40.00, cartao=60.00)
+        
+        response = self.client.post(
+            reverse('total_pagamentos_por_dia'),
+            data=self.periodo_hoje(),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        formas = {item['forma']: item['liquido'] for item in result['pagamentos']}
+        self.assertEqual(formas, {'cartao': 60.0, 'dinheiro': 40.0})
+        self.assertEqual(result['pagamentos'][0]['data'], timezone.now().strftime('%d/%m/%Y'))
+    
+    def test_periodo_inclui_o_dia_final_inteiro(self):
+        """Testa os limites do período (intervalo sobre data_pagamento, sem __date)"""
+        dia = timezone.localdate() - timedelta(days=10)
+        for momento, valor in ((datetime.combine(dia, datetime.min.time()), '1.00'),
+                               (datetime.combine(dia, datetime.max.time()), '2.00'),
+                               (datetime.combine(dia + timedelta(days=1), datetime.min.time()), '4.00')):
+            PagamentoModel.objects.create(
+                venda=self.venda, forma='cartao', valor=Decimal(valor),
+                data_pagamento=timezone.make_aware(momento)
+            )
+        
+        totais = VendaLogic.totais_pagamentos(dia, dia)
+        
+        self.assertEqual(totais[0]['valor_total'], Decimal('3.00'))
+        self.assertEqual(VendaLogic.totais_pagamentos(dia, dia - timedelta(days=1)), [])
+    
+    def test_total_por_forma_data_invalida(self):
+        """Testa a totalização com data inválida"""
+        response = self.client.post(
+            reverse('total_pagamentos_por_forma'),
+            data=json.dumps({'dataInicio': '2025-01-01', 'dataFim': '31/01/2025'}),
+            content_type='application/json'
+        )
+        
+        self.assertEqual(response.status_code, 400)
+
+
+class FinalizarVendaTestCase(TestCase):
+    """Testes do cálculo de preços e totais ao finalizar a venda"""
+    
+    def setUp(self):
+        """Configuração inicial"""
+        self.client = Client()
+        
+        self.fornecedor = Fornecedor.objects.create(
+            nome='Fornecedor Teste',
+            cnpj='12345678901234'
+        )
+        
+        self.produto_a = Produto.objects.create(
+            descricao='Produto A',
+            preco=Decimal('10.25'),
+            qtd_estoque=10,
+            fornecedor=self.fornecedor
+        )
+        
+        self.produto_b = Produto.objects.create(
+            descricao='Produto B',
+            preco=Decimal('3.10'),
+            qtd_estoque=5,
+            fornecedor=self.fornecedor
+        )
+    
+    def finalizar(self, itens, total=0):
+        """Método auxiliar para finalizar uma venda"""
+        return self.client.post(
+            reverse('finalizar_venda'),
+            data=json.dumps({'cpf': '', 'itens': itens, 'total': total}),
+            content_type='application/json'
+        )
+    
+    def test_produtos_bloqueados_em_ordem_de_id(self):
+        """Testa que os produtos do carrinho são carregados (e bloqueados) em ordem de id"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with CaptureQueriesContext(connection) as consultas:
+            VendaLogic.registrar_venda([
+                {'codigo': self.produto_b.id, 'quantidade': 1},
+                {'codigo': self.produto_a.id, 'quantidade': 1},
+            ])
+        
+        sql = next(c['sql'] for c in consultas.captured_queries if 'FROM "produtos_produto"' in c['sql'])
+        self.assertIn('ORDER BY "produtos_produto"."id" ASC', sql)
+    
+    def test_total_calculado_no_servidor(self):
+        """Testa se o total ignora os valores enviados pelo PDV"""
+        response = self.finalizar([
+            {'codigo': self.produto_a.id, 'quantidade': 2, 'subtotal': 0.01},
+            {'codigo': self.produto_b.id, 'quantidade': 3, 'subtotal': 0.01},
+        ], total=0.02)
+        
+        self.assertEqual(response.status_code, 200)
+        venda = VendaModel.objects.get(id=response.json()['venda_id'])
+        self.assertEqual(venda.total_venda, Decimal('29.80'))
+        
+        item_a = venda.itens.get(produto_id=self.produto_a)
+        self.assertEqual(item_a.preco_unitario, Decimal('10.25'))
+        self.assertEqual(item_a.subTotal, Decimal('20.50'))
+    
+    def test_baixa_estoque(self):
+        """Testa a baixa de estoque com itens repetidos no carrinho"""
+        response = self.finalizar([
+            {'codigo': self.produto_a.id, 'quantidade': 2},
+            {'codigo': self.produto_a.id, 'quantidade': 3},
+        ])
+        
+        self.assertEqual(response.status_code, 200)
+        self.produto_a.refresh_from_db()
+        self.assertEqual(self.produto_a.qtd_estoque, 5)
+        self.assertEqual(ItemVenda.objects.get().quantidade, 5)
+    
+    def test_estoque_insuficiente(self):
+        """Testa que nada é gravado quando falta estoque"""
+        response = self.finalizar([
+            {'codigo': self.produto_a.id, 'quantidade': 1},
+            {'codigo': self.produto_b.id, 'quantidade': 6},
+        ])
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Estoque insuficiente', response.json()['erro'])
+        self.assertEqual(VendaModel.objects.count(), 0)
+        self.produto_a.refresh_from_db()
+        self.assertEqual(self.produto_a.qtd_estoque, 10)
+    
+    def test_produto_inexistente(self):
+        """Testa venda com código de produto inexistente"""
+        response = self.finalizar([{'codigo': 99999, 'quantidade': 1}])
+        
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(VendaModel.objects.count(), 0)
+    
+    def test_preco_historico_preservado(self):
+        """Testa se o preço do item não muda após alteração do produto"""
+        response = self.finalizar([{'codigo': self.produto_a.id, 'quantidade': 1}])
+        
+        self.produto_a.preco = Decimal('99.00')
+        self.produto_a.save()
+        
+        item = ItemVenda.objects.get(venda_id=response.json()['venda_id'])
+        self.assertEqual(item.preco_unitario, Decimal('10.25'))
+
+
+class HistoricoVendasTestCase(TestCase):
+    """Testes da paginação e exportação do histórico de vendas"""
+    
+    def setUp(self):
+        """Configuração inicial"""
+        self.client = Client()
+        
+        self.cliente = Cliente.objects.create(
+            nome='Maria Santos',
+            cpf='98765432100'
+        )
+        
+        agora = timezone.now()
+        self.vendas = [
+            VendaModel.objects.create(
+                cliente_id=self.cliente if i % 2 == 0 else None,
+                data_venda=agora - timedelta(minutes=i),
+                total_venda=Decimal('10.00') * (i + 1)
+            )
+            for i in range(5)
+        ]
+        self.hoje = agora.strftime('%d/%m/%Y')
+    
+    def buscar(self, **filtros):
+        """Método auxiliar para buscar uma página do histórico"""
+        filtros.setdefault('dataInicio', self.hoje)
+        filtros.setdefault('dataFim', self.hoje)
+        return self.client.post(
+            reverse('buscar_vendas_periodo'),
+            data=json.dumps(filtros),
+            content_type='application/json'
+        )
+    
+    def test_paginacao_por_cursor(self):
+        """Testa se as páginas percorrem todas as vendas sem repetição"""
+        primeira = self.buscar(limite=2).json()
+        
+        self.assertEqual(len(primeira['vendas']), 2)
+        self.assertEqual(primeira['totais'], {'quantidade': 5, 'total': 'R$ 150,00'})
+        self.assertIsNotNone(primeira['proximo_cursor'])
+        
+        codigos = [v['codigo'] for v in primeira['vendas']]
+        cursor = primeira['proximo_cursor']
+        while cursor:
+            pagina = self.buscar(limite=2, cursor=cursor).json()
+            self.assertNotIn('totais', pagina)
+            codigos += [v['codigo'] for v in pagina['vendas']]
+            cursor = pagina['proximo_cursor']
+        
+        esperado = [str(v.id).zfill(6) for v in self.vendas]
+        self.assertEqual(codigos, esperado)
+    
+    def test_filtros_cliente_e_valor(self):
+        """Testa os filtros opcionais de cliente e valor"""
+        result = self.buscar(cliente=self.cliente.id, valorMinimo='20').json()
+        
+        self.assertEqual([v['total'] for v in result['vendas']], ['R$ 30,00', 'R$ 50,00'])
+        self.assertEqual(result['totais']['total'], 'R$ 80,00')
+    
+    def test_cursor_invalido(self):
+        """Testa busca com cursor inválido"""
+        response = self.buscar(cursor='invalido')
+        
+        self.assertEqual(response.status_code, 400)
+    
+    def test_exportar_csv(self):
+        """Testa a exportação em CSV do período"""
+        response = self.client.get(reverse('exportar_vendas_periodo'), {
+            'dataInicio': self.hoje,
+            'dataFim': self.hoje,
+            'formato': 'csv'
+        })
+        
+        self.assertEqual(response.status_code, 200)
+        linhas = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(linhas[0], 'codigo,data_venda,cliente,total_venda,observacoes')
+        self.assertEqual(len(linhas), 6)
+    
+    def test_exportar_ndjson(self):
+        """Testa a exportação em NDJSON do período"""
+        response = self.client.get(reverse('exportar_vendas_periodo'), {
+            'dataInicio': self.hoje,
+            'dataFim': self.hoje,
+            'formato': 'ndjson'
+        })
+        
+        linhas = b''.join(response.streaming_content).decode().splitlines()
+        registros = [json.loads(linha) for linha in linhas]
+        self.assertEqual(len(registros), 5)
+        self.assertEqual(registros[0]['total_venda'], '10.00')
+        self.assertEqual(registros[0]['cliente'], 'Maria Santos')
+    
+    def test_exportar_erro_inesperado(self):
+        """Testa que erros inesperados na exportação retornam JSON 500"""
+        with mock.patch.object(VendaLogic, 'filtrar_vendas', side_effect=RuntimeError('falha simulada')):
+            response = self.client.get(reverse('exportar_vendas_periodo'), {
+                'dataInicio': self.hoje,
+                'dataFim': self.hoje
+            })
+        
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(response.json()['success'])
+
+
+class BuscarProdutosLoteTestCase(TestCase):
+    """Testes da busca de produtos em lote"""
+    
+    def setUp(self):
+        """Configuração inicial"""
+        cache.clear()
+        self.client = Client()
+        
+        self.fornecedor = Fornecedor.objects.create(
+            nome='Fornecedor Teste',
+            cnpj='12345678901234'
+        )
+        self.produtos = [
+            Produto.objects.create(
+                descricao=f'Produto {i}',
+                preco=Decimal('2.50'),
+                qtd_estoque=i,
+                fornecedor=self.fornecedor
+            )
+            for i in range(3)
+        ]
+    
+    def buscar(self, codigos):
+        """Método auxiliar para a busca em lote"""
+        return self.client.post(
+            reverse('buscar_produtos_lote'),
+            data=json.dumps({'codigos': codigos}),
+            content_type='application/json'
+        )
+    
+    def test_encontrados_e_nao_encontrados(self):
+        """Testa o retorno conjunto de encontrados e não encontrados, na ordem informada"""
+        codigos = [self.produtos[2].id, 999999, str(self.produtos[0].id), 'abc']
+        
+        with self.assertNumQueries(1):
+            response = self.buscar(codigos)
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([p['id'] for p in data['produtos']], [self.produtos[2].id, self.produtos[0].id])
+        self.assertEqual(data['produtos'][0]['preco'], 2.5)
+        self.assertEqual(data['nao_encontrados'], [999999, 'abc'])
+    
+    def test_codigos_de_barras(self):
+        """Testa a busca em lote por códigos de barras"""
+        CodigoBarras.objects.create(produto=self.produtos[1], codigo='7891000315507')
+        
+        data = self.buscar(['7891000315507', '7896004000015']).json()
+        
+        self.assertEqual([p['id'] for p in data['produtos']], [self.produtos[1].id])
+        self.assertEqual(data['nao_encontrados'], ['7896004000015'])
+    
+    def test_id_com_formato_de_gtin(self):
+        """Testa que um ID com dígito verificador válido é encontrado pelo ID"""
+        produto = Produto.objects.create(
+            id=12345670,
+            descricao='Produto GTIN-8',
+            preco=Decimal('1.00'),
+            fornecedor=self.fornecedor
+        )
+        
+        data = self.buscar(['12345670']).json()
+        
+        self.assertEqual([p['id'] for p in data['produtos']], [produto.id])
+        self.assertEqual(data['nao_encontrados'], [])
+    
+    def test_reaproveita_cache(self):
+        """Testa que a segunda busca vem do cache, sem consultar o banco"""
+        codigos = [p.id for p in self.produtos]
+        self.buscar(codigos)
+        
+        with self.assertNumQueries(0):
+            response = self.buscar(codigos)
+        
+        self.assertEqual(len(response.json()['produtos']), 3)
+    
+    def test_cache_invalidado_apos_alteracao(self):
+        """Testa que a alteração de um produto invalida o cache"""
+        self.buscar([self.produtos[0].id])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            ProdutoLogic.atualizar_produto(
+                self.produtos[0].id, 'Produto Alterado', Decimal('3.00'), 1, self.fornecedor.id
+            )
+        
+        response = self.buscar([self.produtos[0].id])
+        self.assertEqual(response.json()['produtos'][0]['descricao'], 'Produto Alterado')
+    
+    def test_limite_de_codigos(self):
+        """Testa a rejeição de listas acima do limite"""
+        response = self.buscar(list(range(VendaLogic.LIMITE_CODIGOS_LOTE + 1)))
+        self.assertEqual(response.status_code, 400)
+    
+    def test_codigos_invalidos(self):
+        """Testa a rejeição de corpo sem lista de códigos"""
+        response = self.buscar('1,2,3')
+        self.assertEqual(response.status_code, 400)
+
+
+class CoalescenciaTestCase(TestCase):
+    """Testes da coalescência de leituras simultâneas (single-flight)"""
+    
+    def setUp(self):
+        """Zera os contadores"""
+        coalescedor.zerar()
+        self.addCleanup(coalescedor.zerar)
+    
+    def executar_em_paralelo(self, funcao, quantidade):
+        """Método auxiliar que chama a função em várias threads e libera o líder
+        depois que todas as outras estiverem aguardando"""
+        resultados = [None] * quantidade
+        
+        def chamar(posicao):
+            try:
+                resultados[posicao] = funcao(1)
+            except Exception as e:
+                resultados[posicao] = e
+        
+        threads = [threading.Thread(target=chamar, args=(i,)) for i in range(quantidade)]
+        for thread in threads:
+            thread.start()
+        
+        limite = time.monotonic() + 5
+        while estatisticas().get('teste.lenta', {}).get('economizadas', 0) < quantidade - 1:
+            self.assertLess(time.monotonic(), limite)
+            time.sleep(0.005)
+        self.liberar.set()
+        
+        for thread in threads:
+            thread.join(5)
+        return resultados
+    
+    def test_chamadas_identicas_compartilham_resultado(self):
+        """Testa que chamadas simultâneas executam a função uma única vez"""
+        self.liberar = threading.Event()
+        execucoes = []
+        
+        @coalescer('teste.lenta')
+        def lenta(valor):
+            execucoes.append(valor)
+            self.liberar.wait(5)
+            return [valor]
+        
+        resultados = self.executar_em_paralelo(lenta, 5)
+        
+        self.assertEqual(execucoes, [1])
+        self.assertTrue(all(resultado is resultados[0] for resultado in resultados))
+        self.assertEqual(estatisticas()['teste.lenta'], {'executadas': 1, 'economizadas': 4})
+    
+    def test_excecao_compartilhada(self):
+        """Testa que a exceção do líder chega a todas as chamadas aguardando"""
+        self.liberar = threading.Event()
+        
+        @coalescer('teste.lenta')
+        def lenta(valor):
+            self.liberar.wait(5)
+            raise ValueError('falhou')
+        
+        resultados = self.executar_em_paralelo(lenta, 3)
+        
+        self.assertTrue(all(isinstance(resultado, ValueError) for resultado in resultados))
+    
+    def test_sem_coalescencia_em_transacao(self):
+        """Testa que chamadas dentro de uma transação não são coalescidas"""
+        @coalescer('teste.transacao')
+        def consulta():
+            return VendaModel.objects.count()
+        
+        # O TestCase executa cada teste dentro de uma transação
+        self.assertEqual(consulta(), 0)
+        self.assertNotIn('teste.transacao', estatisticas())
+
+
+class EventosVendasTestCase(TestCase):
+    """Testes do stream de eventos (SSE) de vendas e estoque"""
+    
+    def setUp(self):
+        """Configuração inicial"""
+        self.fornecedor = Fornecedor.objects.create(nome='Fornecedor Eventos', cnpj='12345678000155')
+        self.produto = Produto.objects.create(
+            descricao='Produto Eventos',
+            preco=Decimal('12.50'),
+            qtd_estoque=10,
+            fornecedor=self.fornecedor
+        )
+        self.inicio = canal_eventos.ultimo_id()
+    
+    def test_venda_publica_eventos_apos_commit(self):
+        """Testa que a venda publica os eventos de venda e estoque só no commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            venda = VendaLogic.registrar_venda([{'codigo': self.produto.id, 'quantidade': 2}])
+            self.assertEqual(canal_eventos.desde(self.inicio), [])
+        
+        eventos = {e['tipo']: e['dados'] for e in canal_eventos.desde(self.inicio)}
+        self.assertEqual(eventos['venda']['codigo'], str(venda.id).zfill(6))
+        self.assertEqual(eventos['venda']['total'], Decimal('25.00'))
+        self.assertEqual(eventos['estoque']['produtos'], [{'id': self.produto.id, 'qtd_estoque': 8}])
+    
+    def test_stream_entrega_evento_publicado(self):
+        """Testa que uma conexão aberta recebe o evento publicado em outra thread"""
+        from .views import _stream_eventos
+        
+        async def consumir():
+            stream = _stream_eventos(None)
+            try:
+                inicio = await stream.__anext__()
+                threading.Thread(target=canal_eventos.publicar, args=('venda', {'codigo': '000123'})).start()
+                return inicio, await asyncio.wait_for(stream.__anext__(), 5)
+            finally:
+                await stream.aclose()
+        
+        inicio, mensagem = asyncio.run(consumir())
+        
+        self.assertIn('retry:', inicio)
+        self.assertIn('event: venda', mensagem)
+        self.assertIn('"codigo":"000123"', mensagem)
+        self.assertEqual(canal_eventos.assinaturas, set())
+    
+    def test_reconexao_recebe_eventos_perdidos(self):
+        """Testa que o Last-Event-ID devolve os eventos publicados durante a queda"""
+        canal_eventos.publicar('estoque', {'produtos': [{'id': self.produto.id, 'qtd_estoque': 3}]})
+        
+        response = self.client.get(reverse('eventos_vendas'), HTTP_LAST_EVENT_ID=str(self.inicio))
+        conteudo = b''.join(response.streaming_content).decode()
+        
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn('event: estoque', conteudo)
+        self.assertIn('"qtd_estoque":3', conteudo)
+
+
+class CacheRevalidadoTestCase(SimpleTestCase):
+    """Testes do cache com revalidação em segundo plano (stale-while-revalidate)"""
+    
+    def setUp(self):
+        """Limpa o cache e captura as atualizações agendadas"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        
+        self.agendadas = []
+        patcher = mock.patch('sistema_vendas.cache_revalidacao._agendar', self.agendadas.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.chamadas = []
+    
+    def calcular(self, valor):
+        """Método auxiliar que registra cada cálculo"""
+        self.chamadas.append(valor)
+        return len(self.chamadas)
+    
+    def executar_agendadas(self):
+        """Executa as atualizações agendadas em outra thread, como no servidor"""
+        for funcao in self.agendadas:
+            thread = threading.Thread(target=funcao)
+            thread.start()
+            thread.join(5)
+        self.agendadas.clear()
+    
+    def test_valor_fresco_vem_do_cache(self):
+        """Testa que, dentro do prazo fresco, a função não é executada de novo"""
+        funcao = cache_revalidado('teste.fresco', fresco=60)(self.calcular)
+        
+        self.assertEqual(funcao('a'), 1)
+        self.assertEqual(funcao('a'), 1)
+        self.assertEqual(funcao('b'), 2)
+        self.assertEqual(self.chamadas, ['a', 'b'])
+    
+    def test_valor_antigo_servido_durante_revalidacao(self):
+        """Testa que o valor vencido é servido na hora e atualizado uma única vez"""
+        funcao = cache_revalidado('teste.vencido', fresco=0)(self.calcular)
+        funcao('a')
+        
+        # Requisições simultâneas recebem o valor antigo; só uma agenda a atualização
+        self.assertEqual(funcao('a'), 1)
+        self.assertEqual(funcao('a'), 1)
+        self.assertEqual(len(self.agendadas), 1)
+        
+        self.executar_agendadas()
+        
+        self.assertEqual(funcao('a'), 2)
+        self.assertEqual(len(self.agendadas), 1)
+    
+    @override_settings(CACHE_REVALIDACAO_ESPERA_SEGUNDOS=1)
+    def test_cache_vazio_aguarda_calculo_em_andamento(self):
+        """Testa que, com a trava ocupada, a requisição aguarda o valor de quem calcula"""
+        liberar = threading.Event()
+        
+        def lenta(valor):
+            liberar.wait(5)
+            return self.calcular(valor)
+        
+        funcao = cache_revalidado('teste.espera', fresco=60)(lenta)
+        lider = threading.Thread(target=funcao, args=('a',))
+        lider.start()
+        
+        limite = time.monotonic() + 5
+        while not any(':trava' in chave for chave in cache._cache):
+            self.assertLess(time.monotonic(), limite)
+            time.sleep(0.005)
+        
+        threading.Timer(0.1, liberar.set).start()
+        self.assertEqual(funcao('a'), 1)
+        lider.join(5)
+        
+        self.assertEqual(self.chamadas, ['a'])
+
+
+class CacheRelatoriosTestCase(TestCase):
+    """Testes do cache por dia dos relatórios (dias encerrados no cache, hoje ao vivo)"""
+    
+    def setUp(self):
+        """Configuração inicial: uma venda de três dias atrás e uma de hoje"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        
+        self.fornecedor = Fornecedor.objects.create(nome='Fornecedor Relatório', cnpj='12345678000199')
+        self.produto = Produto.objects.create(
+            descricao='Produto Relatório',
+            preco=Decimal('10.00'),
+            qtd_estoque=100,
+            fornecedor=self.fornecedor
+        )
+        
+        self.agora = timezone.now()
+        self.passado = self.criar_venda(self.agora - timedelta(days=3), 2)
+        self.criar_venda(self.agora, 1)
+        
+        self.inicio = (self.agora - timedelta(days=5)).date()
+        self.fim = timezone.localdate()
+    
+    def criar_venda(self, data_venda, quantidade):
+        """Método auxiliar para criar uma venda com um item"""
+        venda = VendaModel.objects.create(
+            data_venda=data_venda,
+            total_venda=Decimal('10.00') * quantidade
+        )
+        ItemVenda.objects.create(
+            venda_id=venda,
+            produto_id=self.produto,
+            quantidade=quantidade,
+            subTotal=Decimal('10.00') * quantidade
+        )
+        return venda
+    
+    def test_dias_encerrados_vem_do_cache(self):
+        """Testa que, com os dias encerrados em cache, só o dia atual vai ao banco"""
+        totais = VendaLogic.totais_vendas_periodo(self.inicio, self.fim)
+        self.assertEqual(totais, {'total': Decimal('30.00'), 'quantidade': 2})
+        
+        with self.assertNumQueries(1):
+            self.assertEqual(VendaLogic.totais_vendas_periodo(self.inicio, self.fim), totais)
+    
+    def test_dia_atual_calculado_na_hora(self):
+        """Testa que uma venda de hoje entra no total sem invalidação"""
+        VendaLogic.totais_vendas_periodo(self.inicio, self.fim)
+        self.criar_venda(self.agora, 4)
+        
+        totais = VendaLogic.totais_vendas_periodo(self.inicio, self.fim)
+        
+        self.assertEqual(totais, {'total': Decimal('70.00'), 'quantidade': 3})
+    
+    def test_venda_retroativa_invalida_o_dia(self):
+        """Testa que uma venda com data de um dia encerrado invalida só aquele dia"""
+        VendaLogic.totais_vendas_periodo(self.inicio, self.fim)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.criar_venda(self.agora - timedelta(days=3), 5)
+        
+        totais = VendaLogic.totais_vendas_periodo(self.inicio, self.fim)
+        
+        self.assertEqual(totais, {'total': Decimal('80.00'), 'quantidade': 3})
+    
+    def test_alterar_data_invalida_os_dois_dias(self):
+        """Testa que mover uma venda de dia invalida o dia antigo e o novo"""
+        VendaLogic.totais_vendas_periodo(self.inicio, self.fim)
+        
+        venda = VendaModel.objects.get(pk=self.passado.pk)
+        venda.data_venda = self.agora - timedelta(days=4)
+        with self.captureOnCommitCallbacks(execute=True):
+            venda.save()
+        
+        por_dia = VendaLogic.totais_vendas_por_dia(self.inicio, self.fim)
+        
+        self.assertEqual(por_dia[(self.agora - timedelta(days=3)).date()]['quantidade'], 0)
+        self.assertEqual(por_dia[(self.agora - timedelta(days=4)).date()]['quantidade'], 1)
+    
+    def test_excluir_cliente_invalida_os_dias(self):
+        """Testa que a exclusão em cascata das vendas de um cliente invalida os dias"""
+        from clientes.logic import ClienteLogic
+        
+        cliente = Cliente.objects.create(nome='Cliente Relatório', cpf='11122233344', email='rel@teste.com')
+        ontem = self.agora - timedelta(days=1)
+        venda = self.criar_venda(ontem, 1)
+        venda.cliente_id = cliente
+        venda.save()
+        
+        dia = ontem.date()
+        self.assertEqual(VendaLogic.totais_vendas_por_dia(dia, dia)[dia]['quantidade'], 1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            ClienteLogic.deletar_cliente(cliente.id)
+        
+        self.assertEqual(VendaLogic.totais_vendas_por_dia(dia, dia)[dia], {'total': Decimal('0'), 'quantidade': 0})
+    
+    def test_excluir_produto_invalida_os_dias(self):
+        """Testa que a exclusão em cascata dos itens de um produto invalida os dias"""
+        inicio = self.inicio.strftime('%d/%m/%Y')
+        fim = self.fim.strftime('%d/%m/%Y')
+        self.assertEqual(len(ProdutoLogic.relatorio_produtos_vendidos(inicio, fim)), 1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            ProdutoLogic.deletar_produto(self.produto.id)
+        
+        # O dia da venda antiga foi invalidado e precisa ser recalculado
+        dia = (self.agora - timedelta(days=3)).date()
+        recalculados = []
+        agregados_por_dia('produtos_vendidos', dia, dia, lambda dias: recalculados.extend(dias) or {d: {} for d in dias})
+        self.assertEqual(recalculados, [dia])
+        self.assertEqual(ProdutoLogic.relatorio_produtos_vendidos(inicio, fim), [])
+    
+    def test_ranking_ignora_produto_excluido_antes_do_limite(self):
+        """Testa que um produto excluído ainda presente no cache não ocupa posição do ranking"""
+        outro = Produto.objects.create(
+            descricao='Outro Produto', preco=Decimal('10.00'), qtd_estoque=100, fornecedor=self.fornecedor
+        )
+        venda = VendaModel.objects.create(data_venda=self.agora - timedelta(days=2), total_venda=Decimal('10.00'))
+        ItemVenda.objects.create(venda_id=venda, produto_id=outro, quantidade=1, subTotal=Decimal('10.00'))
+        
+        inicio = self.inicio.strftime('%d/%m/%Y')
+        ontem = (self.fim - timedelta(days=1)).strftime('%d/%m/%Y')
+        ProdutoLogic.relatorio_produtos_vendidos(inicio, ontem, limite=1)
+        
+        # Sem executar o on_commit, os dias em cache continuam com o produto excluído
+        self.produto.delete()
+        
+        relatorio = ProdutoLogic.relatorio_produtos_vendidos(inicio, ontem, limite=1)
+        
+        self.assertEqual([p['descricao'] for p in relatorio], ['Outro Produto'])
+    
+    def test_relatorio_produtos_vendidos(self):
+        """Testa o ranking de produtos somando dias do cache e o dia atual"""
+        inicio = self.inicio.strftime('%d/%m/%Y')
+        fim = self.fim.strftime('%d/%m/%Y')
+        ProdutoLogic.relatorio_produtos_vendidos(inicio, fim)
+        self.criar_venda(self.agora, 2)
+        
+        relatorio = ProdutoLogic.relatorio_produtos_vendidos(inicio, fim)
+        
+        self.assertEqual(len(relatorio), 1)
+        self.assertEqual(relatorio[0]['descricao'], 'Produto Relatório')
+        self.assertEqual(relatorio[0]['quantidade_vendida'], 5)
+        self.assertEqual(relatorio[0]['valor_total'], 'R$ 50,00')
+
+
+
+class RelatorioProdutosSemTransacaoTestCase(TransactionTestCase):
+    """
+    Testes do relatório de produtos fora de um bloco atomic, como em
+    produção: coalescer e cache por dia juntos, sem defasagem no resultado
+    """
+    
+    def setUp(self):
+        """Configuração inicial: uma venda de três dias atrás"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        
+        fornecedor = Fornecedor.objects.create(nome='Fornecedor Relatório', cnpj='12345678000199')
+        self.produto = Produto.objects.create(
+            descricao='Produto Relatório',
+            preco=Decimal('10.00'),
+            qtd_estoque=100,
+            fornecedor=fornecedor
+        )
+        self.agora = timezone.now()
+        self.criar_venda(self.agora - timedelta(days=3), 2)
+        
+        self.inicio = (self.agora - timedelta(days=5)).strftime('%d/%m/%Y')
+        self.fim = timezone.localdate().strftime('%d/%m/%Y')
+    
+    def criar_venda(self, data_venda, quantidade):
+        """Método auxiliar para criar uma venda com um item"""
+        venda = VendaModel.objects.create(data_venda=data_venda, total_venda=Decimal('10.00') * quantidade)
+        ItemVenda.objects.create(
+            venda_id=venda,
+            produto_id=self.produto,
+            quantidade=quantidade,
+            subTotal=Decimal('10.00') * quantidade
+        )
+    
+    def quantidade_vendida(self):
+        """Método auxiliar que retorna a quantidade do produto no relatório"""
+        relatorio = ProdutoLogic.relatorio_produtos_vendidos(self.inicio, self.fim)
+        return relatorio[0]['quantidade_vendida']
+    
+    def test_venda_de_hoje_aparece_na_hora(self):
+        """Testa que uma venda de hoje entra no relatório já na próxima chamada"""
+        self.assertEqual(self.quantidade_vendida(), 2)
+        
+        self.criar_venda(self.agora, 3)
+        
+        self.assertEqual(self.quantidade_vendida(), 5)
+    
+    def test_venda_retroativa_aparece_apos_o_commit(self):
+        """Testa que uma venda em dia encerrado entra no relatório após o commit"""
+        self.assertEqual(self.quantidade_vendida(), 2)
+        
+        self.criar_venda(self.agora - timedelta(days=2), 4)
+        
+        self.assertEqual(self.quantidade_vendida(), 6)
+
+@override_settings(EXPORTACAO_MARGEM_SEGUNDOS=0)
+class ExportarAnalyticsTestCase(TestCase):
+    """Testes do comando de exportação incremental para análise"""
+    
+    def setUp(self):
+        """Configuração inicial"""
+        self.saida = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.saida)
+        
+        self.fornecedor = Fornecedor.objects.create(
+            nome='Fornecedor Teste',
+            cnpj='12345678901234'
+        )
+        self.produto = Produto.objects.create(
+            descricao='Produto Teste',
+            preco=Decimal('10.00'),
+            qtd_estoque=100,
+            fornecedor=self.fornecedor
+        )
+        
+        # Uma venda em janeiro e outra em fevereiro
+        for mes in (1, 2):
+            venda = VendaModel.objects.create(
+                data_venda=timezone.make_aware(datetime(2025, mes, 10, 12, 0)),
+                total_venda=Decimal('20.00')
+            )
+            ItemVenda.objects.create(
+                venda_id=venda,
+                produto_id=self.produto,
+                quantidade=2,
+                preco_unitario=Decimal('10.00'),
+                subTotal=Decimal('20.00')
+            )
+    
+    def exportar(self):
+        """Método auxiliar que executa a exportação em CSV"""
+        call_command(
+            'exportar_analytics', saida=self.saida, formato='csv',
+            tabela=['vendas_venda', 'vendas_itemvenda'], stdout=StringIO()
+        )
+    
+    def ler_linhas(self, tabela):
+        """Método auxiliar que lê todas as linhas exportadas de uma tabela"""
+        linhas = []
+        for caminho in sorted(Path(self.saida, tabela).glob('mes=*/*.csv.gz')):
+            with gzip.open(caminho, 'rt', encoding='utf-8') as arquivo:
+                linhas += list(csv.DictReader(arquivo))
+        return linhas
+    
+    def test_exportacao_particionada_por_mes(self):
+        """Testa se cada mês gera sua própria partição"""
+        self.exportar()
+        
+        meses = sorted(p.name for p in Path(self.saida, 'vendas_venda').iterdir())
+        self.assertEqual(meses, ['mes=2025-01', 'mes=2025-02'])
+        
+        itens = self.ler_linhas('vendas_itemvenda')
+        self.assertEqual(len(itens), 2)
+        self.assertEqual(itens[0]['subtotal'], '20.00')
+    
+    def test_exportacao_incremental(self):
+        """Testa se a segunda execução exporta apenas as linhas novas"""
+        self.exportar()
+        
+        VendaModel.objects.create(
+            data_venda=timezone.make_aware(datetime(2025, 2, 20, 12, 0)),
+            total_venda=Decimal('5.00')
+        )
+        self.exportar()
+        
+        vendas = self.ler_linhas('vendas_venda')
+        self.assertEqual(len(vendas), 3)
+        self.assertEqual(len({v['id'] for v in vendas}), 3)
+        
+        with open(Path(self.saida, '_marcas.json'), encoding='utf-8') as arquivo:
+            marcas = json.load(arquivo)
+        self.assertEqual(marcas['vendas_venda']['id'], VendaModel.objects.latest('id').id)
+    
+    def test_venda_alterada_reexportada(self):
+        """Testa se uma venda alterada após o checkout é exportada de novo"""
+        self.exportar()
+        
+        venda = VendaModel.objects.earliest('id')
+        venda.observacoes = 'Pago em dinheiro'
+        venda.save(update_fields=['observacoes', 'atualizado_em'])
+        self.exportar()
+        
+        vendas = [v for v in self.ler_linhas('vendas_venda') if v['id'] == str(venda.id)]
+        self.assertEqual(len(vendas), 2)
+        self.assertEqual(max(vendas, key=lambda v: v['atualizado_em'])['observacoes'], 'Pago em dinheiro')
+    
+    def test_margem_de_commit(self):
+        """Testa que linhas alteradas dentro da margem ficam para a próxima execução"""
+        with override_settings(EXPORTACAO_MARGEM_SEGUNDOS=60):
+            self.exportar()
+        
+        self.assertEqual(self.ler_linhas('vendas_venda'), [])
+        self.assertFalse(Path(self.saida, '_marcas.json').exists())
+        
+        self.exportar()
+        self.assertEqual(len(self.ler_linhas('vendas_venda')), 2)
+
+
+class ReplicaRouterTestCase(TestCase):
+    """Testes do roteamento de leituras de relatório para a réplica"""
+    
+    def setUp(self):
+        """Configuração inicial"""
+        self.factory = RequestFactory()
+        
+        # Nos testes a réplica é espelho do default; simula um servidor separado
+        patcher = mock.patch('sistema_vendas.db_router.alias_replica', return_value='replica')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    @staticmethod
+    @usar_replica
+    def view_leitura(request):
+        """View de leitura que informa em qual banco a consulta seria feita"""
+        return HttpResponse(VendaModel.objects.all().db)
+    
+    def requisitar(self, view=None, **cookies):
+        """Método auxiliar que executa a view pelo middleware da janela"""
+        request = self.factory.get('/')
+        request.COOKIES.update(cookies)
+        return JanelaPrimarioMiddleware(view or self.view_leitura)(request)
+    
+    def test_leituras_fora_da_view_usam_principal(self):
+        """Testa que sem o decorator as leituras continuam no default"""
+        self.assertEqual(VendaModel.objects.all().db, 'default')
+        
+        with ler_da_replica():
+            self.assertEqual(VendaModel.objects.all().db, 'replica')
+            # Escritas nunca vão para a réplica
+            self.assertEqual(router.db_for_write(VendaModel), 'default')
+    
+    def test_view_de_relatorio_le_da_replica(self):
+        """Testa que a view marcada consulta a réplica sem abrir a janela"""
+        response = self.requisitar()
+        
+        self.assertEqual(response.content, b'replica')
+        self.assertNotIn('primario_ate', response.cookies)
+    
+    def test_janela_primario_apos_escrita(self):
+        """Testa que após uma escrita o cliente lê do principal"""
+        response = self.requisitar(primario_ate=str(time.time() + 5))
+        
+        self.assertEqual(response.content, b'default')
+    
+    def test_janela_primario_expirada(self):
+        """Testa que a janela expirada volta a usar a réplica"""
+        response = self.requisitar(primario_ate=str(time.time() - 1))
+        
+        self.assertEqual(response.content, b'replica')
+    
+    def test_escrita_define_cookie_da_janela(self):
+        """Testa que uma requisição com escrita abre a janela de leitura no principal"""
+        def view_escrita(request):
+            Cliente.objects.create(nome='Cliente Janela', cpf='11122233344')
+            # Leituras na mesma requisição, após a escrita, ficam no principal
+            return self.view_leitura(request)
+        
+        response = self.requisitar(view_escrita)
+        
+        self.assertEqual(response.content, b'default')
+        self.assertIn('primario_ate', response.cookies)
+        self.assertGreater(float(response.cookies['primario_ate'].value), time.time())
+    
+    def test_replica_espelho_usa_principal(self):
+        """Testa que a réplica apontando para o mesmo banco não é usada"""
+        # Só neste teste volta a detecção real do espelho
+        with mock.patch('sistema_vendas.db_router.alias_replica', alias_replica):
+            with ler_da_replica():
+                self.assertEqual(VendaModel.objects.all().db, 'default')
+
+
+
+class ReplicaSeparadaTestCase(TransactionTestCase):
+    """
+    Testes do roteamento com a réplica em um banco de teste próprio
+
+    Nas configurações a réplica de teste é espelho do default; aqui ela é
+    trocada por um banco separado, criado pelas migrações, para que as
+    leituras de fato mudem de banco.
+    """
+    
+    databases = {'default', 'replica'}
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_espelho = connections['replica']
+        replica = connections.create_connection('replica')
+        replica.settings_dict = copy.deepcopy(replica.settings_dict)
+        replica.settings_dict['TEST']['MIRROR'] = None
+        if replica.vendor != 'sqlite':
+            replica.settings_dict['TEST']['NAME'] = f"{connections['default'].settings_dict['NAME']}_replica"
+        cls.nome_replica = replica.settings_dict['NAME']
+        connections['replica'] = replica
+        
+        # Com a réplica desligada o router permite as migrações nela
+        # (em produção o esquema chega pela replicação)
+        with override_settings(REPLICA_DB_ALIAS=None):
+            replica.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        super().setUpClass()
+    
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].creation.destroy_test_db(cls.nome_replica, verbosity=0)
+        connections['replica'] = cls.replica_espelho
+    
+    def setUp(self):
+        """Mesma venda com observações diferentes em cada banco"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        data_venda = timezone.make_aware(datetime(2025, 3, 10, 12, 0))
+        VendaModel.objects.create(data_venda=data_venda, total_venda=Decimal('10.00'), observacoes='principal')
+        VendaModel.objects.using('replica').create(
+            data_venda=data_venda,
+            total_venda=Decimal('10.00'),
+            observacoes='replica'
+        )
+        # O flush do TransactionTestCase não limpa a réplica (o router não
+        # permite migrações nela), então a venda é removida aqui
+        self.addCleanup(VendaModel.objects.using('replica').all().delete)
+    
+    def buscar_vendas(self):
+        """Método auxiliar que consulta o histórico (view com usar_replica)"""
+        response = self.client.post(
+            reverse('buscar_vendas_periodo'),
+            data=json.dumps({'dataInicio': '10/03/2025', 'dataFim': '10/03/2025'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return [venda['obs'] for venda in response.json()['vendas']]
+    
+    def test_view_le_linhas_da_replica(self):
+        """Testa que a view marcada retorna as linhas gravadas na réplica"""
+        self.assertEqual(self.buscar_vendas(), ['replica'])
+    
+    def test_exportacao_le_da_replica(self):
+        """Testa que a exportação em streaming lê da réplica mesmo após a view retornar"""
+        response = self.client.get(reverse('exportar_vendas_periodo'), {
+            'dataInicio': '10/03/2025',
+            'dataFim': '10/03/2025',
+            'formato': 'ndjson'
+        })
+        
+        registros = [json.loads(linha) for linha in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([registro['observacoes'] for registro in registros], ['replica'])
+    
+    def test_janela_primario_le_do_principal(self):
+        """Testa que dentro da janela após uma escrita o cliente lê do principal"""
+        self.client.cookies['primario_ate'] = str(time.time() + 5)
+        self.assertEqual(self.buscar_vendas(), ['principal'])
+        
+        self.client.cookies['primario_ate'] = str(time.time() - 1)
+        self.assertEqual(self.buscar_vendas(), ['replica'])
+    
+    def test_leitura_apos_escrita_na_mesma_requisicao(self):
+        """Testa que após uma escrita as leituras da mesma requisição vão ao principal"""
+        @usar_replica
+        def view(request):
+            antes = list(VendaModel.objects.values_list('observacoes', flat=True))
+            Cliente.objects.create(nome='Cliente Janela', cpf='11122233344')
+            depois = list(VendaModel.objects.values_list('observacoes', flat=True))
+            return HttpResponse(json.dumps([antes, depois]))
+        
+        response = JanelaPrimarioMiddleware(view)(RequestFactory().get('/'))
+        
+        self.assertEqual(json.loads(response.content), [['replica'], ['principal']])
+        self.assertIn('primario_ate', response.cookies)
+        self.assertFalse(Cliente.objects.using('replica').exists())
+
+class RespostaJSONTestCase(TestCase):
+    """Testes da resposta JSON com encoder acelerado e fallback"""
+    
+    dados = {
+        'preco': Decimal('10.50'),
+        'grande': Decimal('12345678.90'),
+        'data': datetime(2025, 1, 10, 12, 30),
+        'hora': timezone.make_aware(datetime(2025, 1, 10, 12, 30, 15, 123456)),
+        'texto': 'Pão de Açúcar'
+    }
+    
+    def serializar(self, acelerada):
+        """Método auxiliar que serializa os dados com o encoder escolhido"""
+        with self.settings(RESPOSTA_JSON_ACELERADA=acelerada):
+            return json.loads(RespostaJSON(self.dados).content)
+    
+    def test_decimal_e_data_nos_dois_encoders(self):
+        """Testa que orjson e json da biblioteca padrão geram o mesmo conteúdo"""
+        for acelerada in (True, False):
+            with self.subTest(acelerada=acelerada):
+                dados = self.serializar(acelerada)
+                
+                self.assertEqual(dados['preco'], 10.5)
+                # Decimal é sempre número, qualquer que seja a quantidade de dígitos
+                self.assertEqual(dados['grande'], 12345678.9)
+                self.assertEqual(dados['data'], '2025-01-10T12:30:00')
+                self.assertEqual(dados['hora'], '2025-01-10T12:30:15.123Z')
+                self.assertEqual(dados['texto'], 'Pão de Açúcar')
+    
+    def test_mesmo_conteudo_nos_dois_encoders(self):
+        """Testa que a resposta não muda quando o orjson não está disponível"""
+        dados = dict(self.dados, valores=[Decimal('0.10'), Decimal('999.99'), Decimal('1E+3')])
+        
+        with self.settings(RESPOSTA_JSON_ACELERADA=True):
+            acelerada = RespostaJSON(dados).content
+        with self.settings(RESPOSTA_JSON_ACELERADA=False):
+            padrao = RespostaJSON(dados).content
+        
+        self.assertEqual(json.loads(acelerada), json.loads(padrao))
+        self.assertEqual(json.loads(acelerada)['valores'], [0.1, 999.99, 1000.0])
+    
+    def test_safe(self):
+        """Testa que listas exigem safe=False, como no JsonResponse"""
+        with self.assertRaises(TypeError):
+            RespostaJSON([1, 2])
+        
+        self.assertEqual(json.loads(RespostaJSON([1, 2], safe=False).content), [1, 2])
+
+
+class ArquivosEstaticosTestCase(TestCase):
+    """Testes do pipeline de arquivos estáticos (nomes versionados e pré-compressão)"""
+    
+    def setUp(self):
+        """Coleta os estáticos em um diretório temporário com o storage de produção"""
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root, ignore_errors=True)
+        
+        configuracao = self.settings(
+            STATIC_ROOT=self.static_root,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'sistema_vendas.estaticos.ArmazenamentoEstaticoComprimido'},
+            }
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        
+        call_command('collectstatic', interactive=False, verbosity=0)
+    
+    def test_template_usa_nome_versionado(self):
+        """Testa que a tela de pagamento referencia o CSS e o JS extraídos com hash"""
+        response = self.client.get(reverse('pagamentos'))
+        
+        self.assertRegex(response.content.decode(), r'/static/css/pagamento\.[0-9a-f]{12}\.css')
+        self.assertRegex(response.content.decode(), r'/static/js/pagamento\.[0-9a-f]{12}\.js')
+        self.assertNotIn('<script>', response.content.decode())
+    
+    def test_versao_pre_comprimida(self):
+        """Testa que o arquivo versionado é servido em gzip com cache longo"""
+        nome = Path(self.static_root, 'staticfiles.json').read_text()
+        nome = json.loads(nome)['paths']['js/pagamento.js']
+        
+        response = self.client.get(f'/static/{nome}', headers={'Accept-Encoding': 'gzip'})
+        conteudo = b''.join(response.streaming_content)
+        response.close()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/javascript')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(
+            gzip.decompress(conteudo),
+            Path(self.static_root, nome).read_bytes()
+        )
+    
+    def test_sem_compressao_e_sem_versao(self):
+        """Testa o arquivo original sem Accept-Encoding: sem compressão e cache curto"""
+        response = self.client.get('/static/js/pagamento.js')
+        response.close()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn('immutable', response['Cache-Control'])
+    
+    def test_caminho_fora_do_static_root(self):
+        """Testa que caminhos com .. não escapam do STATIC_ROOT"""
+        response = self.client.get('/static/../settings.py')
+        self.assertEqual(response.status_code, 404)
+
+
 class CalculosPagamentosTestCase(TestCase):
     """Testes de cálculos de pagamentos"""
     
@@ -14,6 +14,7 @@ urlpatterns = [
     # APIs de busca
     path('buscar_cliente/', views.buscar_cliente, name='buscar_cliente'),
     path('buscar_produto/', views.buscar_produto, name='buscar_produto'),
+    path('buscar_produtos/', views.buscar_produtos_lote, name='buscar_produtos_lote'),
     
     # APIs de processamento
     path('finalizar_venda/', views.finalizar_venda, name='finalizar_venda'),
@@ -21,5 +22,11 @@ urlpatterns = [
     
     # APIs para Histórico de Vendas (NOVAS)
     path('api/periodo/', views.buscar_vendas_periodo, name='buscar_vendas_periodo'),
+    path('api/periodo/exportar/', views.exportar_vendas_periodo, name='exportar_vendas_periodo'),
     path('api/total/', views.buscar_total_vendas_data, name='buscar_total_vendas_data'),
+    path('api/eventos/', views.eventos_vendas, name='eventos_vendas'),
+    
+    # APIs de relatório de pagamentos
+    path('api/pagamentos/por_forma/', views.total_pagamentos_por_forma, name='total_pagamentos_por_forma'),
+    path('api/pagamentos/por_dia/', views.total_pagamentos_por_dia, name='total_pagamentos_por_dia'),
 ]
\ No newline at end of file
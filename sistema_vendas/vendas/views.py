@@ -1,18 +1,37 @@
 from django.shortcuts import render, redirect
-from django.http import HttpResponse, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
 from django.template import loader
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
-from django.db.models import Sum
+from django.db import transaction
+from django.db.models import Count, Sum, Window
 from decimal import Decimal
 from datetime import datetime
+import csv
+import itertools
 import json
 import traceback
 
+from sistema_vendas.db_router import usar_replica
+from sistema_vendas.eventos import canal_eventos
+from sistema_vendas.respostas import serializar_json
+from sistema_vendas.respostas import RespostaJSON
 from clientes.models import Cliente
+from produtos.logic import ProdutoLogic
 from produtos.models import Produto
-from .models import Venda as VendaModel, ItemVenda
+from .models import Venda as VendaModel, ItemVenda, Pagamento as PagamentoModel
+from .logic import VendaLogic
+
+# Paginação do histórico de vendas
+LIMITE_PADRAO_HISTORICO = 100
+LIMITE_MAXIMO_HISTORICO = 500
+
+# Stream de eventos: intervalo do comentário de keep-alive e espera
+# sugerida ao navegador antes de reconectar
+EVENTOS_KEEPALIVE_SEGUNDOS = 15
+EVENTOS_RECONEXAO_MS = 3000
 
 # Create your views here.
 def Venda_View(request):
@@ -63,7 +82,7 @@ def buscar_cliente(request):
         print(f"[DEBUG] Buscando cliente - CPF recebido: '{cpf}'")
         
         if not cpf:
-            return JsonResponse({'erro': 'CPF não informado'}, status=400)
+            return RespostaJSON({'erro': 'CPF não informado'}, status=400)
         
         # Remove caracteres especiais do CPF
         cpf_limpo = cpf.replace('.', '').replace('-', '').replace(' ', '')
@@ -88,7 +107,7 @@ def buscar_cliente(request):
         
         if cliente:
             print(f"[DEBUG] Cliente encontrado: {cliente.nome}")
-            return JsonResponse({
+            return RespostaJSON({
                 'id': cliente.id,
                 'nome': cliente.nome,
                 'cpf': cliente.cpf,
@@ -97,63 +116,88 @@ def buscar_cliente(request):
             })
         else:
             print(f"[DEBUG] Cliente NÃO encontrado para CPF: {cpf_limpo}")
-            return JsonResponse({'erro': 'Cliente não encontrado'}, status=404)
+            return RespostaJSON({'erro': 'Cliente não encontrado'}, status=404)
             
     except Exception as e:
         print(f"[ERRO] Erro ao buscar cliente: {str(e)}")
         print(traceback.format_exc())
-        return JsonResponse({'erro': f'Erro no servidor: {str(e)}'}, status=500)
+        return RespostaJSON({'erro': f'Erro no servidor: {str(e)}'}, status=500)
 
 def buscar_produto(request):
-    """Busca produto por código (ID)"""
+    """Busca produto por código de barras ou código (ID)"""
     try:
         codigo = request.GET.get('codigo', '').strip()
         
         print(f"[DEBUG] Buscando produto - Código recebido: '{codigo}'")
         
         if not codigo:
-            return JsonResponse({'erro': 'Código não informado'}, status=400)
+            return RespostaJSON({'erro': 'Código não informado'}, status=400)
         
         # Verifica se é um número válido
-        try:
-            codigo_int = int(codigo)
-        except ValueError:
+        if not (codigo.isascii() and codigo.isdigit()):
             print(f"[DEBUG] Código inválido (não é número): '{codigo}'")
-            return JsonResponse({'erro': 'Código deve ser um número'}, status=400)
-        
-        # Tenta buscar o produto
-        produtos = Produto.objects.all()
-        print(f"[DEBUG] Total de produtos no banco: {produtos.count()}")
-        
-        # Mostra os primeiros 3 produtos para debug
-        for p in produtos[:3]:
-            print(f"[DEBUG] Produto exemplo - ID: {p.id}, Desc: {p.descricao}, Estoque: {p.qtd_estoque}")
+            return RespostaJSON({'erro': 'Código deve ser um número'}, status=400)
         
-        # Busca o produto
-        produto = Produto.objects.filter(id=codigo_int).first()
+        # Código de barras ou ID, em uma única consulta indexada
+        produto = ProdutoLogic.buscar_por_codigo(codigo)
         
         if produto:
             print(f"[DEBUG] Produto encontrado: {produto.descricao}, Estoque: {produto.qtd_estoque}")
-            return JsonResponse({
+            return RespostaJSON({
                 'id': produto.id,
                 'descricao': produto.descricao,
-                'preco': float(produto.preco),
+                'preco': produto.preco,
                 'qtd_estoque': produto.qtd_estoque
             })
         else:
-            print(f"[DEBUG] Produto NÃO encontrado para código: {codigo_int}")
-            return JsonResponse({'erro': 'Produto não encontrado'}, status=404)
+            print(f"[DEBUG] Produto NÃO encontrado para código: {codigo}")
+            return RespostaJSON({'erro': 'Produto não encontrado'}, status=404)
             
     except Exception as e:
         print(f"[ERRO] Erro ao buscar produto: {str(e)}")
         print(traceback.format_exc())
-        return JsonResponse({'erro': f'Erro no servidor: {str(e)}'}, status=500)
+        return RespostaJSON({'erro': f'Erro no servidor: {str(e)}'}, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def buscar_produtos_lote(request):
+    """
+    Busca vários produtos de uma vez (lista de códigos colada no PDV ou
+    carrinho restaurado)
+    POST /venda/buscar_produtos/
+    Espera JSON: {"codigos": [1, 2, 3]}
+    Retorna os produtos encontrados e os códigos não encontrados
+    """
+    try:
+        data = json.loads(request.body)
+        codigos = data.get('codigos')
+        
+        if not isinstance(codigos, list) or not all(isinstance(c, (int, str)) for c in codigos):
+            return RespostaJSON({'erro': 'Informe a lista de códigos'}, status=400)
+        
+        print(f"[DEBUG] Buscando produtos em lote - {len(codigos)} código(s)")
+        
+        produtos, nao_encontrados = VendaLogic.buscar_produtos(codigos)
+        
+        print(f"[DEBUG] Encontrados: {len(produtos)}, não encontrados: {len(nao_encontrados)}")
+        
+        return RespostaJSON({
+            'produtos': produtos,
+            'nao_encontrados': nao_encontrados
+        })
+    
+    except ValueError as e:
+        return RespostaJSON({'erro': str(e)}, status=400)
+    except Exception as e:
+        print(f"[ERRO] Erro ao buscar produtos: {str(e)}")
+        print(traceback.format_exc())
+        return RespostaJSON({'erro': f'Erro no servidor: {str(e)}'}, status=500)
 
 @csrf_exempt
 def finalizar_venda(request):
     """Finaliza a venda e cria os registros no banco"""
     if request.method != 'POST':
-        return JsonResponse({'erro': 'Método não permitido'}, status=405)
+        return RespostaJSON({'erro': 'Método não permitido'}, status=405)
     
     try:
         data = json.loads(request.body)
@@ -165,7 +209,7 @@ def finalizar_venda(request):
         print(f"[DEBUG] Finalizando venda - Total: {total}, Itens: {len(itens)}")
         
         if not itens:
-            return JsonResponse({'erro': 'Nenhum item na venda'}, status=400)
+            return RespostaJSON({'erro': 'Nenhum item na venda'}, status=400)
         
         # Busca o cliente (opcional)
         cliente = None
@@ -175,83 +219,41 @@ def finalizar_venda(request):
             if cliente:
                 print(f"[DEBUG] Venda para cliente: {cliente.nome}")
         
-        # IMPORTANTE: Valida estoque ANTES de criar a venda
-        print(f"[DEBUG] Validando estoque dos itens...")
-        for item in itens:
-            codigo = item['codigo']
-            quantidade_desejada = item['quantidade']
-            
-            try:
-                produto = Produto.objects.get(id=codigo)
-                print(f"[DEBUG] Item: {produto.descricao}")
-                print(f"[DEBUG]   - Quantidade desejada: {quantidade_desejada}")
-                print(f"[DEBUG]   - Estoque atual: {produto.qtd_estoque}")
-                
-                if produto.qtd_estoque < quantidade_desejada:
-                    erro_msg = f'Estoque insuficiente para {produto.descricao}. Disponível: {produto.qtd_estoque}, Solicitado: {quantidade_desejada}'
-                    print(f"[ERRO] {erro_msg}")
-                    return JsonResponse({'erro': erro_msg}, status=400)
-                    
-            except Produto.DoesNotExist:
-                return JsonResponse({'erro': f'Produto código {codigo} não encontrado'}, status=404)
-        
-        print(f"[DEBUG] Todos os itens têm estoque disponível. Criando venda...")
-        
-        # Cria a venda
-        venda = VendaModel.objects.create(
-            cliente_id=cliente,
-            data_venda=timezone.now(),
-            total_venda=total,
-            observacoes=observacoes
-        )
+        # Preços, subtotais e total são calculados no servidor a partir do
+        # cadastro de produtos; o total enviado pelo PDV é apenas informativo
+        try:
+            venda = VendaLogic.registrar_venda(itens, cliente, observacoes)
+        except ValueError as e:
+            print(f"[ERRO] {str(e)}")
+            return RespostaJSON({'erro': str(e)}, status=400)
         
-        print(f"[DEBUG] Venda criada com ID: {venda.id}")
-        
-        # Cria os itens da venda e atualiza estoque
-        for item in itens:
-            produto = Produto.objects.get(id=item['codigo'])
-            
-            # Cria o item
-            item_venda = ItemVenda.objects.create(
-                venda_id=venda,
-                produto_id=produto,
-                quantidade=item['quantidade'],
-                subTotal=Decimal(str(item['subtotal']))
-            )
-            
-            print(f"[DEBUG] Item criado: {produto.descricao} x {item['quantidade']}")
-            
-            # Atualiza o estoque
-            estoque_anterior = produto.qtd_estoque
-            produto.qtd_estoque -= item['quantidade']
-            produto.save()
-            
-            print(f"[DEBUG] Estoque atualizado: {estoque_anterior} -> {produto.qtd_estoque}")
+        if venda.total_venda != total:
+            print(f"[DEBUG] Total informado pelo PDV ({total}) difere do calculado ({venda.total_venda})")
         
         # Salva o ID da venda na sessão para a tela de pagamento
         request.session['venda_id'] = venda.id
         
         print(f"[DEBUG] Venda finalizada com sucesso! ID: {venda.id}")
         
-        return JsonResponse({
+        return RespostaJSON({
             'mensagem': 'Venda finalizada com sucesso!',
             'venda_id': venda.id,
-            'total': float(venda.total_venda)
+            'total': venda.total_venda
         })
         
     except Produto.DoesNotExist as e:
         print(f"[ERRO] Produto não encontrado: {str(e)}")
-        return JsonResponse({'erro': 'Produto não encontrado'}, status=404)
+        return RespostaJSON({'erro': str(e) or 'Produto não encontrado'}, status=404)
     except Exception as e:
         print(f"[ERRO] Erro ao finalizar venda: {str(e)}")
         print(traceback.format_exc())
-        return JsonResponse({'erro': f'Erro no servidor: {str(e)}'}, status=500)
+        return RespostaJSON({'erro': f'Erro no servidor: {str(e)}'}, status=500)
 
 @csrf_exempt
 def processar_pagamento(request):
     """Processa o pagamento da venda"""
     if request.method != 'POST':
-        return JsonResponse({'erro': 'Método não permitido'}, status=405)
+        return RespostaJSON({'erro': 'Método não permitido'}, status=405)
     
     try:
         data = json.loads(request.body)
@@ -260,7 +262,7 @@ def processar_pagamento(request):
         print(f"[DEBUG] Processando pagamento - Venda ID: {venda_id}")
         
         if not venda_id:
-            return JsonResponse({'erro': 'Nenhuma venda em andamento'}, status=400)
+            return RespostaJSON({'erro': 'Nenhuma venda em andamento'}, status=400)
         
         venda = VendaModel.objects.get(id=venda_id)
         
@@ -279,106 +281,224 @@ def processar_pagamento(request):
         troco = total_pago - total_venda
         
         if total_pago < total_venda:
-            return JsonResponse({
+            return RespostaJSON({
                 'erro': 'Valor pago é menor que o total da venda'
             }, status=400)
         
-        # Atualiza as observações da venda com informações de pagamento
-        info_pagamento = f" \nPagamento:"
-        if(dinheiro > 0):
-            info_pagamento = info_pagamento + f" Dinheiro R${dinheiro}";
-        
-        if(cartao > 0):
-            info_pagamento = info_pagamento + f" Cartão R${cartao}"
-        
-        if(cheque > 0):
-            info_pagamento = info_pagamento + f" Cheque R${cheque}"
-        
-        if observacoes:
-            info_pagamento = f"{observacoes}; {info_pagamento}"
-        
-        venda.observacoes = info_pagamento
-        venda.save()
+        # Registra um pagamento por forma utilizada, na mesma transação da venda
+        formas = [('dinheiro', dinheiro), ('cartao', cartao), ('cheque', cheque)]
+        pagamentos = [
+            PagamentoModel(venda=venda, forma=forma, valor=valor, data_pagamento=timezone.now())
+            for forma, valor in formas
+            if valor > 0
+        ]
+        
+        # O troco é devolvido em dinheiro quando houver, senão na primeira forma
+        if pagamentos:
+            pagamento_troco = next((p for p in pagamentos if p.forma == 'dinheiro'), pagamentos[0])
+            pagamento_troco.troco = troco
+        
+        with transaction.atomic():
+            PagamentoModel.objects.bulk_create(pagamentos)
+            
+            if observacoes:
+                venda.observacoes = observacoes
+                venda.save(update_fields=['observacoes', 'atualizado_em'])
         
         print(f"[DEBUG] Pagamento processado. Troco: {troco}")
         
         # Limpa a sessão
         del request.session['venda_id']
         
-        return JsonResponse({
+        return RespostaJSON({
             'mensagem': 'Pagamento processado com sucesso!',
-            'troco': float(troco),
+            'troco': troco,
             'venda_id': venda.id
         })
         
     except VendaModel.DoesNotExist:
         print(f"[ERRO] Venda não encontrada: {venda_id}")
-        return JsonResponse({'erro': 'Venda não encontrada'}, status=404)
+        return RespostaJSON({'erro': 'Venda não encontrada'}, status=404)
     except Exception as e:
         print(f"[ERRO] Erro ao processar pagamento: {str(e)}")
         print(traceback.format_exc())
-        return JsonResponse({'erro': f'Erro no servidor: {str(e)}'}, status=500)
+        return RespostaJSON({'erro': f'Erro no servidor: {str(e)}'}, status=500)
 
 
 # ============================================
 # NOVAS VIEWS PARA HISTÓRICO DE VENDAS
 # ============================================
 
+def formatar_moeda(valor):
+    """Formata um Decimal como moeda brasileira (R$ 1234,56) sem passar por float"""
+    return f'R$ {valor:.2f}'.replace('.', ',')
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
+@usar_replica
 def buscar_vendas_periodo(request):
     """
-    Busca vendas em um período específico
-    Espera JSON: {"dataInicio": "DD/MM/YYYY", "dataFim": "DD/MM/YYYY"}
-    Retorna: lista de vendas
+    Busca vendas em um período específico, paginadas por cursor
+    Espera JSON: {
+        "dataInicio": "DD/MM/YYYY", "dataFim": "DD/MM/YYYY",
+        "cliente": ID (opcional), "valorMinimo": 10.00 (opcional),
+        "valorMaximo": 500.00 (opcional), "limite": 100 (opcional),
+        "cursor": "..." (opcional, retornado em proximo_cursor)
+    }
+    Retorna: página de vendas, cursor da próxima página e, na primeira
+    página, os totais do período
     """
     try:
         data = json.loads(request.body)
-        print(data)
-        data_inicio = data.get('dataInicio')
-        data_fim = data.get('dataFim')
+        cursor = data.get('cursor')
+        limite = min(max(int(data.get('limite') or LIMITE_PADRAO_HISTORICO), 1), LIMITE_MAXIMO_HISTORICO)
         
-        print(f"[DEBUG] Buscando vendas - Período: {data_inicio} até {data_fim}")
+        print(f"[DEBUG] Buscando vendas - Período: {data.get('dataInicio')} até {data.get('dataFim')}, cursor: {cursor}")
         
-        # Converter datas de DD/MM/YYYY para objeto datetime
-        data_inicio_obj = datetime.strptime(data_inicio, '%d/%m/%Y')
-        data_fim_obj = datetime.strptime(data_fim, '%d/%m/%Y')
+        vendas = VendaLogic.filtrar_vendas(data)
         
-        # Buscar vendas no período
-        vendas = VendaModel.objects.filter(
-            data_venda__date__gte=data_inicio_obj.date(),
-            data_venda__date__lte=data_fim_obj.date()
-        ).select_related('cliente_id').order_by('-data_venda')
+        # Sem filtros além do período, os totais vêm do cache por dia
+        somente_periodo = not any(data.get(campo) not in (None, '') for campo in ('cliente', 'valorMinimo', 'valorMaximo'))
         
-        print(f"[DEBUG] Vendas encontradas: {vendas.count()}")
+        if cursor:
+            vendas = VendaLogic.aplicar_cursor(vendas, cursor)
+        elif not somente_periodo:
+            # Totais do período inteiro calculados na mesma consulta da
+            # primeira página, antes do LIMIT
+            vendas = vendas.annotate(
+                total_periodo=Window(expression=Sum('total_venda')),
+                quantidade_periodo=Window(expression=Count('id'))
+            )
+        
+        # Busca uma venda a mais para saber se existe próxima página
+        pagina = list(
+            vendas.select_related('cliente_id').order_by('-data_venda', '-id')[:limite + 1]
+        )
+        tem_mais = len(pagina) > limite
+        pagina = pagina[:limite]
         
         # Formatar dados para retorno
         vendas_list = []
-        for venda in vendas:
+        for venda in pagina:
             vendas_list.append({
                 'codigo': str(venda.id).zfill(6),  # Formata ID como código com zeros à esquerda
                 'data': venda.data_venda.strftime('%d/%m/%Y'),
                 'cliente': venda.cliente_id.nome if venda.cliente_id else 'Cliente não identificado',
-                'total': f'R$ {float(venda.total_venda):.2f}'.replace('.', ','),
+                'total': formatar_moeda(venda.total_venda),
                 'obs': venda.observacoes[:50] if venda.observacoes else ''  # Limita observações a 50 caracteres
             })
         
-        return JsonResponse({
+        resposta = {
             'success': True,
-            'vendas': vendas_list
-        })
+            'vendas': vendas_list,
+            'proximo_cursor': VendaLogic.codificar_cursor(pagina[-1]) if tem_mais else None
+        }
+        
+        if not cursor and somente_periodo:
+            totais = VendaLogic.totais_vendas_periodo(
+                VendaLogic.converter_data_br(data.get('dataInicio')),
+                VendaLogic.converter_data_br(data.get('dataFim'))
+            )
+            resposta['totais'] = {
+                'quantidade': totais['quantidade'],
+                'total': formatar_moeda(totais['total'])
+            }
+        elif not cursor:
+            resposta['totais'] = {
+                'quantidade': pagina[0].quantidade_periodo if pagina else 0,
+                'total': formatar_moeda(pagina[0].total_periodo if pagina else Decimal('0'))
+            }
+        
+        return RespostaJSON(resposta)
         
     except ValueError as e:
-        print(f"[ERRO] Data inválida: {str(e)}")
-        return JsonResponse({
+        print(f"[ERRO] Filtro inválido: {str(e)}")
+        return RespostaJSON({
             'success': False,
-            'error': 'Data inválida. Use o formato DD/MM/YYYY'
+            'error': str(e)
         }, status=400)
         
     except Exception as e:
         print(f"[ERRO] Erro ao buscar vendas: {str(e)}")
         print(traceback.format_exc())
-        return JsonResponse({
+        return RespostaJSON({
+            'success': False,
+            'error': f'Erro no servidor: {str(e)}'
+        }, status=500)
+
+
+class _Echo:
+    """Buffer mínimo para o csv.writer escrever linha a linha no streaming"""
+    def write(self, value):
+        return value
+
+
+@require_http_methods(["GET"])
+@usar_replica
+def exportar_vendas_periodo(request):
+    """
+    Exporta todas as vendas de um período em streaming (CSV ou NDJSON)
+    GET /venda/api/periodo/exportar/?dataInicio=DD/MM/YYYY&dataFim=DD/MM/YYYY&formato=csv
+    Aceita os mesmos filtros opcionais de buscar_vendas_periodo
+    """
+    try:
+        formato = request.GET.get('formato', 'csv')
+        if formato not in ('csv', 'ndjson'):
+            return RespostaJSON({
+                'success': False,
+                'error': 'Formato inválido. Use csv ou ndjson'
+            }, status=400)
+        
+        vendas = VendaLogic.filtrar_vendas(request.GET).order_by('-data_venda', '-id').values_list(
+            'id', 'data_venda', 'cliente_id__nome', 'total_venda', 'observacoes'
+        )
+        # As linhas só são lidas durante o streaming, depois que a view
+        # retornou; o banco (réplica ou principal) é fixado aqui
+        vendas = vendas.using(vendas.db)
+        
+        # iterator() percorre o resultado em blocos, com memória constante
+        linhas = vendas.iterator(chunk_size=2000)
+        
+        if formato == 'csv':
+            writer = csv.writer(_Echo())
+            cabecalho = ['codigo', 'data_venda', 'cliente', 'total_venda', 'observacoes']
+            conteudo = itertools.chain(
+                [writer.writerow(cabecalho)],
+                (
+                    writer.writerow([venda_id, data_venda.isoformat(), cliente or '', total, obs])
+                    for venda_id, data_venda, cliente, total, obs in linhas
+                )
+            )
+            content_type = 'text/csv; charset=utf-8'
+        else:
+            conteudo = (
+                json.dumps({
+                    'codigo': venda_id,
+                    'data_venda': data_venda.isoformat(),
+                    'cliente': cliente,
+                    'total_venda': str(total),
+                    'observacoes': obs
+                }, ensure_ascii=False) + '\n'
+                for venda_id, data_venda, cliente, total, obs in linhas
+            )
+            content_type = 'application/x-ndjson; charset=utf-8'
+        
+        response = StreamingHttpResponse(conteudo, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="vendas.{formato}"'
+        return response
+        
+    except ValueError as e:
+        print(f"[ERRO] Filtro inválido: {str(e)}")
+        return RespostaJSON({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+        
+    except Exception as e:
+        print(f"[ERRO] Erro ao exportar vendas: {str(e)}")
+        print(traceback.format_exc())
+        return RespostaJSON({
             'success': False,
             'error': f'Erro no servidor: {str(e)}'
         }, status=500)
@@ -386,6 +506,7 @@ def buscar_vendas_periodo(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@usar_replica
 def buscar_total_vendas_data(request):
     """
     Busca o total de vendas em uma data específica
@@ -402,21 +523,19 @@ def buscar_total_vendas_data(request):
         data_venda_obj = datetime.strptime(data_venda, '%d/%m/%Y')
         
         # Buscar total de vendas na data
-        total = VendaModel.objects.filter(
-            data_venda__date=data_venda_obj.date()
-        ).aggregate(total=Sum('total_venda'))['total'] or Decimal('0')
+        total = VendaLogic.total_vendas_data(data_venda_obj.date())
         
         print(f"[DEBUG] Total encontrado: R$ {total}")
         
-        return JsonResponse({
+        return RespostaJSON({
             'success': True,
-            'total': f'R$ {float(total):.2f}'.replace('.', ','),
+            'total': formatar_moeda(total),
             'data': data_venda
         })
         
     except ValueError as e:
         print(f"[ERRO] Data inválida: {str(e)}")
-        return JsonResponse({
+        return RespostaJSON({
             'success': False,
             'error': 'Data inválida. Use o formato DD/MM/YYYY'
         }, status=400)
@@ -424,7 +543,191 @@ def buscar_total_vendas_data(request):
     except Exception as e:
         print(f"[ERRO] Erro ao buscar total: {str(e)}")
         print(traceback.format_exc())
-        return JsonResponse({
+        return RespostaJSON({
+            'success': False,
+            'error': f'Erro no servidor: {str(e)}'
+        }, status=500)
+
+
+# ============================================
+# VIEWS DE RELATÓRIO DE PAGAMENTOS
+# ============================================
+
+def _periodo_pagamentos(data):
+    """
+    Retorna as datas (início, fim) do período informado no JSON
+    Espera: {"dataInicio": "DD/MM/YYYY", "dataFim": "DD/MM/YYYY"}
+    """
+    data_inicio_obj = datetime.strptime(data.get('dataInicio'), '%d/%m/%Y')
+    data_fim_obj = datetime.strptime(data.get('dataFim'), '%d/%m/%Y')
+    
+    return data_inicio_obj.date(), data_fim_obj.date()
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def total_pagamentos_por_forma(request):
+    """
+    Totaliza os pagamentos de um período por forma de pagamento
+    Espera JSON: {"dataInicio": "DD/MM/YYYY", "dataFim": "DD/MM/YYYY"}
+    Retorna: lista com total, troco e valor líquido por forma
+    """
+    try:
+        data = json.loads(request.body)
+        
+        # Um único GROUP BY forma
+        totais = VendaLogic.totais_pagamentos(*_periodo_pagamentos(data))
+        
+        return RespostaJSON({
+            'success': True,
+            'pagamentos': [
+                {
+                    'forma': item['forma'],
+                    'quantidade': item['quantidade'],
+                    'total': item['valor_total'],
+                    'troco': item['troco_total'],
+                    'liquido': item['liquido']
+                }
+                for item in totais
+            ]
+        })
+        
+    except (ValueError, TypeError) as e:
+        print(f"[ERRO] Data inválida: {str(e)}")
+        return RespostaJSON({
+            'success': False,
+            'error': 'Data inválida. Use o formato DD/MM/YYYY'
+        }, status=400)
+        
+    except Exception as e:
+        print(f"[ERRO] Erro ao totalizar pagamentos: {str(e)}")
+        print(traceback.format_exc())
+        return RespostaJSON({
             'success': False,
             'error': f'Erro no servidor: {str(e)}'
         }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def total_pagamentos_por_dia(request):
+    """
+    Totaliza os pagamentos de um período por dia e forma de pagamento
+    Espera JSON: {"dataInicio": "DD/MM/YYYY", "dataFim": "DD/MM/YYYY"}
+    Retorna: lista com total, troco e valor líquido por dia e forma
+    """
+    try:
+        data = json.loads(request.body)
+        
+        # Um único GROUP BY (dia, forma)
+        totais = VendaLogic.totais_pagamentos(*_periodo_pagamentos(data), por_dia=True)
+        
+        return RespostaJSON({
+            'success': True,
+            'pagamentos': [
+                {
+                    'data': item['dia'].strftime('%d/%m/%Y'),
+                    'forma': item['forma'],
+                    'quantidade': item['quantidade'],
+                    'total': item['valor_total'],
+                    'troco': item['troco_total'],
+                    'liquido': item['liquido']
+                }
+                for item in totais
+            ]
+        })
+        
+    except (ValueError, TypeError) as e:
+        print(f"[ERRO] Data inválida: {str(e)}")
+        return RespostaJSON({
+            'success': False,
+            'error': 'Data inválida. Use o formato DD/MM/YYYY'
+        }, status=400)
+        
+    except Exception as e:
+        print(f"[ERRO] Erro ao totalizar pagamentos: {str(e)}")
+        print(traceback.format_exc())
+        return RespostaJSON({
+            'success': False,
+            'error': f'Erro no servidor: {str(e)}'
+        }, status=500)
+
+
+# ============================================
+# STREAM DE EVENTOS (SERVER-SENT EVENTS)
+# ============================================
+
+def formatar_evento(evento):
+    """Formata um evento do canal no formato text/event-stream"""
+    dados = serializar_json(evento['dados']).decode('utf-8')
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {dados}\n\n"
+
+
+def _inicio_stream(ultimo_id):
+    """Primeira mensagem: intervalo de reconexão e o ID a partir do qual o
+    navegador retoma (Last-Event-ID) ao reconectar"""
+    return f'retry: {EVENTOS_RECONEXAO_MS}\nid: {ultimo_id}\n\n'
+
+
+async def _stream_eventos(ultimo_id):
+    """Gerador assíncrono do stream: eventos perdidos, depois os novos"""
+    # Assina antes de ler o histórico para não perder eventos no meio
+    assinatura = canal_eventos.assinar()
+    try:
+        if ultimo_id is None:
+            ultimo_id = canal_eventos.ultimo_id()
+        yield _inicio_stream(ultimo_id)
+        
+        for evento in canal_eventos.desde(ultimo_id):
+            ultimo_id = evento['id']
+            yield formatar_evento(evento)
+        
+        while True:
+            evento = await assinatura.proximo(EVENTOS_KEEPALIVE_SEGUNDOS)
+            if evento is None:
+                if assinatura.encerrada:
+                    return
+                # Mantém a conexão aberta em proxies com timeout de inatividade
+                yield ': keep-alive\n\n'
+            elif evento['id'] > ultimo_id:
+                ultimo_id = evento['id']
+                yield formatar_evento(evento)
+    finally:
+        canal_eventos.cancelar(assinatura)
+
+
+def _eventos_perdidos(ultimo_id):
+    """Gerador síncrono (WSGI): só os eventos perdidos; o navegador reconecta"""
+    if ultimo_id is None:
+        ultimo_id = canal_eventos.ultimo_id()
+    yield _inicio_stream(ultimo_id)
+    for evento in canal_eventos.desde(ultimo_id):
+        yield formatar_evento(evento)
+
+
+@require_http_methods(["GET"])
+async def eventos_vendas(request):
+    """
+    Stream de Server-Sent Events com as novas vendas ('venda') e as
+    alterações de estoque ('estoque') publicadas após o commit
+    
+    Requer o servidor ASGI para manter a conexão aberta. Em WSGI o stream
+    entrega apenas os eventos posteriores ao Last-Event-ID e termina, e o
+    navegador reconecta após o intervalo de retry.
+    """
+    # Sem Last-Event-ID (primeira conexão) o stream começa nos eventos novos
+    try:
+        ultimo_id = int(request.headers.get('Last-Event-ID') or request.GET['ultimo_id'])
+    except (KeyError, ValueError):
+        ultimo_id = None
+    
+    if isinstance(request, ASGIRequest):
+        conteudo = _stream_eventos(ultimo_id)
+    else:
+        conteudo = _eventos_perdidos(ultimo_id)
+    
+    response = StreamingHttpResponse(conteudo, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Desliga o buffer do nginx para o stream
+    response['X-Accel-Buffering'] = 'no'
+    return response